@@ -0,0 +1,227 @@
+# bench_scanner.py
+"""
+Scanner throughput on a synthetic repository, per scanner mode: files/sec,
+output lines/sec, peak RSS and filesystem call counts. Every mode runs in
+its own process so peak RSS and call counts are not shared between modes.
+
+Usage: python -m benchmarks.bench_scanner [--json results.json] [--compare baseline.json]
+"""
+
+import argparse
+import builtins
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+from benchmarks.synthetic import make_tree
+from dirai.constants import DEFAULT_CONFIG
+
+MODES = {
+    'structure': {'show_content': False},
+    'content': {},
+    'workers': {'workers': 4},
+    'processes': {'content_processes': 2},
+    'cached': {'cache': True},
+    'exclude': {'exclude': ['*.md', 'dir_1/'], 'include': ['*.py', '*.txt', '*.log']},
+}
+
+# Filesystem calls counted in the scanning process (content processes are not counted)
+COUNTED_CALLS = [(os, 'scandir'), (os, 'stat'), (os, 'lstat'), (os, 'readlink'), (builtins, 'open')]
+
+
+def mode_config(mode):
+    config = {
+        'exclude': [],
+        'include': [],
+        'use_gitignore': True,
+        'show_content': True,
+        'show_hidden': False,
+        'max_depth': None,
+        'follow_symlinks': False,
+        'gitignore_paths': [],
+        'max_lines': -1,
+        'ignore_variables': [],
+        'redaction_patterns': list(DEFAULT_CONFIG['default']['redaction_patterns']),
+        'decode_errors': 'replace',
+        'cache': False,
+    }
+    config.update(MODES[mode])
+    return config
+
+
+def read_syscall_counts():
+    """Read/write syscall counts of this process from /proc (Linux only)"""
+    try:
+        with open('/proc/self/io') as f:
+            fields = dict(line.split(': ') for line in f.read().splitlines())
+        return {'read': int(fields['syscr']), 'write': int(fields['syscw'])}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def peak_rss_kb():
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in bytes on macOS, KiB elsewhere
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def counting_fs_calls(counts):
+    """Patches counting the COUNTED_CALLS made while they are active into counts"""
+    patches = []
+    for module, name in COUNTED_CALLS:
+        original = getattr(module, name)
+
+        def counted(*args, _name=name, _original=original, **kwargs):
+            counts[_name] = counts.get(_name, 0) + 1
+            return _original(*args, **kwargs)
+
+        patches.append(patch.object(module, name, counted))
+    return patches
+
+
+def run_mode(mode, root):
+    """Scan root once in this process and return the measurements"""
+    from dirai.scanner import DirectoryScanner
+
+    config = mode_config(mode)
+    cold_counts = {}
+    if mode == 'cached':
+        # Warm the cache, then measure a scan served from it
+        patches = counting_fs_calls(cold_counts)
+        for p in patches:
+            p.start()
+        try:
+            for _ in DirectoryScanner(dict(config, rebuild_cache=True)).iter_structure(root):
+                pass
+        finally:
+            for p in patches:
+                p.stop()
+
+    counts = {}
+    patches = counting_fs_calls(counts)
+    scanner = DirectoryScanner(config)
+    syscalls_before = read_syscall_counts()
+    for p in patches:
+        p.start()
+    try:
+        start = time.perf_counter()
+        lines = 0
+        for _ in scanner.iter_structure(root):
+            lines += 1
+        elapsed = time.perf_counter() - start
+    finally:
+        for p in patches:
+            p.stop()
+    syscalls_after = read_syscall_counts()
+
+    if mode == 'cached':
+        # A tree modified within the cache's racy window is never stored
+        assert sum(counts.values()) < sum(cold_counts.values()), \
+            f"the warm scan made {counts} fs calls, the cold one {cold_counts}: the cache was not used"
+
+    result = {
+        'mode': mode,
+        'seconds': elapsed,
+        'lines': lines,
+        'peak_rss_kb': peak_rss_kb(),
+        'fs_calls': counts,
+    }
+    if syscalls_before and syscalls_after:
+        result['syscalls'] = {key: syscalls_after[key] - syscalls_before[key] for key in syscalls_before}
+    return result
+
+
+def run_isolated(mode, root):
+    """Run one mode in a fresh interpreter"""
+    completed = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_scanner', '--run-mode', mode, '--root', root],
+        check=True, capture_output=True, text=True
+    )
+    return json.loads(completed.stdout)
+
+
+def compare(results, baseline, tolerance):
+    """Print files/sec against a baseline run, return the regressed modes"""
+    previous = {result['mode']: result for result in baseline['results']}
+    regressed = []
+    for result in results:
+        before = previous.get(result['mode'])
+        if not before:
+            continue
+        ratio = result['files_per_sec'] / before['files_per_sec']
+        print(f"{result['mode']:<10} {ratio:6.2f}x baseline files/sec")
+        if ratio < 1 - tolerance:
+            regressed.append(result['mode'])
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modes", nargs='+', choices=list(MODES), default=list(MODES))
+    parser.add_argument("--width", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--files-per-dir", type=int, default=8)
+    parser.add_argument("--gitignore-density", type=float, default=0.3)
+    parser.add_argument("--symlink-density", type=float, default=0.05)
+    parser.add_argument("--content-lines", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode, the fastest is kept")
+    parser.add_argument("--json", help="Write machine-readable results to this file")
+    parser.add_argument("--compare", help="Results file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed files/sec drop against --compare before failing")
+    parser.add_argument("--run-mode", choices=list(MODES), help=argparse.SUPPRESS)
+    parser.add_argument("--root", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_mode:
+        print(json.dumps(run_mode(args.run_mode, args.root)))
+        return
+
+    with tempfile.TemporaryDirectory(prefix='dirai-bench-') as tmp:
+        root = os.path.join(tmp, 'repo')
+        manifest = make_tree(
+            root, width=args.width, depth=args.depth, files_per_dir=args.files_per_dir,
+            gitignore_density=args.gitignore_density, symlink_density=args.symlink_density,
+            content_lines=args.content_lines, seed=args.seed
+        )
+        results = []
+        for mode in args.modes:
+            result = min((run_isolated(mode, root) for _ in range(args.repeat)), key=lambda r: r['seconds'])
+            result['files_per_sec'] = manifest['files'] / result['seconds']
+            result['lines_per_sec'] = result['lines'] / result['seconds']
+            results.append(result)
+
+    print(f"{manifest['files']} files, {manifest['dirs']} directories, {manifest['bytes']:,} bytes")
+    print(f"{'mode':<10} {'files/sec':>12} {'lines/sec':>12} {'peak RSS':>10} {'fs calls':>9}")
+    for result in results:
+        print(f"{result['mode']:<10} {result['files_per_sec']:12,.0f} {result['lines_per_sec']:12,.0f} "
+              f"{result['peak_rss_kb'] / 1024:8.1f}MB {sum(result['fs_calls'].values()):9}")
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'tree': manifest,
+        'results': results,
+    }
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressed = compare(results, json.load(f), args.tolerance)
+        if regressed:
+            print(f"Regression in: {', '.join(regressed)}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# bench_startup.py
+"""
+CLI startup cost: import time of dirai.cli and the modules it pulls in
+(from python -X importtime), and wall time of `dirai --help`, a config
+load with and without its snapshot, and a scan of a tiny directory.
+Every measurement runs in a fresh interpreter.
+
+Usage: python -m benchmarks.bench_startup [--json results.json] [--compare baseline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+# Snippets timed in a fresh interpreter each
+COMMANDS = {
+    'help': "import sys; sys.argv = ['dirai', '--help']\n"
+            "from dirai.cli import main\n"
+            "try:\n    main()\nexcept SystemExit:\n    pass",
+    'config_cold': "import os, shutil; shutil.rmtree(os.environ['XDG_CACHE_HOME'], ignore_errors=True)\n"
+                   "from dirai.config import DiraiConfig; DiraiConfig()",
+    'config_snapshot': "from dirai.config import DiraiConfig; DiraiConfig()",
+    'scan_tiny': "import sys; sys.argv = ['dirai', '-d', 'tiny', '-o', '-', '--no-cache']\n"
+                 "from dirai.cli import main; main()",
+}
+
+CONFIG = """\
+default:
+  exclude: ['*.log', 'node_modules/', 'dist/']
+web:
+  include: ['*.js', '*.css', '*.html']
+  max_depth: 4
+docs:
+  include: ['*.md', '*.rst']
+"""
+
+
+def run(code, cwd, env, importtime=False):
+    args = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    start = time.perf_counter()
+    completed = subprocess.run(args, cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, completed.stderr
+
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure(cwd, env, repeat, top):
+    results = {}
+    for name, code in COMMANDS.items():
+        if name == 'config_snapshot':
+            # Make sure the snapshot exists
+            run(COMMANDS['config_cold'], cwd, env)
+        times = []
+        for _ in range(repeat):
+            if name == 'config_snapshot':
+                run(code, cwd, env)
+            times.append(run(code, cwd, env)[0])
+        results[name] = min(times)
+
+    imports = min((parse_importtime(run('import dirai.cli', cwd, env, importtime=True)[1]) for _ in range(repeat)),
+                  key=lambda modules: modules['dirai.cli'][1])
+    slowest = sorted(imports.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    return {
+        'import_us': imports['dirai.cli'][1],
+        'modules': len(imports),
+        'slowest_imports': [{'module': name, 'self_us': s, 'cumulative_us': c} for name, (s, c) in slowest],
+        'seconds': results,
+    }
+
+
+def compare(result, baseline, tolerance):
+    """Print times against a baseline run, return what regressed"""
+    regressed = []
+    pairs = [('import', result['import_us'], baseline['import_us'])]
+    pairs += [(name, seconds, baseline['seconds'].get(name)) for name, seconds in result['seconds'].items()]
+    for name, now, before in pairs:
+        if not before:
+            continue
+        ratio = now / before
+        print(f"{name:<16} {ratio:6.2f}x baseline time")
+        if ratio > 1 + tolerance:
+            regressed.append(name)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement, the fastest is kept")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--json", help="Write machine-readable results to this file")
+    parser.add_argument("--compare", help="Results file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown against --compare before failing")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='dirai-bench-') as tmp:
+        with open(os.path.join(tmp, '.dirai.yaml'), 'w') as f:
+            f.write(CONFIG)
+        os.makedirs(os.path.join(tmp, 'tiny', 'src'))
+        for name in ('README.md', os.path.join('src', 'main.py')):
+            with open(os.path.join(tmp, 'tiny', name), 'w') as f:
+                f.write('print("hello")\n')
+        package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, HOME=tmp, XDG_CACHE_HOME=os.path.join(tmp, 'cache'),
+                   PYTHONPATH=os.pathsep.join(filter(None, [package_root, os.environ.get('PYTHONPATH')])))
+        result = measure(tmp, env, args.repeat, args.top)
+
+    print(f"import dirai.cli: {result['import_us'] / 1000:.1f} ms ({result['modules']} modules)")
+    for name, seconds in result['seconds'].items():
+        print(f"{name:<16} {seconds * 1000:8.1f} ms")
+    print(f"\n{'module':<40} {'self ms':>8} {'cumul ms':>9}")
+    for item in result['slowest_imports']:
+        print(f"{item['module']:<40} {item['self_us'] / 1000:8.1f} {item['cumulative_us'] / 1000:9.1f}")
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        **result,
+    }
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressed = compare(result, json.load(f), args.tolerance)
+        if regressed:
+            print(f"Regression in: {', '.join(regressed)}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# synthetic.py
+"""
+Deterministic synthetic repositories for the benchmarks.
+
+The same parameters and seed always produce the same tree: a balanced
+directory hierarchy of source-like files, with a share of directories
+carrying a .gitignore (and the files it ignores), some binary files and
+some symlinks. Every path is backdated to MTIME, so the scan cache (which
+never stores entries modified in the last two seconds) is used right away.
+"""
+
+import os
+import random
+
+from benchmarks.bench_redaction import make_lines
+
+GITIGNORE_LINES = ['*.log', 'build/', '*.tmp', '!keep.log']
+EXTENSIONS = ['.py', '.md', '.txt', '.js', '.yaml']
+
+# 2020-09-13T12:26:40Z
+MTIME = 1600000000
+
+
+def make_tree(root, width=4, depth=3, files_per_dir=8, gitignore_density=0.3,
+              symlink_density=0.05, binary_density=0.02, content_lines=40, seed=0):
+    """
+    Create a synthetic repository under root and return a manifest of what
+    was created (dirs, files, gitignores, symlinks, bytes, params).
+
+    width directories per level, depth levels below root, files_per_dir
+    regular files in every directory. Densities are per directory
+    (gitignore) or per file (symlink, binary).
+    """
+    rng = random.Random(seed)
+    lines = make_lines(max(content_lines, 1) * 16, seed)
+    manifest = {
+        'dirs': 0, 'files': 0, 'gitignores': 0, 'symlinks': 0, 'bytes': 0,
+        'params': {
+            'width': width, 'depth': depth, 'files_per_dir': files_per_dir,
+            'gitignore_density': gitignore_density, 'symlink_density': symlink_density,
+            'binary_density': binary_density, 'content_lines': content_lines, 'seed': seed,
+        },
+    }
+
+    def write(path, data):
+        with open(path, 'wb') as f:
+            f.write(data)
+        manifest['files'] += 1
+        manifest['bytes'] += len(data)
+
+    def fill(directory, level):
+        os.makedirs(directory, exist_ok=True)
+        manifest['dirs'] += 1
+
+        if rng.random() < gitignore_density:
+            write(os.path.join(directory, '.gitignore'), '\n'.join(GITIGNORE_LINES).encode() + b'\n')
+            manifest['gitignores'] += 1
+            write(os.path.join(directory, 'debug.log'), b'ignored\n')
+            write(os.path.join(directory, 'keep.log'), b'kept\n')
+            os.makedirs(os.path.join(directory, 'build'), exist_ok=True)
+            write(os.path.join(directory, 'build', 'out.o'), b'\x00' * 64)
+
+        for index in range(files_per_dir):
+            path = os.path.join(directory, f'file_{index}{rng.choice(EXTENSIONS)}')
+            if rng.random() < binary_density:
+                write(path, bytes(rng.randrange(256) for _ in range(512)) + b'\x00')
+                continue
+            start = rng.randrange(len(lines) - content_lines + 1)
+            write(path, ('\n'.join(lines[start:start + content_lines]) + '\n').encode())
+
+            if rng.random() < symlink_density:
+                os.symlink(os.path.basename(path), os.path.join(directory, f'link_{index}'))
+                manifest['symlinks'] += 1
+
+        if level < depth:
+            for index in range(width):
+                fill(os.path.join(directory, f'dir_{index}'), level + 1)
+
+    fill(str(root), 0)
+    # Bottom-up, since creating an entry updates its directory's mtime
+    for directory, dirnames, filenames in os.walk(str(root), topdown=False):
+        for name in dirnames + filenames:
+            os.utime(os.path.join(directory, name), (MTIME, MTIME), follow_symlinks=False)
+    os.utime(str(root), (MTIME, MTIME))
+    return manifest
@@ -0,0 +1,106 @@
+# aio.py
+"""
+DIRAI Asyncio Scanning
+
+Runs DirectoryScanner walks for asyncio applications without blocking the
+event loop. The synchronous walk is advanced in batches of lines on an
+executor, so listing directories and reading files happen off the loop:
+
+    scanner = AsyncDirectoryScanner(config)
+    async for line in scanner.iter_structure(path):
+        ...
+
+Each scan keeps at most one batch running on the executor and one batch
+waiting to be consumed, so a slow consumer pauses the walk (backpressure)
+and scans sharing a bounded executor take turns a batch at a time instead
+of holding a thread for their whole walk. Leaving the loop early or
+cancelling the consuming task stops the walk after the line being produced
+and releases its resources (worker threads, cache, content processes).
+"""
+
+import asyncio
+import threading
+
+from dirai.scanner import DirectoryScanner
+
+# Lines produced per executor job
+BATCH_SIZE = 256
+
+
+class _Walk:
+    """A synchronous line iterator advanced from executor threads, one batch at a time"""
+
+    def __init__(self, iterator):
+        self._iterator = iterator
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.finished = False
+
+    def next_batch(self, size):
+        """Return up to size lines; an empty batch means the walk is over"""
+        batch = []
+        with self._lock:
+            if self.finished:
+                return batch
+            for line in self._iterator:
+                batch.append(line)
+                if len(batch) >= size or self._stop.is_set():
+                    break
+            else:
+                self.finished = True
+        return batch
+
+    def stop(self):
+        """Stop producing lines (safe to call from the loop while a batch runs)"""
+        self._stop.set()
+
+    def close(self):
+        """Close the walk once the running batch, if any, has returned"""
+        with self._lock:
+            if not self.finished:
+                self.finished = True
+                self._iterator.close()
+
+
+class AsyncDirectoryScanner:
+    """
+    Asyncio front end of DirectoryScanner. Every iter_structure() call
+    walks with a scanner of its own, so one instance can serve concurrent
+    scans. executor defaults to the event loop's default executor; pass a
+    bounded ThreadPoolExecutor to cap the threads shared by all scans.
+    """
+
+    def __init__(self, config, executor=None, batch_size=BATCH_SIZE):
+        self.config = config
+        self.executor = executor
+        self.batch_size = batch_size
+
+    def _make_scanner(self):
+        return DirectoryScanner(self.config)
+
+    async def iter_structure(self, directory):
+        """Asynchronously yield the structure lines as the tree is walked"""
+        loop = asyncio.get_running_loop()
+        scanner = self._make_scanner()
+        walk = _Walk(scanner.iter_structure(directory))
+        pending = loop.run_in_executor(self.executor, walk.next_batch, self.batch_size)
+        try:
+            while True:
+                batch = await pending
+                if not batch:
+                    break
+                # Produce the next batch while this one is consumed
+                pending = loop.run_in_executor(self.executor, walk.next_batch, self.batch_size)
+                for line in batch:
+                    yield line
+        finally:
+            walk.stop()
+            if pending.done() and not pending.cancelled():
+                # Retrieve the failure of a batch nobody will consume
+                pending.exception()
+            pending.cancel()
+            # Waits for a running batch to return before closing the walk
+            await asyncio.shield(loop.run_in_executor(self.executor, walk.close))
+
+    async def generate_structure(self, directory):
+        return [line async for line in self.iter_structure(directory)]
@@ -0,0 +1,155 @@
+# budget.py
+"""
+DIRAI Token Budgets
+
+Packs a report into a token budget for language models. The tree skeleton
+(every entry line, note and error) is always kept; file contents are added
+in priority order while they fit, and the others are replaced by a one-line
+"[Content omitted: ...]" marker.
+
+Token counts come from estimate_tokens(), a local approximation of BPE
+tokenizers: word pieces of up to 8 letters (split at capitals), groups of
+up to 3 digits, each other visible character, and runs of whitespace each
+count as one token. It needs no vocabulary files or network access, so
+budgets are approximate: leave some headroom below a hard context limit.
+
+A file's priority is a weighted sum of scores between 0 and 1:
+
+- depth: 1 for files at the top level, 1/depth below
+- recency: the newest file 1, the oldest 0 (by modification time)
+- size: the cheapest content 1, the most expensive 0 (by estimated tokens)
+- patterns: 1 for files matching priority_patterns (gitwildmatch), else 0
+
+The weights are set by token_priority; a weight of 0 turns a score off.
+
+With dedupe_content, a "[same content as path]" line is packed together
+with the content it refers to: when that content is omitted, the line is
+replaced by the same omitted marker.
+"""
+
+import os
+import re
+
+import pathspec
+
+from dirai.matching import compile_spec
+from dirai.render import render_text
+
+DEFAULT_PRIORITY = {'depth': 1.0, 'recency': 1.0, 'size': 1.0, 'patterns': 2.0}
+
+_TOKEN_PATTERN = re.compile(r"[A-Z]?[a-z]{1,8}|[A-Z]{1,8}|\d{1,3}|[^\sA-Za-z\d]|\s{2,}")
+_REFERENCE = re.compile(r"\[same content as (.+)\]")
+
+
+def estimate_tokens(text):
+    """Approximate token count of text"""
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def _omitted_marker(tokens):
+    return [f"[Content omitted: ~{tokens} tokens, over the token budget]"]
+
+
+def _references(tree, contents):
+    """Map the files whose content is a dedupe_content reference to the file it refers to"""
+    references = {}
+    paths = None
+    for index, lines in contents.items():
+        if len(lines) != 1:
+            continue
+        match = _REFERENCE.fullmatch(lines[0])
+        if match is None:
+            continue
+        if paths is None:
+            paths = {tree.path(other): other for other in contents}
+        target = paths.get(match.group(1).replace(os.sep, '/'))
+        if target is not None and target not in references:
+            references[index] = target
+    return references
+
+
+def _ranks(values):
+    """Map each index to the rank of its value, scaled to 0..1 (ties share a rank)"""
+    ordered = sorted(set(values.values()))
+    if len(ordered) < 2:
+        return {index: 1.0 for index in values}
+    position = {value: rank / (len(ordered) - 1) for rank, value in enumerate(ordered)}
+    return {index: position[value] for index, value in values.items()}
+
+
+def _priorities(tree, costs, config):
+    weights = {**DEFAULT_PRIORITY, **(config.get('token_priority') or {})}
+    unknown = set(weights) - set(DEFAULT_PRIORITY)
+    if unknown:
+        raise ValueError(f"Unknown token_priority keys: {', '.join(sorted(unknown))}")
+
+    depths = tree.depths()
+    recency = _ranks({index: tree.mtimes[index] for index in costs})
+    size = _ranks({index: -cost for index, cost in costs.items()})
+    patterns = compile_spec(pathspec.PathSpec.from_lines('gitwildmatch', config.get('priority_patterns') or []))
+
+    priorities = {}
+    for index in costs:
+        score = weights['depth'] / depths[index] + weights['recency'] * recency[index] + weights['size'] * size[index]
+        if patterns is not None and patterns.match_file(tree.path(index)):
+            score += weights['patterns']
+        priorities[index] = score
+    return priorities
+
+
+def pack_tree(tree, budget, config, renderer=render_text):
+    """
+    Keep the file contents of tree (a finished TreeModel) that fit in budget
+    tokens of the report rendered by renderer, highest priority first.
+    Contents left out are replaced by a marker in tree.contents. Returns a
+    summary dict with the skeleton and content token counts and the number
+    of files kept and omitted.
+    """
+    contents = tree.contents
+    depths = tree.depths()
+    # Content lines are drawn one level below their file; counting them
+    # behind a full '│   ' prefix errs on the side of the budget
+    prefixes = {}
+    for index in contents:
+        depth = depths[index]
+        if depth not in prefixes:
+            prefixes[depth] = '│   ' * (depth + 1)
+    costs = {
+        index: sum(estimate_tokens(prefixes[depths[index]] + line) for line in lines)
+        for index, lines in contents.items()
+    }
+    markers = {index: _omitted_marker(cost) for index, cost in costs.items()}
+    references = _references(tree, contents)
+    copies = {}
+    for index, target in references.items():
+        markers[index] = markers[target]
+        copies.setdefault(target, []).append(index)
+    marker_costs = {index: estimate_tokens(prefixes[depths[index]] + markers[index][0]) for index in markers}
+
+    tree.contents = markers
+    try:
+        skeleton = sum(estimate_tokens(line) for line in renderer(tree))
+    finally:
+        tree.contents = contents
+
+    # References are kept or omitted along with the content they refer to
+    units = {index: cost for index, cost in costs.items() if index not in references}
+    priorities = _priorities(tree, units, config)
+    left = budget - skeleton
+    kept = set()
+    # Stable sort: equal priorities keep walk order
+    for index in sorted(units, key=priorities.__getitem__, reverse=True):
+        unit = [index, *copies.get(index, ())]
+        extra = sum(costs[member] - marker_costs[member] for member in unit)
+        if extra <= left:
+            kept.update(unit)
+            left -= extra
+
+    tree.contents = {index: lines if index in kept else markers[index] for index, lines in contents.items()}
+    return {
+        'budget': budget,
+        'skeleton_tokens': skeleton,
+        'tokens': budget - left,
+        'files_kept': len(kept),
+        'files_omitted': len(costs) - len(kept),
+    }
@@ -0,0 +1,147 @@
+# cache.py
+"""
+DIRAI Scan Cache
+
+Persists directory listings and rendered file content between runs in
+<directory>/.dirai_cache/, so unchanged parts of a tree are not listed,
+read or redacted again.
+
+Listings are keyed by the directory's (mtime_ns, inode). File content is
+keyed by (path, size, mtime_ns, inode) and a hash of the profile settings
+that affect rendering. Content ending in a read error is not stored: fixing
+its cause (chmod, a remount) changes none of the key.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from dirai.constants import CACHE_DIR_NAME
+
+CACHE_VERSION = 3
+CACHE_FILE_NAME = "cache.sqlite3"
+
+# Entries modified this close to the start of a scan may change again
+# within the same timestamp tick, so they are never stored ("racy" entries)
+RACY_WINDOW_NS = 2 * 10**9
+
+# Content lines ending with this are a read error, not the file's content
+READ_ERROR_PREFIX = '│   [Error reading file: '
+
+# Settings that change how file content is rendered
+CONTENT_SETTINGS = (
+    'max_lines', 'max_bytes_per_file', 'ignore_variables', 'redaction_patterns', 'decode_errors'
+)
+
+
+def profile_hash(config):
+    """Hash the settings that affect rendered file content"""
+    settings = {key: config.get(key) for key in CONTENT_SETTINGS}
+    settings['version'] = CACHE_VERSION
+    return hashlib.sha1(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ScanCache:
+    def __init__(self, base_dir, config, rebuild=False):
+        self.profile = profile_hash(config)
+        self.stats = {'listing_hits': 0, 'listing_misses': 0, 'content_hits': 0, 'content_misses': 0}
+        self._started_ns = time.time_ns()
+        self._lock = threading.Lock()
+
+        cache_dir = os.path.join(base_dir, CACHE_DIR_NAME)
+        os.makedirs(cache_dir, exist_ok=True)
+        ignore_file = os.path.join(cache_dir, '.gitignore')
+        if not os.path.exists(ignore_file):
+            with open(ignore_file, 'w') as f:
+                f.write('*\n')
+
+        self._db = sqlite3.connect(os.path.join(cache_dir, CACHE_FILE_NAME), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS listings ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER, inode INTEGER, entries TEXT)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS contents ("
+            "path TEXT, profile TEXT, size INTEGER, mtime_ns INTEGER, inode INTEGER, lines TEXT, "
+            "PRIMARY KEY (path, profile))"
+        )
+        if rebuild:
+            self._db.execute("DELETE FROM listings")
+            self._db.execute("DELETE FROM contents")
+        self._db.commit()
+
+    @classmethod
+    def open(cls, base_dir, config):
+        """Open the cache for a scan, or return None if it is disabled or unusable"""
+        if not config.get('cache', False):
+            return None
+        try:
+            return cls(base_dir, config, rebuild=config.get('rebuild_cache', False))
+        except (OSError, sqlite3.Error) as e:
+            if config.get('verbose'):
+                print(f"Cache disabled: {str(e)}", file=sys.stderr)
+            return None
+
+    def for_profile(self, config):
+        """A view of this cache for the content of another profile, sharing its database"""
+        view = copy.copy(self)
+        view.profile = profile_hash(config)
+        view.stats = dict.fromkeys(self.stats, 0)
+        return view
+
+    def _is_racy(self, mtime_ns):
+        return mtime_ns >= self._started_ns - RACY_WINDOW_NS
+
+    def get_listing(self, rel_dir, dir_stat):
+        """Return cached (name, is_link, is_dir, is_file) records, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT mtime_ns, inode, entries FROM listings WHERE path = ?", (rel_dir,)
+            ).fetchone()
+            if row and row[0] == dir_stat.st_mtime_ns and row[1] == dir_stat.st_ino:
+                self.stats['listing_hits'] += 1
+                return json.loads(row[2])
+            self.stats['listing_misses'] += 1
+            return None
+
+    def put_listing(self, rel_dir, dir_stat, records):
+        if self._is_racy(dir_stat.st_mtime_ns):
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?)",
+                (rel_dir, dir_stat.st_mtime_ns, dir_stat.st_ino, json.dumps(records))
+            )
+
+    def get_content(self, rel_path, file_stat):
+        """Return cached content lines (without tree prefix), or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size, mtime_ns, inode, lines FROM contents WHERE path = ? AND profile = ?",
+                (rel_path, self.profile)
+            ).fetchone()
+            if row and row[:3] == (file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino):
+                self.stats['content_hits'] += 1
+                return json.loads(row[3])
+            self.stats['content_misses'] += 1
+            return None
+
+    def put_content(self, rel_path, file_stat, lines):
+        if self._is_racy(file_stat.st_mtime_ns) or (lines and lines[-1].startswith(READ_ERROR_PREFIX)):
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO contents VALUES (?, ?, ?, ?, ?, ?)",
+                (rel_path, self.profile, file_stat.st_size, file_stat.st_mtime_ns,
+                 file_stat.st_ino, json.dumps(lines))
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
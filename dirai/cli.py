@@ -6,41 +6,45 @@ DIRAI - Enhanced Directory Structure Analyzer (No Color Version)
 import argparse
 import os
 import sys
-import platform
-from pathlib import Path
-import yaml
-import pathspec
-
-from dirai.scanner import DirectoryScanner
-from dirai.config import DiraiConfig
-from dirai.constants import CONFIG_FILE_NAME, DEFAULT_CONFIG
-# Configuration Constants
 
+# The scanner, pathspec and yaml are imported by the functions that need
+# them, so `dirai --help` and argument errors return without loading them
 
 
 def main():
+    args = parse_arguments()
+    from dirai.config import DiraiConfig
     config_handler = DiraiConfig()
-    args = parse_arguments(config_handler)
     if args.profiles and "all" in args.profiles:
         # Run all profiles from the config file
         profiles = config_handler.get_profile_names()
     else:
         profiles = args.profiles 
 
-    for profile_name in profiles:
-        run_profile(profile_name, config_handler, args)
+    if args.watch:
+        run_watch(profiles, config_handler, args)
+    elif args.profile_out:
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(run_profiles, profiles, config_handler, args)
+        finally:
+            profiler.dump_stats(args.profile_out)
+    else:
+        run_profiles(profiles, config_handler, args)
 
-def parse_arguments(config_handler):    
+def parse_arguments(config_handler=None):
     parser = argparse.ArgumentParser(
         prog="dirai",
         description="DIRAI - Smart Directory Structure Analysis",
         epilog="Example: dirai --profiles web --output structure.md\n"
+               "Keep reports up to date as files change: dirai watch [options]\n"
                "Configuration file: ~/.dirai.yaml or current directory"
     )
     
 
     parser.add_argument("-p","--profiles", nargs='+',default='all',
-                        help="Run multiple profiles sequentially. Use 'all' to run all profiles from config")
+                        help="Run multiple profiles in one shared directory walk. Use 'all' to run all profiles from config")
     parser.add_argument("-d", "--directory", default=".",
                         help="Target directory to analyze")
     parser.add_argument("-o", "--output", 
@@ -59,13 +63,57 @@ def parse_arguments(config_handler):
                         help="Display file contents")
     parser.add_argument("--follow-symlinks", action="store_const", const=True, default=None,
                         help="Follow symbolic links")
+    parser.add_argument("--repeated-dirs", choices=["walk", "reference"],
+                        help="With --follow-symlinks, walk a directory reached again or refer to its first walk")
+    parser.add_argument("--prune-empty-dirs", action="store_const", const=True, default=None,
+                        help="Hide directories left empty after include/exclude filtering")
+    parser.add_argument("--workers", type=int,
+                        help="Number of threads listing directories concurrently")
+    parser.add_argument("--content-processes", type=int,
+                        help="Number of processes reading and redacting file contents")
+    parser.add_argument("--decode-errors", choices=["strict", "replace", "ignore", "backslashreplace"],
+                        help="How to handle bytes that are not valid UTF-8 in file contents")
+    parser.add_argument("--max-bytes-per-file", type=int,
+                        help="Truncate each file's content after this many bytes")
+    parser.add_argument("--max-total-content-bytes", type=int,
+                        help="Stop showing file contents once the report holds this many bytes of content")
+    parser.add_argument("--token-budget", type=int,
+                        help="Fit the report into about this many LLM tokens, keeping the whole tree")
+    parser.add_argument("--priority-patterns", nargs='+',
+                        help="With --token-budget, patterns of files whose contents are kept first")
+    parser.add_argument("--dedupe-content", action="store_const", const=True, default=None,
+                        help="Show each distinct file content once; later copies refer to the first")
+    parser.add_argument("--source", choices=["filesystem", "git-index"],
+                        help="List the filesystem, or the files tracked in the git index")
+    parser.add_argument("--untracked", action="store_const", const=True, default=None,
+                        help="With --source git-index, also list untracked files that are not ignored")
+    parser.add_argument("--format", choices=["auto", "text", "markdown", "json"],
+                        help="Report format; auto picks Markdown for .md and JSON for .json outputs")
+    parser.add_argument("--compress-threads", type=int,
+                        help="Threads compressing .gz outputs (a multi-member gzip stream)")
+    parser.add_argument("--no-cache", dest="cache", action="store_const", const=False, default=None,
+                        help="Do not read or write the scan cache")
+    parser.add_argument("--rebuild-cache", action="store_const", const=True, default=None,
+                        help="Discard the scan cache and build it again")
+    parser.add_argument("--stats", nargs='?', const="table", choices=["table", "json"],
+                        help="Print scan statistics (phase times, counts, slowest paths) to stderr")
+    parser.add_argument("--profile-out",
+                        help="Write a cProfile dump of the run to this file")
+    parser.add_argument("--poll", action="store_const", const=True, default=None,
+                        help="With watch, poll mtimes instead of using inotify")
+    parser.add_argument("--interval", type=float,
+                        help="With watch, seconds between polls")
     parser.add_argument("--verbose", action="store_const", const=True, default=None,
                         help="Show detailed error messages")
-    
-    return parser.parse_args()
 
-def run_profile(profile_name, config_handler, cli_args):
-    """Run a single profile with the given configuration"""
+    argv = sys.argv[1:]
+    watch = argv[:1] == ['watch']
+    args = parser.parse_args(argv[1:] if watch else argv)
+    args.watch = True if watch else None
+    return args
+
+def build_profile_config(profile_name, config_handler, cli_args):
+    """Merge a profile from the config file with the command-line arguments"""
     base_config = config_handler.get_profile(profile_name)
     
     # Convert cli_args to dictionary and filter out None values
@@ -75,21 +123,116 @@ def run_profile(profile_name, config_handler, cli_args):
     config = {**base_config, **cli_args_dict}
     
     # Special handling for list fields
-    for list_field in ['exclude', 'include', 'gitignore_paths']:
+    for list_field in ['exclude', 'include', 'gitignore_paths', 'priority_patterns']:
         if list_field in cli_args_dict and list_field in base_config:
             config[list_field] = base_config[list_field] + (cli_args_dict[list_field] or [])
-    
+
+    return config
+
+def run_profile(profile_name, config_handler, cli_args):
+    """Run a single profile with the given configuration"""
+    from dirai.output import open_output, write_chunks, write_lines
+    from dirai.render import get_renderer, output_format
+    from dirai.scanner import DirectoryScanner
+
+    config = build_profile_config(profile_name, config_handler, cli_args)
     scanner = DirectoryScanner(config)
-    structure = scanner.generate_structure(config['directory'])
-    
+    report_format = output_format(config)
+
+    token_budget = config.get('token_budget')
     output_file = config.get('output', 'project_structure.txt')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for line in structure:
-            f.write(line + '\n')
+    with open_output(output_file, config.get('compress_threads') or 1) as f:
+        if report_format == 'text' and not token_budget:
+            write_chunks(f, scanner.iter_structure_bytes(config['directory']))
+        else:
+            renderer = get_renderer(report_format)
+            tree = scanner.build_tree(config['directory'])
+            if token_budget:
+                from dirai.budget import pack_tree
+                packing = pack_tree(tree, token_budget, config, renderer)
+                if packing['skeleton_tokens'] > token_budget:
+                    print(f"The tree alone takes about {packing['skeleton_tokens']} tokens, "
+                          f"over the budget of {token_budget}; all file contents omitted", file=sys.stderr)
+                elif config.get('verbose'):
+                    print(f"Token budget: about {packing['tokens']} of {token_budget} tokens used, "
+                          f"{packing['files_kept']} file contents kept, {packing['files_omitted']} omitted",
+                          file=sys.stderr)
+            write_lines(f, renderer(tree))
     
     if config.get('output') != '-':
         print(f"DIRAI report generated: {output_file}")
 
+    if scanner.stats is not None:
+        if config.get('stats') == 'json':
+            import json
+            print(json.dumps({'profile': profile_name, **scanner.stats.to_dict(), 'cache': scanner.cache_stats}),
+                  file=sys.stderr)
+        else:
+            print(f"Stats for profile '{profile_name}':\n{scanner.stats.format_table()}", file=sys.stderr)
+
+    if (config.get('verbose') or config.get('stats') == 'table') and scanner.cache_stats:
+        stats = scanner.cache_stats
+        print(f"Cache: {stats['listing_hits']} listing hits, {stats['listing_misses']} misses; "
+              f"{stats['content_hits']} content hits, {stats['content_misses']} misses", file=sys.stderr)
+
+def run_profiles(profile_names, config_handler, cli_args):
+    """
+    Run several profiles, sharing a single directory walk when possible.
+
+    Profiles are walked together when they scan the same directory from
+    the same source and each writes a text report (without a token budget) to its own file;
+    otherwise, or when collecting --stats or rendering contents on a process
+    pool (--content-processes), they run one after another.
+    """
+    from dirai.render import output_format
+
+    configs = [build_profile_config(name, config_handler, cli_args) for name in profile_names]
+    output_files = [config.get('output', 'project_structure.txt') for config in configs]
+    directories = {os.path.realpath(config['directory']) for config in configs}
+    sources = {(config.get('source', 'filesystem'), bool(config.get('untracked'))) for config in configs}
+
+    if (len(configs) < 2 or len(directories) > 1 or len(sources) > 1 or '-' in output_files
+            or len(set(output_files)) < len(output_files) or cli_args.stats
+            or any(output_format(config) != 'text' or config.get('token_budget') for config in configs)
+            or any((config.get('content_processes') or 1) > 1 and config.get('show_content') for config in configs)):
+        for profile_name in profile_names:
+            run_profile(profile_name, config_handler, cli_args)
+        return
+
+    from contextlib import ExitStack
+    from dirai.multi import MultiProfileScanner, ProfileOutput
+    from dirai.output import open_output
+    from dirai.scanner import DirectoryScanner
+
+    with ExitStack() as stack:
+        outputs = []
+        for config, output_file in zip(configs, output_files):
+            f = stack.enter_context(open_output(output_file, config.get('compress_threads') or 1))
+            outputs.append(ProfileOutput(DirectoryScanner(config), lambda line, f=f: f.write(line + '\n')))
+        MultiProfileScanner(outputs).scan(configs[0]['directory'])
+
+    for output_file in output_files:
+        print(f"DIRAI report generated: {output_file}")
+
+def run_watch(profile_names, config_handler, cli_args):
+    """Write the reports of the profiles, then keep them up to date until interrupted"""
+    from dirai.watch import POLL_INTERVAL, ReportWatch, watch
+
+    reports = []
+    for profile_name in profile_names:
+        config = build_profile_config(profile_name, config_handler, cli_args)
+        reports.append(ReportWatch(config, config['directory'], config.get('output', 'project_structure.txt')))
+
+    def on_update(report, seconds):
+        if report.output_file != '-':
+            print(f"DIRAI report updated: {report.output_file} ({seconds * 1000:.1f} ms)", file=sys.stderr)
+
+    print("Watching for changes, press Ctrl+C to stop", file=sys.stderr)
+    try:
+        watch(reports, interval=cli_args.interval or POLL_INTERVAL, poll=bool(cli_args.poll), on_update=on_update)
+    except KeyboardInterrupt:
+        pass
+
 if __name__ == "__main__":
     try:
         main()
@@ -1,8 +1,66 @@
+import hashlib
+import marshal
+import os
 import sys
 from pathlib import Path
-import yaml
 from dirai.constants import CONFIG_FILE_NAME, DEFAULT_CONFIG
 
+# Bump when the layout of config snapshots changes
+SNAPSHOT_VERSION = 1
+
+
+def snapshot_dir():
+    """Where parsed config snapshots are kept ($XDG_CACHE_HOME/dirai)"""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'dirai')
+
+
+class ConfigSnapshot:
+    """
+    The parsed content of a config file, stored with marshal and reused
+    while the file's size, mtime and inode are unchanged, so most runs
+    neither import yaml nor parse the file.
+    """
+
+    def __init__(self, config_path):
+        self.config_path = os.path.abspath(config_path)
+        name = hashlib.sha1(os.fsencode(self.config_path)).hexdigest()
+        self.path = os.path.join(snapshot_dir(), f"config-{name}.marshal")
+
+    def _key(self):
+        st = os.stat(self.config_path)
+        return (SNAPSHOT_VERSION, self.config_path, st.st_size, st.st_mtime_ns, st.st_ino)
+
+    def load(self):
+        """The parsed config, or None if there is no current snapshot"""
+        try:
+            with open(self.path, 'rb') as f:
+                key, data = marshal.load(f)
+            return data if key == self._key() else None
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def store(self, data):
+        """Save parsed config; silently skipped where the cache is not writable"""
+        try:
+            key = self._key()
+            payload = marshal.dumps((key, data))
+        except (OSError, ValueError):
+            # Values marshal cannot hold (YAML timestamps) are parsed every time
+            return
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temporary, 'wb') as f:
+                f.write(payload)
+            os.replace(temporary, self.path)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+
+
 class DiraiConfig:
     def __init__(self):
         self.config_path = self._find_config()
@@ -27,9 +85,14 @@ class DiraiConfig:
             return DEFAULT_CONFIG
             
         try:
-            with open(self.config_path, 'r') as f:
-                user_config = yaml.safe_load(f) or {}
-                return self._merge_configs(DEFAULT_CONFIG, user_config)
+            snapshot = ConfigSnapshot(self.config_path)
+            user_config = snapshot.load()
+            if user_config is None:
+                import yaml
+                with open(self.config_path, 'r') as f:
+                    user_config = yaml.safe_load(f) or {}
+                snapshot.store(user_config)
+            return self._merge_configs(DEFAULT_CONFIG, user_config)
         except Exception as e:
             print(f"Error loading config: {e}", file=sys.stderr)
             return DEFAULT_CONFIG
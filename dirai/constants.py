@@ -1,4 +1,5 @@
 CONFIG_FILE_NAME = ".dirai.yaml"
+CACHE_DIR_NAME = ".dirai_cache"
 DEFAULT_CONFIG = {
     "default": {
         "exclude": [],
@@ -9,9 +10,25 @@ DEFAULT_CONFIG = {
         "output": "structure.txt",
         "max_depth": None,
         "follow_symlinks": False,
+        "repeated_dirs": "walk",
         "gitignore_paths": [],
         "max_lines": -1,
         "include_vcs": False,
+        "prune_empty_dirs": False,
+        "workers": 1,
+        "content_processes": 1,
+        "cache": True,
+        "decode_errors": "replace",
+        "max_bytes_per_file": None,
+        "max_total_content_bytes": None,
+        "source": "filesystem",
+        "untracked": False,
+        "format": "auto",
+        "compress_threads": 1,
+        "dedupe_content": False,
+        "token_budget": None,
+        "token_priority": {"depth": 1.0, "recency": 1.0, "size": 1.0, "patterns": 2.0},
+        "priority_patterns": [],
         "ignore_variables": [],
         "redaction_patterns": [
             r'api[_-]?key',
@@ -0,0 +1,142 @@
+# content.py
+"""
+DIRAI File Content Reading
+
+Every file shown with its content is opened once, in binary mode. The
+first block is sniffed for binary data; text is then split into lines
+(universal newlines, like text-mode open) and decoded line by line.
+Small files are read in one call, large files are memory-mapped so only
+the pages that are actually displayed get read. With a byte limit, no more
+than limit + 1 bytes are read, even from a file that is one long line.
+"""
+
+import mmap
+
+SNIFF_SIZE = 1024
+MMAP_THRESHOLD = 1 << 20
+MMAP_BLOCK_SIZE = 1 << 18
+
+# Leading bytes of common binary formats that may not contain a NUL byte
+# in their first block
+BINARY_SIGNATURES = (
+    b'\x89PNG\r\n\x1a\n',       # PNG
+    b'\xff\xd8\xff',            # JPEG
+    b'GIF87a', b'GIF89a',       # GIF
+    b'PK\x03\x04',              # ZIP, JAR, DOCX, ...
+    b'\x1f\x8b',                # gzip
+    b'\xfd7zXZ\x00',            # xz
+    b"7z\xbc\xaf'\x1c",         # 7-Zip
+    b'\x7fELF',                 # ELF
+    b'\xca\xfe\xba\xbe',        # Java class, Mach-O fat binary
+    b'SQLite format 3\x00',     # SQLite
+    b'%PDF-',                   # PDF
+)
+
+
+def looks_binary(head: bytes) -> bool:
+    """Check the first block of a file for NUL bytes or a binary signature"""
+    if b'\x00' in head:
+        return True
+    if head.startswith(BINARY_SIGNATURES):
+        return True
+    # bzip2: 'BZh', block size digit, then the block magic
+    return head[:3] == b'BZh' and head[4:10] == b'1AY&SY'
+
+
+def _char_end(data, end):
+    """end, moved past up to 3 UTF-8 continuation bytes of a character it cuts"""
+    stop = min(end + 3, len(data))
+    while end < stop and data[end] & 0xC0 == 0x80:
+        end += 1
+    return min(end, len(data))
+
+
+class TextContent:
+    """
+    Iterable over the decoded lines of a text file, line endings included.
+
+    Each line is decoded on its own, so an invalid byte only affects the
+    line containing it. With a limit, the content ends after limit + 1
+    bytes, possibly in the middle of a line: one byte more than a caller
+    counting bytes may show, so it can tell the file goes on. A UTF-8
+    character cut by the limit is kept whole.
+    """
+
+    def __init__(self, f, errors='strict', limit=None):
+        self._file = f
+        self._errors = errors
+        self._map = None
+        self._limit = None if limit is None else limit + 1
+        self.bytes_read = 0
+        size = f.seek(0, 2)
+        f.seek(0)
+        if size >= MMAP_THRESHOLD:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __iter__(self):
+        errors = self._errors
+        for block in self.iter_blocks():
+            for raw in block.splitlines(True):
+                yield raw.decode('utf-8', errors)
+
+    def iter_blocks(self):
+        """
+        Yield the raw bytes of the file in blocks that end at line ends
+        (the whole file when it is not memory-mapped), skipping empty ones
+        """
+        if self._map is None:
+            if self._limit is None:
+                data = self._file.read()
+            else:
+                data = self._file.read(self._limit + 3)
+                data = data[:_char_end(data, self._limit)]
+            self.bytes_read = len(data)
+            if data:
+                yield data
+            return
+
+        # Split block by block so lines are cut at C speed, and only the
+        # pages of the blocks that are consumed get read
+        data = self._map
+        size = len(data) if self._limit is None else _char_end(data, self._limit)
+        pos = 0
+        while pos < size:
+            end = data.rfind(b'\n', pos, min(pos + MMAP_BLOCK_SIZE, size)) + 1
+            if end <= pos:
+                # No newline in this block: extend to the end of the line
+                end = data.find(b'\n', pos + MMAP_BLOCK_SIZE, size) + 1 or size
+            self.bytes_read += end - pos
+            yield data[pos:end]
+            pos = end
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_text(file_path, errors='strict', limit=None):
+    """
+    Open a file for content display.
+
+    Returns None for binary files, otherwise a TextContent that decodes
+    UTF-8 with the given error strategy ('strict', 'replace', 'ignore',
+    'backslashreplace', ...) and reads at most limit + 1 bytes.
+    """
+    f = open(file_path, 'rb')
+    try:
+        head = f.read(SNIFF_SIZE)
+        if looks_binary(head):
+            f.close()
+            return None
+        return TextContent(f, errors, limit)
+    except BaseException:
+        f.close()
+        raise
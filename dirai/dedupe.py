@@ -0,0 +1,71 @@
+# dedupe.py
+"""
+DIRAI Content Deduplication
+
+Finds files whose content already appeared earlier in a report, so it is
+rendered once and later copies become a "[same content as path]"
+reference. Hardlinks are recognised by (st_dev, st_ino) without reading
+them. Other files are only hashed once a second file of the same size
+shows up, so a tree without duplicates costs one dict lookup per file.
+"""
+
+import hashlib
+
+# Smaller files render about as short as the reference would
+DEDUPE_MIN_SIZE = 64
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def content_digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(HASH_BLOCK_SIZE)
+            if not block:
+                return digest.digest()
+            digest.update(block)
+
+
+class DuplicateFinder:
+    def __init__(self, min_size=DEDUPE_MIN_SIZE):
+        self.min_size = min_size
+        self._inodes = {}
+        # size -> (path, rel_path) of the only file of that size seen so far;
+        # None once files of that size are tracked by digest
+        self._sizes = {}
+        self._digests = {}
+
+    def first_copy(self, path, rel_path, stat):
+        """
+        Return the rel_path of an earlier file with the same content, or
+        None after recording this file as the first of its content.
+        """
+        size = stat.st_size
+        if size < self.min_size:
+            return None
+
+        if stat.st_nlink > 1:
+            inode = (stat.st_dev, stat.st_ino)
+            first = self._inodes.get(inode)
+            if first is not None:
+                return first
+            self._inodes[inode] = rel_path
+
+        if size not in self._sizes:
+            self._sizes[size] = (path, rel_path)
+            return None
+
+        try:
+            single = self._sizes[size]
+            if single is not None:
+                self._sizes[size] = None
+                self._digests.setdefault((size, content_digest(single[0])), single[1])
+            key = (size, content_digest(path))
+        except OSError:
+            # Unreadable files are rendered (with their error) as usual
+            return None
+        first = self._digests.get(key)
+        if first is None:
+            self._digests[key] = rel_path
+        return first
@@ -0,0 +1,75 @@
+# gitignore.py
+"""
+DIRAI Gitignore Matching
+
+Applies .gitignore files the way git does. The rules of a .gitignore are
+relative to its own directory: patterns with a slash are anchored there,
+patterns without one match at any depth below it, and '!' re-includes.
+The deepest .gitignore with a matching pattern decides, and within a file
+the last matching pattern wins; files listed in gitignore_paths and
+.git/info/exclude sit below the root .gitignore.
+
+Rules are compiled once per distinct file content, so identical
+.gitignore files across a tree share one compiled index.
+"""
+
+import os
+from functools import lru_cache
+
+import pathspec
+
+from dirai.matching import PatternIndex
+
+
+def parse_gitignore(data):
+    """Split the raw bytes of a gitignore file into pattern lines"""
+    text = data.decode('utf-8', 'surrogateescape')
+    if text.startswith('\ufeff'):
+        text = text[1:]
+    return tuple(line[:-1] if line.endswith('\r') else line for line in text.split('\n'))
+
+
+@lru_cache(maxsize=256)
+def compile_rules(lines):
+    """Compile gitignore lines, or return None if they hold no patterns"""
+    index = PatternIndex(pathspec.PathSpec.from_lines('gitwildmatch', lines).patterns)
+    return index or None
+
+
+def read_rules(path):
+    """Read and compile a gitignore file; None if it has no patterns"""
+    with open(path, 'rb') as f:
+        return compile_rules(parse_gitignore(f.read()))
+
+
+class GitignoreMatcher:
+    """
+    The gitignore rules in effect for one directory: the rules of its own
+    .gitignore (if any) on top of its parent directory's matcher.
+    """
+    __slots__ = ('rel_dir', 'rules', 'parent', '_strip')
+
+    def __init__(self, rel_dir, rules, parent=None):
+        self.rel_dir = rel_dir.replace(os.sep, '/') if os.sep != '/' else rel_dir
+        self.rules = rules
+        self.parent = parent
+        self._strip = len(self.rel_dir) + 1 if rel_dir else 0
+
+    def stack(self, rel_dir, rules):
+        """Matcher for a subdirectory with the given rules, or self without rules"""
+        if rules is None:
+            return self
+        return GitignoreMatcher(rel_dir, rules, self)
+
+    def is_ignored(self, rel_path, is_dir=False):
+        """Check a path relative to the scan root (no trailing slash)"""
+        if os.sep != '/':
+            rel_path = rel_path.replace(os.sep, '/')
+        node = self
+        while node is not None:
+            if node.rules is not None and (not node.rel_dir or rel_path.startswith(node.rel_dir + '/')):
+                decision = node.rules.check(rel_path[node._strip:], is_dir)
+                if decision is not None:
+                    return decision
+            node = node.parent
+        return False
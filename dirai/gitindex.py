@@ -0,0 +1,200 @@
+# gitindex.py
+"""
+DIRAI Git Index Reader
+
+Reads the list of tracked paths straight from a repository's index file
+(.git/index, versions 2 to 4) without running git, and serves it as
+directory listings so a scan of a checkout can skip listing the
+filesystem and evaluating .gitignore files.
+"""
+
+import hashlib
+import os
+import re
+import struct
+
+INDEX_SIGNATURE = b'DIRC'
+
+# Object modes stored in index entries
+MODE_SYMLINK = 0o120000
+MODE_GITLINK = 0o160000
+MODE_DIRECTORY = 0o040000
+
+_FLAG_EXTENDED = 0x4000
+_FLAG_STAGE = 0x3000
+_FLAG_NAME_LENGTH = 0x0fff
+_STAT_FIELDS = struct.Struct('>10I')
+
+
+class GitIndexError(ValueError):
+    pass
+
+
+def find_git_dir(directory):
+    """
+    Find the git directory of the repository containing directory.
+
+    Returns (git_dir, worktree_root), or None if directory is not inside a
+    git checkout. Follows 'gitdir:' files used by worktrees and submodules.
+    """
+    current = os.path.abspath(directory)
+    while True:
+        dot_git = os.path.join(current, '.git')
+        if os.path.isdir(dot_git):
+            return dot_git, current
+        if os.path.isfile(dot_git):
+            with open(dot_git, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+            if content.startswith('gitdir:'):
+                git_dir = content[len('gitdir:'):].strip()
+                return os.path.normpath(os.path.join(current, git_dir)), current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def _hash_size(git_dir):
+    """20 for SHA-1 repositories, 32 for SHA-256 ones"""
+    for config_dir in (git_dir, _common_dir(git_dir)):
+        try:
+            with open(os.path.join(config_dir, 'config'), 'r', encoding='utf-8') as f:
+                if re.search(r'^\s*objectformat\s*=\s*sha256\s*$', f.read(), re.MULTILINE | re.IGNORECASE):
+                    return 32
+        except OSError:
+            continue
+    return 20
+
+
+def _common_dir(git_dir):
+    try:
+        with open(os.path.join(git_dir, 'commondir'), 'r', encoding='utf-8') as f:
+            return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
+        return git_dir
+
+
+def _varint(data, pos):
+    """Decode the offset varint used by index version 4"""
+    byte = data[pos]
+    pos += 1
+    value = byte & 0x7f
+    while byte & 0x80:
+        byte = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (byte & 0x7f)
+    return value, pos
+
+
+def parse_index(data, hash_size=20):
+    """
+    Parse the bytes of an index file into a list of (path, mode) pairs in
+    index order. Merge conflict stages of one path are reported once.
+    """
+    if len(data) < 12 + hash_size or data[:4] != INDEX_SIGNATURE:
+        raise GitIndexError("not a git index file")
+    version, count = struct.unpack_from('>II', data, 4)
+    if version not in (2, 3, 4):
+        raise GitIndexError(f"unsupported index version {version}")
+    checksum = data[-hash_size:]
+    # index.skipHash (the default with feature.manyFiles since git 2.40) writes a zero checksum
+    if checksum != bytes(hash_size):
+        if hashlib.new('sha1' if hash_size == 20 else 'sha256', data[:-hash_size]).digest() != checksum:
+            raise GitIndexError("index checksum mismatch")
+
+    entries = []
+    pos = 12
+    previous = b''
+    fixed_size = _STAT_FIELDS.size + hash_size + 2
+    for _ in range(count):
+        start = pos
+        mode = _STAT_FIELDS.unpack_from(data, pos)[6]
+        pos += fixed_size
+        flags = struct.unpack_from('>H', data, pos - 2)[0]
+        if flags & _FLAG_EXTENDED:
+            pos += 2
+
+        if version == 4:
+            strip, pos = _varint(data, pos)
+            end = data.index(b'\0', pos)
+            path = previous[:len(previous) - strip] + data[pos:end]
+            pos = end + 1
+        else:
+            name_length = flags & _FLAG_NAME_LENGTH
+            if name_length < _FLAG_NAME_LENGTH:
+                end = pos + name_length
+            else:
+                end = data.index(b'\0', pos)
+            path = data[pos:end]
+            # Entries are NUL padded to a multiple of eight bytes
+            pos = start + ((end - start + 8) & ~7)
+
+        if not (flags & _FLAG_STAGE) or path != previous:
+            entries.append((path.decode('utf-8', 'surrogateescape'), mode))
+        previous = path
+    return entries
+
+
+class GitIndexTree:
+    """Directory listings built from the tracked paths of a git index"""
+
+    def __init__(self, entries, prefix=''):
+        """entries: (path, mode) pairs; prefix: subdirectory of the worktree being scanned"""
+        self.listings = {'': []}
+        self.tracked = set()
+        self.tracked_dirs = {''}
+        if prefix:
+            prefix = prefix.rstrip('/') + '/'
+
+        for path, mode in entries:
+            if prefix:
+                if not path.startswith(prefix):
+                    continue
+                path = path[len(prefix):]
+            parts = path.split('/')
+            parent = ''
+            for name in parts[:-1]:
+                rel_dir = f"{parent}{os.sep}{name}" if parent else name
+                if rel_dir not in self.tracked_dirs:
+                    self.tracked_dirs.add(rel_dir)
+                    self.listings[parent].append((name, False, True, False))
+                    self.listings[rel_dir] = []
+                parent = rel_dir
+
+            rel_path = f"{parent}{os.sep}{parts[-1]}" if parent else parts[-1]
+            object_type = mode & 0o170000
+            if object_type in (MODE_GITLINK, MODE_DIRECTORY):
+                # Submodules and sparse directories: shown, not listed
+                if rel_path not in self.tracked_dirs:
+                    self.tracked_dirs.add(rel_path)
+                    self.listings[parent].append((parts[-1], False, True, False))
+                    self.listings[rel_path] = []
+                continue
+
+            self.tracked.add(rel_path)
+            is_link = object_type == MODE_SYMLINK
+            self.listings[parent].append((parts[-1], is_link, False, not is_link))
+
+    @classmethod
+    def load(cls, directory):
+        """Read the index of the checkout containing directory"""
+        found = find_git_dir(directory)
+        if found is None:
+            raise GitIndexError(f"{directory} is not inside a git checkout")
+        git_dir, worktree = found
+        try:
+            with open(os.path.join(git_dir, 'index'), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            # A repository without any staged file yet
+            return cls([])
+        prefix = os.path.relpath(os.path.abspath(directory), worktree)
+        prefix = '' if prefix == os.curdir else prefix.replace(os.sep, '/')
+        return cls(parse_index(data, _hash_size(git_dir)), prefix)
+
+    def listing(self, rel_dir):
+        """(name, is_link, is_dir, is_file) records of a directory, or None if untracked"""
+        return self.listings.get(rel_dir)
+
+    def is_tracked(self, rel_path, is_dir=False):
+        return rel_path in (self.tracked_dirs if is_dir else self.tracked)
@@ -0,0 +1,228 @@
+# matching.py
+"""
+DIRAI Pattern Index
+
+Answers PathSpec.match_file for gitwildmatch patterns without trying every
+pattern in turn. Patterns that are a plain name ('node_modules',
+'.env/') or a plain extension ('*.pyc') go into hash tables keyed by path
+component or suffix. Every other pattern keeps its pathspec regex, bucketed
+by the literal directory it is anchored to, and a bucket's regexes are
+merged into one for a quick reject. The last matching pattern still wins,
+so negations ('!keep.log') behave exactly as in pathspec.
+
+Patterns are classified by the regex pathspec itself generated for them,
+so anything not recognised falls back to that regex.
+
+check() can also match directories the way git does: the path is given
+without a trailing slash and directory-only patterns ('build/') still
+apply, while 'dir/*' does not match 'dir' itself.
+"""
+
+import os
+import re
+
+import pathspec
+
+# Merge the regexes of a bucket once it holds this many patterns
+MERGE_THRESHOLD = 4
+
+_PROBE = 'dirairprobe'
+_REGEX_META = set('.^$*+?{}[]\\|()')
+_QUANTIFIERS = set('*+?{')
+
+
+def _template(line):
+    """Split pathspec's regex for a probe pattern around the probe literal"""
+    regex = pathspec.PathSpec.from_lines('gitwildmatch', [line]).patterns[0].regex.pattern
+    head, _, tail = regex.partition(_PROBE)
+    return head, tail
+
+
+# (head, tail, kind, dir_only): regex sources of name and extension patterns
+_TEMPLATES = [
+    (*_template(_PROBE), 'name', False),
+    (*_template(_PROBE + '/'), 'name', True),
+    (*_template('*.' + _PROBE), 'extension', False),
+    (*_template('*.' + _PROBE + '/'), 'extension', True),
+]
+
+
+def _unescape(source):
+    """Return the literal a regex fragment matches, or None if it is not a plain literal"""
+    literal = re.sub(r'\\(.)', r'\1', source)
+    if not literal or '/' in literal or '\n' in literal or re.escape(literal) != source:
+        return None
+    return literal
+
+
+def _is_dir_only(regex):
+    return regex.endswith('(?P<ps_d>/)')
+
+
+def _classify(regex):
+    for head, tail, kind, dir_only in _TEMPLATES:
+        if len(regex) > len(head) + len(tail) and regex.startswith(head) and regex.endswith(tail):
+            literal = _unescape(regex[len(head):len(regex) - len(tail)])
+            if literal is not None:
+                return kind, literal, dir_only
+    return None
+
+
+def _literal_prefix(regex):
+    """The literal text every path matched by an anchored regex starts with"""
+    if not regex.startswith('^'):
+        return ''
+    prefix = []
+    pos = 1
+    while pos < len(regex):
+        char = regex[pos]
+        if char == '\\' and pos + 1 < len(regex) and not regex[pos + 1].isalnum():
+            prefix.append(regex[pos + 1])
+            pos += 2
+        elif char in _REGEX_META:
+            if char in _QUANTIFIERS and prefix:
+                # The last literal character is optional
+                prefix.pop()
+            break
+        else:
+            prefix.append(char)
+            pos += 1
+    return ''.join(prefix)
+
+
+class _Bucket:
+    """Regex patterns sharing a root directory, newest first"""
+    __slots__ = ('rules', 'merged')
+
+    def __init__(self):
+        self.rules = []
+        self.merged = None
+
+    def finish(self):
+        self.rules.reverse()
+        if len(self.rules) >= MERGE_THRESHOLD:
+            self.merged = re.compile('|'.join(
+                f'(?:{rule[3].pattern.replace("(?P<ps_d>", "(?:")})' for rule in self.rules
+            ))
+
+    def match(self, path, best, directory=False):
+        """Return (index, include) of the newest rule above best matching path"""
+        dir_path = path + '/' if directory else path
+        if self.merged is not None and self.merged.search(dir_path) is None:
+            return None
+        for index, include, prefix, regex, dir_only in self.rules:
+            if index <= best:
+                return None
+            candidate = dir_path if dir_only else path
+            if candidate.startswith(prefix) and regex.search(candidate) is not None:
+                return index, include
+        return None
+
+
+class PatternIndex:
+    """Last-match-wins lookup over the patterns of one PathSpec"""
+
+    def __init__(self, patterns):
+        self.patterns = [pattern for pattern in patterns if pattern.include is not None]
+        self.names = {}
+        self.extensions = {}
+        self.buckets = {}
+        self.unrooted = _Bucket()
+
+        for index, pattern in enumerate(self.patterns):
+            source = pattern.regex.pattern
+            classified = _classify(source)
+            if classified is not None:
+                kind, literal, dir_only = classified
+                table = self.names if kind == 'name' else self.extensions
+                table.setdefault(literal, []).append((index, pattern.include, dir_only))
+                continue
+
+            prefix = _literal_prefix(source)
+            if '/' in prefix:
+                bucket = self.buckets.setdefault(prefix.split('/', 1)[0], _Bucket())
+            else:
+                bucket = self.unrooted
+            bucket.rules.append((index, pattern.include, prefix, pattern.regex, _is_dir_only(source)))
+
+        for rules in (*self.names.values(), *self.extensions.values()):
+            rules.reverse()
+        for bucket in (*self.buckets.values(), self.unrooted):
+            bucket.finish()
+
+    def __bool__(self):
+        return bool(self.patterns)
+
+    def _match_slow(self, path, directory):
+        for pattern in reversed(self.patterns):
+            candidate = path + '/' if directory and _is_dir_only(pattern.regex.pattern) else path
+            if pattern.regex.search(candidate) is not None:
+                return pattern.include
+        return None
+
+    def match_file(self, path):
+        """Same result as PathSpec.match_file for the patterns of the index"""
+        return bool(self.check(path))
+
+    def check(self, path, directory=False):
+        """
+        Return the include flag of the last pattern matching path, or None
+        if no pattern matches. With directory=True, path names a directory
+        (without trailing slash) and directory-only patterns may match it.
+        """
+        if os.sep != '/':
+            path = path.replace(os.sep, '/')
+        if path.startswith('/'):
+            path = path[1:]
+        elif path.startswith('./'):
+            path = path[2:]
+        if '\n' in path:
+            # '.' and '$' treat newlines specially; keep pathspec's exact behaviour
+            return self._match_slow(path, directory)
+
+        best = -1
+        include = None
+        parts = path.split('/')
+        last = len(parts) - 1
+
+        if self.names:
+            names = self.names
+            for position, part in enumerate(parts):
+                rules = names.get(part)
+                if rules:
+                    for index, rule_include, dir_only in rules:
+                        if index <= best:
+                            break
+                        if not dir_only or position < last or directory:
+                            best, include = index, rule_include
+                            break
+
+        if self.extensions:
+            extensions = self.extensions
+            for position, part in enumerate(parts):
+                dot = part.find('.')
+                while dot != -1:
+                    rules = extensions.get(part[dot + 1:])
+                    if rules:
+                        for index, rule_include, dir_only in rules:
+                            if index <= best:
+                                break
+                            if not dir_only or position < last or directory:
+                                best, include = index, rule_include
+                                break
+                    dot = part.find('.', dot + 1)
+
+        bucket = self.buckets.get(parts[0]) if self.buckets else None
+        for candidate in (bucket, self.unrooted):
+            if candidate is not None and candidate.rules:
+                found = candidate.match(path, best, directory)
+                if found is not None:
+                    best, include = found
+
+        return include
+
+
+def compile_spec(spec):
+    """Build the index of a PathSpec, or None for an empty spec"""
+    index = PatternIndex(spec.patterns) if spec else None
+    return index or None
@@ -0,0 +1,313 @@
+# multi.py
+"""
+DIRAI Multi-Profile Scanning
+
+Walks a directory once on behalf of several profiles. Every directory is
+listed once, every .gitignore and file is read once, and each profile
+applies its own rules to the shared listing and writes its own report.
+Profiles using the scan cache share one database: listings are cached
+once, rendered content per profile.
+"""
+
+import os
+from pathlib import Path
+
+from dirai.cache import ScanCache
+from dirai.content import open_text
+
+# Lines a profile with max_lines == -1 may consume before its safety stop
+INFINITE_MODE_LINES = 1000002
+
+
+class ProfileOutput:
+    """
+    The report of one profile during a shared walk.
+
+    Directory lines can be deferred until the directory turns out to have
+    visible children (prune_empty_dirs); writing any line flushes them.
+    """
+
+    def __init__(self, scanner, write):
+        self.scanner = scanner
+        self._write = write
+        self.pending = []
+
+    def write(self, line):
+        if self.pending:
+            for pending_line in self.pending:
+                self._write(pending_line)
+            self.pending.clear()
+        self._write(line)
+
+    def defer(self, line):
+        self.pending.append(line)
+        return len(self.pending)
+
+    def drop_deferred(self, mark):
+        """Drop a deferred line (and anything after it) that was never flushed; True if it was dropped"""
+        if len(self.pending) >= mark:
+            del self.pending[mark - 1:]
+            return True
+        return False
+
+
+class _Branch:
+    """Per-directory state of one profile: its prefix and gitignore rules"""
+    __slots__ = ('output', 'prefix', 'gitignore')
+
+    def __init__(self, output, prefix, gitignore):
+        self.output = output
+        self.prefix = prefix
+        self.gitignore = gitignore
+
+
+class MultiProfileScanner:
+    def __init__(self, outputs):
+        self.outputs = outputs
+
+    def scan(self, directory):
+        base_dir = Path(directory).resolve()
+        branches = []
+        for output in self.outputs:
+            scanner = output.scanner
+            scanner._prepare(base_dir)
+            scanner._content_bytes_left = scanner.config.get('max_total_content_bytes') or None
+            output.write(f"└── {base_dir.name}/")
+            branches.append(_Branch(output, '', scanner.gitignore))
+
+        cache = self._open_cache(base_dir)
+        try:
+            self._walk(base_dir, '', 0, branches)
+        finally:
+            if cache is not None:
+                cache.close()
+                for output in self.outputs:
+                    scanner = output.scanner
+                    if scanner._cache is not None:
+                        scanner.cache_stats = scanner._cache.stats
+                        scanner._cache = None
+
+    def _open_cache(self, base_dir):
+        """Open the scan cache once and give each profile using it a view for its content"""
+        scanners = [output.scanner for output in self.outputs if output.scanner.config.get('cache', False)]
+        if not scanners:
+            return None
+        cache = ScanCache.open(base_dir, scanners[0].config)
+        if cache is None:
+            return None
+        for scanner in scanners:
+            scanner._cache = cache if scanner is scanners[0] else cache.for_profile(scanner.config)
+        return cache
+
+    def _walk(self, current_dir, rel_dir, depth, branches):
+        active = []
+        for branch in branches:
+            scanner = branch.output.scanner
+            if scanner._skips_listing(rel_dir, depth):
+                scanner._hidden += 1
+                continue
+            active.append(branch)
+        if not active:
+            return
+
+        # A profile using the cache lists the directory for all of them
+        lister = next((branch.output.scanner for branch in active if branch.output.scanner._cache is not None),
+                      active[0].output.scanner)
+        try:
+            entries = lister._scan_entries(current_dir, rel_dir)
+        except (PermissionError, FileNotFoundError):
+            for branch in active:
+                branch.output.write(f"{branch.prefix}└── [Permission denied]")
+            return
+        except Exception as e:
+            for branch in active:
+                branch.output.write(f"{branch.prefix}└── [Error: {str(e)}]")
+            return
+
+        self._load_gitignore(current_dir, rel_dir, entries, active)
+
+        for index, entry in enumerate(entries):
+            is_last = index == len(entries) - 1
+            connector = "└── " if is_last else "├── "
+            child_indent = '    ' if is_last else '│   '
+            target = None
+            descend = []
+            show_content = []
+
+            for branch in active:
+                output = branch.output
+                scanner = output.scanner
+                if scanner._is_excluded(entry.rel_path, entry.is_dir, branch.gitignore):
+                    if scanner._track_walks:
+                        scanner._note_hidden(entry)
+                    continue
+
+                is_link = entry.is_link
+                if is_link and target is None:
+                    try:
+                        target = os.readlink(entry.path)
+                    except Exception as e:
+                        target = f"[Error: {str(e)}]"
+
+                entry_line = scanner._format_entry(
+                    name=entry.name,
+                    is_dir=entry.is_dir and not is_link,
+                    is_link=is_link,
+                    target=target
+                )
+                structure_line = f"{branch.prefix}{connector}{entry_line}"
+
+                if entry.is_dir and (not is_link or scanner.config.get('follow_symlinks')):
+                    identity, note = scanner._enter_directory(entry)
+                    if note is not None:
+                        output.write(structure_line)
+                        output.write(f"{branch.prefix}{child_indent}│   {note}")
+                        continue
+                    descend.append((branch, structure_line, identity))
+
+                else:
+                    output.write(structure_line)
+                    if scanner.config.get('show_content') and entry.is_file:
+                        first = scanner._first_copy(entry)
+                        if first is not None:
+                            output.write(f"{branch.prefix}{child_indent}│   [same content as {first}]")
+                        else:
+                            show_content.append(branch)
+
+            if descend:
+                self._descend(entry, depth, child_indent, descend)
+            if show_content:
+                self._fan_out_content(entry, child_indent, show_content)
+
+    def _load_gitignore(self, current_dir, rel_dir, entries, branches):
+        users = [branch for branch in branches if branch.gitignore is not None]
+        if not users:
+            return
+        rules = users[0].output.scanner._read_directory_gitignore(current_dir, rel_dir, entries)
+        for branch in users:
+            branch.gitignore = branch.output.scanner._stack_gitignore(branch.gitignore, rel_dir, rules)
+
+    def _descend(self, entry, depth, child_indent, descend):
+        children = []
+        walks = []
+        for branch, structure_line, identity in descend:
+            output = branch.output
+            scanner = output.scanner
+            if identity is not None:
+                scanner._active_dirs.add(identity)
+            max_depth = scanner.config.get('max_depth')
+            depth_limited = max_depth and depth + 1 > max_depth
+            mark = None
+            if scanner.config.get('prune_empty_dirs', False) and not depth_limited:
+                mark = output.defer(structure_line)
+            else:
+                output.write(structure_line)
+            walks.append((output, identity, mark, scanner._hidden))
+            children.append(_Branch(output, branch.prefix + child_indent, branch.gitignore))
+
+        try:
+            self._walk(entry.path, entry.rel_path, depth + 1, children)
+        finally:
+            for output, identity, _, _ in walks:
+                if identity is not None:
+                    output.scanner._active_dirs.discard(identity)
+
+        for output, identity, mark, hidden in walks:
+            if mark is not None and output.drop_deferred(mark):
+                continue
+            if identity is not None:
+                output.scanner._finish_walk(identity, entry.rel_path, hidden)
+
+    def _fan_out_content(self, entry, child_indent, branches):
+        """Read a file once and render it for every profile showing it, unless cached"""
+        # Profiles decoding the file differently need their own read
+        by_decoding = {}
+        for branch in branches:
+            store = self._cached_content(entry, branch, child_indent)
+            if store is False:
+                continue
+            decode_errors = branch.output.scanner.config.get('decode_errors', 'strict')
+            by_decoding.setdefault(decode_errors, []).append((branch, store))
+
+        for decode_errors, group in by_decoding.items():
+            self._render_group(entry.path, child_indent, decode_errors, group)
+
+    @staticmethod
+    def _cached_content(entry, branch, child_indent):
+        """
+        Write a profile's cached content of entry and return False, or return
+        the function storing its rendered lines (None without a cache)
+        """
+        scanner = branch.output.scanner
+        cache = scanner._cache
+        if cache is None or scanner._content_bytes_left is not None:
+            return None
+        try:
+            file_stat = entry.stat()
+        except OSError:
+            return None
+
+        content_prefix = branch.prefix + child_indent
+        cached = cache.get_content(entry.rel_path, file_stat)
+        if cached is not None:
+            for line in cached:
+                branch.output.write(content_prefix + line)
+            return False
+
+        def store(lines):
+            cache.put_content(entry.rel_path, file_stat, [line[len(content_prefix):] for line in lines])
+        return store
+
+    def _render_group(self, file_path, child_indent, decode_errors, branches):
+        binary = False
+        error = None
+        lines = []
+        limit = max(self._line_budget(branch.output.scanner) for branch, _ in branches)
+        read_limits = [branch.output.scanner._content_read_limit() for branch, _ in branches]
+        read_limit = None if None in read_limits else max(read_limits)
+        try:
+            text = open_text(file_path, decode_errors, read_limit)
+            if text is None:
+                binary = True
+            else:
+                with text:
+                    for line in text:
+                        lines.append(line)
+                        if len(lines) >= limit:
+                            break
+        except Exception as e:
+            error = e
+
+        for branch, store in branches:
+            output = branch.output
+            content_prefix = branch.prefix + child_indent
+            budget_left = output.scanner._content_bytes_left
+            if budget_left is not None and budget_left <= 0:
+                output.write(f"{content_prefix}│   [Content omitted: report content budget reached]")
+                continue
+            if binary:
+                rendered = [f"{content_prefix}│   [Binary content omitted]"]
+            else:
+                rendered = []
+                try:
+                    rendered.extend(output.scanner._render_content_lines(_replay(lines, error), content_prefix))
+                except Exception as e:
+                    rendered.append(f"{content_prefix}│   [Error reading file: {str(e)}]")
+            for line in rendered:
+                output.write(line)
+            if store is not None:
+                store(rendered)
+
+    @staticmethod
+    def _line_budget(scanner):
+        max_lines = scanner.config.get('max_lines', 50)
+        if max_lines == -1:
+            return INFINITE_MODE_LINES
+        return max_lines + 1
+
+
+def _replay(lines, error):
+    """Yield pre-read lines, then raise the read error where the file stopped"""
+    yield from lines
+    if error is not None:
+        raise error
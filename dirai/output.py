@@ -0,0 +1,198 @@
+# output.py
+"""
+DIRAI Output Writers
+
+Reports go to stdout ('-') or to a file. Files ending in .gz, .xz or .bz2
+are compressed on the fly with the standard library codecs; gzip can
+compress blocks on several threads (ParallelGzipWriter).
+"""
+
+import io
+import os
+import sys
+from collections import deque
+from contextlib import contextmanager
+
+WRITE_BUFFER_SIZE = 1 << 16
+
+# Most buffers handed to one writev() call (IOV_MAX is at least 1024 where writev exists)
+WRITEV_MAX_BUFFERS = 1024
+
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.xz': 'xz', '.bz2': 'bz2'}
+
+# zlib's default level: most of level 9's ratio on repetitive text at a fraction of the time
+GZIP_LEVEL = 6
+
+# Uncompressed bytes per gzip member written by ParallelGzipWriter
+GZIP_BLOCK_SIZE = 1 << 20
+
+
+def compression_format(path):
+    """'gzip', 'xz' or 'bz2' for a compressed file name, otherwise None"""
+    _, extension = os.path.splitext(path)
+    return COMPRESSION_SUFFIXES.get(extension.lower())
+
+
+class ParallelGzipWriter(io.RawIOBase):
+    """
+    Binary writer compressing each block_size bytes into a gzip member of
+    its own on a thread pool (zlib releases the GIL while compressing).
+    Concatenated members are a valid gzip stream (RFC 1952) that gzip -d,
+    zcat and gzip.open() read as one file. Members are written in order,
+    and at most two per thread are held in memory, so a slow disk slows the
+    writer down instead of buffering the report.
+    """
+
+    def __init__(self, raw, threads, block_size=GZIP_BLOCK_SIZE, level=GZIP_LEVEL):
+        from concurrent.futures import ThreadPoolExecutor
+        super().__init__()
+        self._raw = raw
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='dirai-gzip')
+        self._max_pending = 2 * threads
+        self._pending = deque()
+        self._block = bytearray()
+        self._block_size = block_size
+        self._level = level
+        self._members = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._block += data
+        if len(self._block) >= self._block_size:
+            self._submit()
+        return len(data)
+
+    def _submit(self):
+        import gzip
+        block, self._block = self._block, bytearray()
+        self._pending.append(self._executor.submit(gzip.compress, block, self._level, mtime=0))
+        self._members += 1
+        while self._pending and (len(self._pending) > self._max_pending or self._pending[0].done()):
+            self._raw.write(self._pending.popleft().result())
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            # An empty report is still one (empty) member
+            if self._block or not self._members:
+                self._submit()
+            while self._pending:
+                self._raw.write(self._pending.popleft().result())
+        finally:
+            self._executor.shutdown(wait=True)
+            self._raw.close()
+            super().close()
+
+
+def _open_compressed(path, compression, threads):
+    if compression == 'gzip':
+        if threads > 1:
+            return ParallelGzipWriter(open(path, 'wb'), threads)
+        import gzip
+        return gzip.GzipFile(path, 'wb', compresslevel=GZIP_LEVEL, mtime=0)
+    if compression == 'xz':
+        import lzma
+        return lzma.LZMAFile(path, 'wb')
+    if compression == 'bz2':
+        import bz2
+        return bz2.BZ2File(path, 'wb')
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+@contextmanager
+def open_output(path, compress_threads=1, compression='auto'):
+    """
+    Open a report destination for writing; '-' writes to stdout.
+    compression defaults to the one named by the file's suffix (None
+    writes plain text); compress_threads > 1 compresses gzip in parallel.
+    """
+    if path == '-':
+        try:
+            yield sys.stdout
+        finally:
+            sys.stdout.flush()
+        return
+
+    if compression == 'auto':
+        compression = compression_format(path)
+    if compression is None:
+        with open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            yield f
+        return
+
+    binary = _open_compressed(path, compression, compress_threads)
+    with io.TextIOWrapper(io.BufferedWriter(binary, WRITE_BUFFER_SIZE), encoding='utf-8') as f:
+        yield f
+
+
+def write_lines(f, lines):
+    """Write lines as they are produced and return how many were written"""
+    count = 0
+    for line in lines:
+        f.write(line)
+        f.write('\n')
+        count += 1
+    return count
+
+
+def _writev_all(fd, buffers, size):
+    """os.writev() size bytes of buffers, continuing after partial writes"""
+    written = os.writev(fd, buffers)
+    while written < size:
+        size -= written
+        index = 0
+        while written >= len(buffers[index]):
+            written -= len(buffers[index])
+            index += 1
+        buffers = [memoryview(buffers[index])[written:], *buffers[index + 1:]]
+        written = os.writev(fd, buffers)
+
+
+def write_chunks(f, chunks):
+    """
+    Write UTF-8 chunks of whole lines (DirectoryScanner.iter_structure_bytes())
+    to a text file from open_output(), below its text layer. Chunks are
+    batched up to WRITE_BUFFER_SIZE bytes and written with one os.writev()
+    on plain files, or writelines() on compressed ones, so they are not
+    copied into another buffer first. Returns the number of bytes written.
+    """
+    f.flush()
+    binary = getattr(f, 'buffer', None)
+    if binary is None or os.linesep != '\n':
+        # Streams without a binary layer, and newline translation
+        total = 0
+        for chunk in chunks:
+            text = bytes(chunk).decode('utf-8')
+            f.write(text)
+            total += len(chunk)
+        return total
+
+    raw = getattr(binary, 'raw', None)
+    if isinstance(raw, io.FileIO) and hasattr(os, 'writev'):
+        binary.flush()
+        fd = raw.fileno()
+
+        def write(batch, size):
+            _writev_all(fd, batch, size)
+    else:
+        def write(batch, size):
+            binary.writelines(batch)
+
+    total = 0
+    batch = []
+    batch_bytes = 0
+    for chunk in chunks:
+        batch.append(chunk)
+        batch_bytes += len(chunk)
+        if batch_bytes >= WRITE_BUFFER_SIZE or len(batch) >= WRITEV_MAX_BUFFERS:
+            write(batch, batch_bytes)
+            total += batch_bytes
+            batch = []
+            batch_bytes = 0
+    if batch:
+        write(batch, batch_bytes)
+        total += batch_bytes
+    return total
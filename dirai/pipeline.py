@@ -0,0 +1,115 @@
+# pipeline.py
+"""
+DIRAI Content Pipeline
+
+Renders file content (read, binary check, redaction) on a process pool
+while the tree walk keeps going. The walk yields placeholders for file
+content; resolve() puts the rendered lines back in their place, so the
+output is identical to rendering inline.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+BATCH_SIZE = 32
+BATCHES_PER_PROCESS = 4
+
+_worker_scanner = None
+
+
+def _init_worker(config):
+    global _worker_scanner
+    from dirai.scanner import DirectoryScanner
+    _worker_scanner = DirectoryScanner(config)
+
+
+def _render_batch(tasks):
+    return [list(_worker_scanner._iter_file_content(*task)) for task in tasks]
+
+
+class _Batch:
+    __slots__ = ('tasks', 'future')
+
+    def __init__(self):
+        self.tasks = []
+        self.future = None
+
+
+class PendingContent:
+    """Placeholder for the content lines of one file"""
+    __slots__ = ('batch', 'index', 'on_result')
+
+    def __init__(self, batch, index, on_result=None):
+        self.batch = batch
+        self.index = index
+        self.on_result = on_result
+
+
+class ContentPipeline:
+    def __init__(self, config, processes, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.max_pending = processes * BATCHES_PER_PROCESS * batch_size
+        self._executor = ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_worker,
+            initargs=(dict(config, content_processes=1, stats=None),)
+        )
+        self._batch = _Batch()
+
+    def submit(self, file_path, prefix, is_last, on_result=None):
+        """
+        Queue a file for rendering and return its placeholder. on_result is
+        called with the rendered lines once they are resolved.
+        """
+        batch = self._batch
+        batch.tasks.append((str(file_path), prefix, is_last))
+        placeholder = PendingContent(batch, len(batch.tasks) - 1, on_result)
+        if len(batch.tasks) >= self.batch_size:
+            self._submit_batch()
+        return placeholder
+
+    def _submit_batch(self):
+        if self._batch.tasks:
+            self._batch.future = self._executor.submit(_render_batch, self._batch.tasks)
+            self._batch = _Batch()
+
+    def _lines(self, item):
+        if not isinstance(item, PendingContent):
+            return (item,)
+        if item.batch.future is None:
+            self._submit_batch()
+        lines = item.batch.future.result()[item.index]
+        if item.on_result is not None:
+            item.on_result(lines)
+        return lines
+
+    @staticmethod
+    def _ready(item):
+        return not isinstance(item, PendingContent) or (item.batch.future is not None and item.batch.future.done())
+
+    def resolve(self, items):
+        """
+        Yield lines in order, replacing placeholders with rendered content.
+        Anything else (str lines, or bytes chunks in binary output) passes
+        through unchanged.
+        """
+        queue = deque()
+        pending = 0
+        for item in items:
+            queue.append(item)
+            if isinstance(item, PendingContent):
+                pending += 1
+
+            # Keep at most max_pending files in flight
+            while queue and (self._ready(queue[0]) or pending > self.max_pending):
+                item = queue.popleft()
+                if isinstance(item, PendingContent):
+                    pending -= 1
+                yield from self._lines(item)
+
+        self._submit_batch()
+        while queue:
+            yield from self._lines(queue.popleft())
+
+    def close(self):
+        self._executor.shutdown(wait=True)
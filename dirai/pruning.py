@@ -0,0 +1,117 @@
+# pruning.py
+"""
+DIRAI Directory Pruning
+
+Works out from the compiled exclude/include specs which subtrees can never
+produce output, so the scanner can skip them without listing them.
+"""
+
+import fnmatch
+import os
+
+
+def split_pattern(pattern):
+    """
+    Split a gitwildmatch pattern into path segments.
+
+    Returns None for patterns that match at any depth (no slash other than a
+    trailing one) or that use syntax we do not analyse (escapes).
+    """
+    if not pattern or '\\' in pattern:
+        return None
+    pattern = pattern.rstrip('/')
+    if not pattern:
+        return None
+    if '/' not in pattern:
+        return None
+    return [segment for segment in pattern.lstrip('/').split('/') if segment]
+
+
+def could_match_below(segments, dir_parts, i=0, j=0):
+    """Check if a path below dir_parts can match the pattern segments"""
+    while i < len(segments) and j < len(dir_parts):
+        if segments[i] == '**':
+            return (could_match_below(segments, dir_parts, i + 1, j)
+                    or could_match_below(segments, dir_parts, i, j + 1))
+        if not fnmatch.fnmatchcase(dir_parts[j], segments[i]):
+            return False
+        i += 1
+        j += 1
+    # Either the directory is a prefix of the pattern, or the pattern already
+    # matched an ancestor directory (which matches everything below it)
+    return True
+
+
+def matches_exactly(segments, dir_parts, i=0, j=0):
+    """Check if the pattern segments match dir_parts as a whole"""
+    while i < len(segments) and j < len(dir_parts):
+        if segments[i] == '**':
+            return (matches_exactly(segments, dir_parts, i + 1, j)
+                    or matches_exactly(segments, dir_parts, i, j + 1))
+        if not fnmatch.fnmatchcase(dir_parts[j], segments[i]):
+            return False
+        i += 1
+        j += 1
+    return i == len(segments) and j == len(dir_parts)
+
+
+class PruningPlanner:
+    """
+    Decide which directories do not need to be listed.
+
+    Only anchored patterns are analysed. Anything the planner cannot reason
+    about is treated as "may produce output", so pruning never hides entries
+    the full walk would have shown.
+    """
+
+    def __init__(self, exclude_spec, include_spec):
+        self.include_rules = self._compile_include(include_spec)
+        self.children_rules = self._compile_children(exclude_spec)
+
+    @staticmethod
+    def _compile_include(include_spec):
+        if not include_spec:
+            return None
+        rules = []
+        for pattern in include_spec.patterns:
+            if pattern.include is None:
+                continue
+            segments = split_pattern(getattr(pattern, 'pattern', None))
+            if not pattern.include or segments is None:
+                return None
+            rules.append(segments)
+        return rules or None
+
+    @staticmethod
+    def _compile_children(exclude_spec):
+        rules = []
+        for pattern in exclude_spec.patterns:
+            if pattern.include is None:
+                continue
+            if not pattern.include:
+                # A negation may re-include anything, so give up entirely
+                return []
+            source = getattr(pattern, 'pattern', None) or ''
+            if source.endswith('/*') and '\\' not in source:
+                segments = [segment for segment in source[:-2].split('/') if segment]
+                if segments:
+                    rules.append(segments)
+        return rules
+
+    @staticmethod
+    def _parts(rel_dir):
+        return [part for part in str(rel_dir).replace(os.sep, '/').split('/') if part]
+
+    def can_include_below(self, rel_dir):
+        """Check if any include pattern can match a file inside rel_dir"""
+        if self.include_rules is None:
+            return True
+        parts = self._parts(rel_dir)
+        return any(could_match_below(segments, parts) for segments in self.include_rules)
+
+    def excludes_all_children(self, rel_dir):
+        """Check if every entry inside rel_dir is excluded (e.g. by 'logs/*')"""
+        if not self.children_rules:
+            return False
+        parts = self._parts(rel_dir)
+        return any(matches_exactly(segments, parts) for segments in self.children_rules)
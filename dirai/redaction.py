@@ -0,0 +1,149 @@
+# redaction.py
+"""
+DIRAI Redaction Engine
+
+Compiles the redaction rules of a profile once and skips lines that cannot
+match any of them before running the per-rule substitutions.
+"""
+
+import re
+from functools import lru_cache
+
+RULE_TEMPLATE = r'(\b{}\b\s*[:=]\s*)(["\']?)([^"\'\n]+)(["\']?)'
+REPLACEMENT = r'\1\2\4'
+
+_LITERAL_RUN = re.compile(r'[A-Za-z0-9_]+')
+_CHAR_CLASS = re.compile(r'\[[^\]]*\]')
+_QUANTIFIER = re.compile(r'[?*]|\{\d*(?:,\d*)?\}')
+
+
+def required_literal(pattern):
+    """
+    Find a lowercase literal that every match of the pattern must contain.
+
+    Only handles plain words with character classes and quantifiers, e.g.
+    'api[_-]?key' -> 'api'. Returns None when no literal can be derived.
+    """
+    if not pattern or any(char in pattern for char in '|()\\^$.+'):
+        return None
+
+    literals = []
+    pos = 0
+    while pos < len(pattern):
+        run = _LITERAL_RUN.match(pattern, pos)
+        if run:
+            text = run.group()
+            pos = run.end()
+            quantifier = _QUANTIFIER.match(pattern, pos)
+            if quantifier:
+                # The last character of the run is optional
+                text = text[:-1]
+                pos = quantifier.end()
+            literals.append(text)
+            continue
+
+        char_class = _CHAR_CLASS.match(pattern, pos)
+        if not char_class:
+            return None
+        pos = char_class.end()
+
+        quantifier = _QUANTIFIER.match(pattern, pos)
+        if quantifier:
+            pos = quantifier.end()
+
+    literals = [literal for literal in literals if literal]
+    if not literals:
+        return None
+    return max(literals, key=len).lower()
+
+
+class RedactionEngine:
+    """
+    Redacts sensitive values the same way redact_sensitive_data always has:
+    ignore_variables first, then redaction_patterns, each applied in order.
+
+    Lines are checked against cheap prefilters before any substitution runs:
+    a line without ':' or '=' cannot match, an ASCII line that contains none
+    of the rule keywords cannot match, and a single combined regex confirms
+    at least one rule matches before the ordered substitutions are applied.
+    """
+
+    def __init__(self, ignore_variables=(), redaction_patterns=()):
+        fragments = [re.escape(var) for var in ignore_variables] + list(redaction_patterns)
+
+        self.rules = [re.compile(RULE_TEMPLATE.format(fragment), re.IGNORECASE) for fragment in fragments]
+        self.detector = None
+        self.keywords = None
+        # Text that every line of a bytes block able to match contains (see matching_lines)
+        self.candidates = re.compile(rb'[:=]')
+
+        if not fragments:
+            return
+
+        self.detector = re.compile(
+            '|'.join(f'(?:{rule.pattern})' for rule in self.rules),
+            re.IGNORECASE
+        )
+
+        keywords = [var.lower() if var.isascii() else None for var in ignore_variables]
+        keywords += [required_literal(pattern) for pattern in redaction_patterns]
+        if all(keywords):
+            # A keyword containing a shorter keyword adds nothing to the check
+            self.keywords = tuple(sorted(
+                keyword for keyword in set(keywords)
+                if not any(other != keyword and other in keyword for other in keywords)
+            ))
+            self.candidates = re.compile(
+                b'|'.join(re.escape(keyword.encode('ascii')) for keyword in self.keywords),
+                re.IGNORECASE
+            )
+
+    def could_match(self, line):
+        """Check if any rule can match the line"""
+        if not self.rules:
+            return False
+        if ':' not in line and '=' not in line:
+            return False
+        if self.keywords is not None and line.isascii():
+            lowered = line.lower()
+            if not any(keyword in lowered for keyword in self.keywords):
+                return False
+        return self.detector.search(line) is not None
+
+    def matching_lines(self, block):
+        """
+        For an ASCII bytes block of whole lines, return the (start, end)
+        offsets of the lines could_match() lets through, without decoding
+        the others. Only lines holding a rule keyword (or, without
+        keywords, a ':' or '=') are checked one by one.
+        """
+        if not self.rules or (b':' not in block and b'=' not in block):
+            return []
+        spans = []
+        line_end = 0
+        for candidate in self.candidates.finditer(block):
+            position = candidate.start()
+            if position < line_end:
+                continue
+            line_start = block.rfind(b'\n', 0, position) + 1
+            line_end = block.find(b'\n', position) + 1 or len(block)
+            if self.detector.search(block[line_start:line_end].decode('ascii')) is not None:
+                spans.append((line_start, line_end))
+        return spans
+
+    def redact(self, line):
+        if not self.could_match(line):
+            return line
+        for rule in self.rules:
+            line = rule.sub(REPLACEMENT, line)
+        return line
+
+
+@lru_cache(maxsize=32)
+def _cached_engine(ignore_variables, redaction_patterns):
+    return RedactionEngine(ignore_variables, redaction_patterns)
+
+
+def get_redaction_engine(ignore_variables, redaction_patterns):
+    """Return a compiled engine for the given rules, shared between callers"""
+    return _cached_engine(tuple(ignore_variables or ()), tuple(redaction_patterns or ()))
@@ -0,0 +1,195 @@
+# render.py
+"""
+DIRAI Renderers
+
+Turn a TreeModel (dirai.tree) into report lines. Each renderer is a
+function taking the model and yielding lines without newlines, registered
+by name in RENDERERS; register_renderer() adds more.
+
+- text: the tree drawn with connectors, identical to the scanner's lines
+- markdown: nested lists with file contents in fenced code blocks
+- json: one JSON document, a nested object per node
+"""
+
+import json
+import os
+import re
+
+from dirai.output import COMPRESSION_SUFFIXES
+from dirai.tree import DIRECTORY, FILE, KIND_NAMES, SYMLINK
+
+RENDERERS = {}
+
+# Report formats picked from the output file's extension
+EXTENSION_FORMATS = {'.md': 'markdown', '.markdown': 'markdown', '.json': 'json'}
+
+# Code fence info strings for common file extensions
+FENCE_LANGUAGES = {
+    '.py': 'python', '.js': 'javascript', '.ts': 'typescript', '.tsx': 'tsx', '.jsx': 'jsx',
+    '.json': 'json', '.yaml': 'yaml', '.yml': 'yaml', '.toml': 'toml', '.md': 'markdown',
+    '.html': 'html', '.css': 'css', '.sh': 'bash', '.go': 'go', '.rs': 'rust', '.java': 'java',
+    '.c': 'c', '.h': 'c', '.cpp': 'cpp', '.rb': 'ruby', '.php': 'php', '.sql': 'sql',
+}
+
+
+def register_renderer(name, renderer):
+    RENDERERS[name] = renderer
+    return renderer
+
+
+def get_renderer(name):
+    try:
+        return RENDERERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown report format: {name}") from None
+
+
+def output_format(config):
+    """The report format of a profile: 'format', or else the output file's extension"""
+    name = config.get('format') or 'auto'
+    if name != 'auto':
+        return name
+    root, extension = os.path.splitext(config.get('output') or '')
+    if extension.lower() in COMPRESSION_SUFFIXES:
+        # report.json.gz is a compressed JSON report
+        _, extension = os.path.splitext(root)
+    return EXTENSION_FORMATS.get(extension.lower(), 'text')
+
+
+def _entry_label(tree, index):
+    name = tree.name(index)
+    kind = tree.kind(index)
+    if kind == SYMLINK:
+        return f"{name}@ -> {tree.targets.get(index, '')}"
+    if kind == DIRECTORY:
+        return f"{name}/"
+    return name
+
+
+def render_text(tree):
+    parents = tree.parents
+    contents = tree.contents
+    notes = tree.notes
+    errors = tree.errors
+    # prefixes[i]: the prefix drawn before the children of node i
+    prefixes = {0: ''}
+
+    yield f"└── {tree.name(0)}/"
+    if 0 in errors:
+        yield f"└── {errors[0]}"
+    for index in range(1, len(parents)):
+        prefix = prefixes[parents[index]]
+        last = tree.is_last(index)
+        yield f"{prefix}{'└── ' if last else '├── '}{_entry_label(tree, index)}"
+
+        child_prefix = prefix + ('    ' if last else '│   ')
+        if index in notes:
+            yield f"{child_prefix}│   {notes[index]}"
+        if index in contents:
+            for line in contents[index]:
+                yield f"{child_prefix}│   {line}"
+        if index in errors:
+            yield f"{child_prefix}└── {errors[index]}"
+        if tree.has_children(index):
+            prefixes[index] = child_prefix
+
+
+def _code_span(text):
+    longest = max((len(run) for run in re.findall(r'`+', text)), default=0)
+    fence = '`' * (longest + 1)
+    padding = ' ' if text.startswith('`') or text.endswith('`') else ''
+    return f"{fence}{padding}{text}{padding}{fence}"
+
+
+def render_markdown(tree):
+    depths = tree.depths()
+    yield f"# {_code_span(tree.name(0) + '/')}"
+    yield ""
+    if 0 in tree.errors:
+        yield f"*{tree.errors[0]}*"
+    for index in range(1, len(tree.parents)):
+        indent = '  ' * (depths[index] - 1)
+        kind = tree.kind(index)
+        name = tree.name(index)
+        if kind == DIRECTORY:
+            label = f"**{_code_span(name + '/')}**"
+        elif kind == SYMLINK:
+            label = f"{_code_span(name)} → {_code_span(tree.targets.get(index, ''))}"
+        else:
+            label = _code_span(name)
+        yield f"{indent}- {label}"
+
+        inner = indent + '  '
+        if index in tree.notes:
+            yield f"{inner}*{tree.notes[index]}*"
+        if index in tree.errors:
+            yield f"{inner}- *{tree.errors[index]}*"
+        if index in tree.contents:
+            lines = tree.contents[index]
+            longest = max((len(run) for line in lines for run in re.findall(r'`{3,}', line)), default=0)
+            fence = '`' * max(3, longest + 1)
+            language = FENCE_LANGUAGES.get(os.path.splitext(name)[1].lower(), '') if kind == FILE else ''
+            yield ""
+            yield f"{inner}{fence}{language}"
+            for line in lines:
+                yield f"{inner}{line}" if line else ""
+            yield f"{inner}{fence}"
+            yield ""
+
+
+def _json_node(tree, index):
+    node = {'name': tree.name(index), 'type': KIND_NAMES[tree.kind(index)]}
+    if tree.sizes[index] >= 0:
+        node['size'] = tree.sizes[index]
+        node['mtime'] = tree.mtimes[index]
+    if index in tree.targets:
+        node['target'] = tree.targets[index]
+    if index in tree.notes:
+        node['note'] = tree.notes[index]
+    if index in tree.errors:
+        node['error'] = tree.errors[index]
+    if index in tree.contents:
+        node['content'] = tree.contents[index]
+    return node
+
+
+def render_json(tree):
+    """
+    One line per node; a directory's children follow its line and close
+    with ']}' once the walk leaves it, so the model is never copied into
+    nested dicts.
+    """
+    depths = tree.depths()
+    count = len(tree.parents)
+    open_depths = []
+    pending = None
+
+    for index in range(count):
+        depth = depths[index]
+        while open_depths and open_depths[-1] >= depth:
+            yield pending
+            pending = '  ' * open_depths.pop() + ']}'
+        if pending is not None and not pending.endswith('['):
+            # Not the first child of its directory
+            pending += ','
+        text = json.dumps(_json_node(tree, index), ensure_ascii=False)
+        indent = '  ' * depth
+        if tree.kind(index) == DIRECTORY or tree.has_children(index):
+            line = f"{indent}{text[:-1]}, \"children\": ["
+            open_depths.append(depth)
+        else:
+            line = f"{indent}{text}"
+        if pending is not None:
+            yield pending
+        pending = line
+
+    while open_depths:
+        yield pending
+        pending = '  ' * open_depths.pop() + ']}'
+    if pending is not None:
+        yield pending
+
+
+register_renderer('text', render_text)
+register_renderer('markdown', render_markdown)
+register_renderer('json', render_json)
@@ -5,19 +5,140 @@ import pathspec
 import re
 from pathlib import Path
 
-from dirai.utils import is_binary, redact_sensitive_data
+from dirai.cache import ScanCache
+from dirai.constants import CACHE_DIR_NAME
+from dirai.content import open_text
+from dirai.dedupe import DuplicateFinder
+from dirai.gitignore import GitignoreMatcher, read_rules
+from dirai.gitindex import GitIndexError, GitIndexTree
+from dirai.matching import compile_spec
+from dirai.pruning import PruningPlanner
+from dirai.redaction import get_redaction_engine
+from dirai.stats import ScanStats
+from dirai.tree import DIRECTORY, FILE, OTHER, SYMLINK, TreeModel
 
 apiKey=""
+
+VCS_DIRS = frozenset(('.git', '.svn', '.hg'))
+
+# ASCII characters str.rstrip() removes besides line breaks; all but the
+# space are rare enough that looking for the character alone is cheaper
+_STRIPPED_BYTES = b' \t\x0b\x0c\x1c\x1d\x1e\x1f'
+_RARE_STRIPPED = tuple(bytes((char,)) for char in _STRIPPED_BYTES[1:])
+_TRAILING_WHITESPACE = re.compile(rb'[ \t\x0b\x0c\x1c-\x1f](?:\n|\Z)')
+
+
+class ScanEntry:
+    """
+    A single directory entry produced by os.scandir.
+
+    Type information comes from the DirEntry (no extra syscalls on most
+    platforms) and the stat result is fetched at most once, so exclusion,
+    formatting and recursion all share the same cached record.
+    """
+    __slots__ = ('name', 'path', 'rel_path', 'is_link', 'is_dir', 'is_file', '_dirent', '_stat')
+
+    def __init__(self, dirent, rel_dir=''):
+        self.name = dirent.name
+        self.path = dirent.path
+        self.rel_path = f"{rel_dir}{os.sep}{dirent.name}" if rel_dir else dirent.name
+        self._dirent = dirent
+        self._stat = None
+
+        self.is_link = dirent.is_symlink()
+        try:
+            self.is_dir = dirent.is_dir()
+        except OSError:
+            self.is_dir = False
+        self.is_file = not self.is_link and dirent.is_file(follow_symlinks=False)
+
+    @classmethod
+    def from_record(cls, parent_dir, rel_dir, record):
+        """Rebuild an entry from a cached (name, is_link, is_dir, is_file) record"""
+        entry = cls.__new__(cls)
+        entry.name, entry.is_link, entry.is_dir, entry.is_file = record
+        entry.path = os.path.join(parent_dir, entry.name)
+        entry.rel_path = f"{rel_dir}{os.sep}{entry.name}" if rel_dir else entry.name
+        entry._dirent = None
+        entry._stat = None
+        if entry.is_link:
+            # The link target may have changed without touching the directory
+            entry.is_dir = os.path.isdir(entry.path)
+        return entry
+
+    def to_record(self):
+        return [self.name, self.is_link, self.is_dir, self.is_file]
+
+    def stat(self):
+        if self._stat is None:
+            if self._dirent is not None:
+                self._stat = self._dirent.stat(follow_symlinks=False)
+            else:
+                self._stat = os.lstat(self.path)
+        return self._stat
+
+
+def _changed_lines(block, redaction_engine):
+    """Sorted (start, end) offsets of the lines of an ASCII block that rendering may change"""
+    spans = redaction_engine.matching_lines(block)
+    if (block[-1] in _STRIPPED_BYTES or b' \n' in block
+            or any(char in block for char in _RARE_STRIPPED)):
+        for match in _TRAILING_WHITESPACE.finditer(block):
+            spans.append((block.rfind(b'\n', 0, match.start()) + 1, match.end()))
+        spans = sorted(set(spans))
+    return spans
+
+
+def _decode_chunks(items):
+    """The str lines of content rendered for iter_structure_bytes(), which mixes in UTF-8 chunks"""
+    lines = []
+    chunks = []
+    for item in items:
+        if item.__class__ is not str:
+            chunks.append(item)
+            continue
+        if chunks:
+            lines += b''.join(chunks).decode('utf-8').split('\n')[:-1]
+            chunks = []
+        lines.append(item)
+    if chunks:
+        lines += b''.join(chunks).decode('utf-8').split('\n')[:-1]
+    return lines
+
+
 class DirectoryScanner:
     def __init__(self, config):
         self.config = config # consider to validate config here or in cli.py
-        self.visited_links = set()
+        # (st_dev, st_ino) of the directories from the root to the one being
+        # walked, and of every directory walked in full (repeated_dirs: reference)
+        self._active_dirs = set()
+        self._walked_dirs = {}
+        self._track_walks = False
+        # Entries and listings the walk has hidden along their path only
+        self._hidden = 0
+        self._name_excludes = None
         self.gitignore_spec = None
+        self.gitignore = None
+        self._git_index = None
         self.base_dir = None
+        self._executor = None
+        self._content_pipeline = None
+        self._cache = None
+        self.cache_stats = None
+        self._content_bytes_left = self.config.get('max_total_content_bytes') or None
+        self._tree = None
+        self._render_bytes = False
+        self._duplicates = None
+        self.stats = None
+        if self.config.get('stats'):
+            self.stats = ScanStats()
+            self.stats.instrument(self)
 
         # Compile exclude and include patterns
         self.exclude_spec = pathspec.PathSpec.from_lines('gitwildmatch', config.get('exclude', []))
         self.include_spec = pathspec.PathSpec.from_lines('gitwildmatch', config.get('include', []))
+        self.pruning_planner = PruningPlanner(self.exclude_spec, self.include_spec)
+        self._spec_indexes = {}
 
     def _load_gitignore_spec(self):
         if not self.config.get('use_gitignore', True):
@@ -30,47 +151,93 @@ class DirectoryScanner:
                 with open(custom_path, 'r') as f:
                     spec += pathspec.PathSpec.from_lines('gitwildmatch', f)
 
+        return spec
+
+    def _load_root_gitignore(self, spec):
+        """
+        The matcher the walk starts from: the gitignore_paths files, then
+        .git/info/exclude, each overridden by the rules that follow.
+        """
+        if not self.config.get('use_gitignore', True):
+            return None
+
+        matcher = GitignoreMatcher('', compile_spec(spec) if spec else None)
+        info_exclude = os.path.join(self.base_dir, '.git', 'info', 'exclude')
+        if os.path.isfile(info_exclude):
+            try:
+                matcher = matcher.stack('', read_rules(info_exclude))
+            except OSError as e:
+                if self.config.get('verbose'):
+                    print(f"Gitignore error: {str(e)}", file=sys.stderr)
+        return matcher
+
+    def _load_directory_gitignore(self, current_dir, rel_dir, entries, parent):
+        """
+        Stack the .gitignore of a directory on top of its parent's rules.
+
+        Called when the walk enters a directory, so rules are only read for
+        directories that are actually visited and only apply to their subtree.
+        """
+        if parent is None or not self.config.get('use_gitignore', True):
+            return parent
+        return self._stack_gitignore(parent, rel_dir, self._read_directory_gitignore(current_dir, rel_dir, entries))
+
+    def _read_directory_gitignore(self, current_dir, rel_dir, entries):
+        """Compile the .gitignore found in a directory listing, if any"""
+        if not any(entry.name == '.gitignore' and entry.is_file for entry in entries):
+            return None
+
         try:
-            for root, _, files in os.walk(self.base_dir): # type: ignore
-                if '.gitignore' in files:
-                    gitignore_path = Path(root) / '.gitignore'
-                    with open(gitignore_path, 'r') as f:
-                        rel_path = Path(root).relative_to(self.base_dir) # type: ignore
-                        lines = [
-                            f"{rel_path}/{line.strip()}" if rel_path != Path('.') else line.strip()
-                            for line in f if line.strip() and not line.startswith('#')
-                        ]
-                        spec += pathspec.PathSpec.from_lines('gitwildmatch', lines)
+            return read_rules(os.path.join(current_dir, '.gitignore'))
         except Exception as e:
             if self.config.get('verbose'):
                 print(f"Gitignore error: {str(e)}", file=sys.stderr)
+            return None
 
-        return spec
+    @staticmethod
+    def _stack_gitignore(parent, rel_dir, rules):
+        return parent.stack(rel_dir, rules)
 
-    def _is_excluded(self, rel_path):
-        abs_path = self.base_dir / rel_path
-        is_dir = abs_path.is_dir()
+    def _is_excluded(self, rel_path, is_dir=None, gitignore=None):
+        if gitignore is None:
+            gitignore = self.gitignore
+        if is_dir is None:
+            is_dir = (self.base_dir / rel_path).is_dir()
         path_str = str(rel_path)
+        if path_str == CACHE_DIR_NAME:
+            return True
 
         if is_dir:
             path_str += '/'
 
-        vcs_dirs = ['.git', '.svn', '.hg']
-        if not self.config.get('include_vcs', False) and any(part in vcs_dirs for part in path_str.split(os.sep)):
+        if not self.config.get('include_vcs', False) and not VCS_DIRS.isdisjoint(path_str.split(os.sep)):
             return True
 
-        if self.exclude_spec.match_file(path_str):
+        exclude_index = self._spec_index(self.exclude_spec)
+        if exclude_index is not None and exclude_index.match_file(path_str):
             return True
 
-        if self.gitignore_spec and self.gitignore_spec.match_file(path_str):
-            return True
+        if gitignore is not None and gitignore.is_ignored(str(rel_path), is_dir):
+            if self._git_index is None or not self._git_index.is_tracked(str(rel_path), is_dir):
+                return True
 
-        if self.include_spec and not self.include_spec.match_file(path_str):
+        include_index = self._spec_index(self.include_spec)
+        if include_index is not None and not include_index.match_file(path_str):
             if not is_dir:
                 return True
 
         return False
 
+    def _spec_index(self, spec):
+        """Compiled pattern index of a PathSpec, built once per spec object"""
+        if not spec:
+            return None
+        cached = self._spec_indexes.get(id(spec))
+        if cached is None or cached[0] is not spec:
+            cached = (spec, compile_spec(spec))
+            self._spec_indexes[id(spec)] = cached
+        return cached[1]
+
 
     def _format_entry(self, name, is_dir=False, is_link=False, target=None):
         if is_link:
@@ -80,101 +247,553 @@ class DirectoryScanner:
         return name
 
     def generate_structure(self, directory):
+        return list(self.iter_structure(directory))
+
+    def iter_structure_bytes(self, directory):
+        """
+        iter_structure() for binary output: yields UTF-8 chunks of whole,
+        newline-terminated lines (bytes or memoryviews), to be written in
+        order (see dirai.output.write_chunks). File contents come as a few
+        large chunks per file instead of a str per line.
+        """
+        self._render_bytes = True
+        try:
+            for line in self.iter_structure(directory):
+                if line.__class__ is str:
+                    yield (line + '\n').encode('utf-8')
+                else:
+                    yield line
+        finally:
+            self._render_bytes = False
+
+    def build_tree(self, directory):
+        """
+        Walk directory into a TreeModel (see dirai.tree) instead of lines.
+        File contents are rendered inline, without --content-processes.
+        """
+        tree = self._tree = TreeModel()
+        try:
+            for _ in self.iter_structure(directory):
+                pass
+        finally:
+            self._tree = None
+        tree.finish()
+        return tree
+
+    def _prepare(self, directory):
+        """Resolve the scan root and load the rules and listing source the walk starts from"""
         self.base_dir = Path(directory).resolve()
         self.gitignore_spec = self._load_gitignore_spec()
-
-        structure = [f"└── {self.base_dir.name}/"]
-        structure += self._process_directory(self.base_dir)
-        return structure
-
-    def _process_directory(self, current_dir, prefix='', depth=0):
-        structure = []
+        self.gitignore = self._load_root_gitignore(self.gitignore_spec)
+        self._git_index = self._load_git_index()
+        if self._git_index is not None and not self.config.get('untracked', False):
+            # Tracked files are listed whether or not a .gitignore matches them
+            self.gitignore = None
+        self._duplicates = DuplicateFinder() if self.config.get('dedupe_content') else None
+        self._active_dirs = set()
+        self._walked_dirs = {}
+        self._hidden = 0
+        self._track_walks = (self.config.get('follow_symlinks')
+                             and self.config.get('repeated_dirs', 'walk') == 'reference')
+        # Exclude patterns without a '/' (but a trailing one) match the same names at any depth
+        self._name_excludes = None
+        if self._track_walks and all('/' not in pattern.rstrip('/') for pattern in self.config.get('exclude', [])):
+            self._name_excludes = self._spec_index(self.exclude_spec)
+        if self.config.get('follow_symlinks'):
+            stat = os.stat(self.base_dir)
+            self._active_dirs.add((stat.st_dev, stat.st_ino))
+
+    def _load_git_index(self):
+        if self.config.get('source', 'filesystem') != 'git-index':
+            return None
+        try:
+            return GitIndexTree.load(self.base_dir)
+        except (GitIndexError, OSError) as e:
+            print(f"Git index unavailable ({str(e)}), scanning the filesystem", file=sys.stderr)
+            return None
+
+    def iter_structure(self, directory):
+        """Yield the structure lines one at a time as the tree is walked"""
+        self._prepare(directory)
+
+        workers = self.config.get('workers') or 1
+        if workers > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dirai-scan')
+        self._cache = ScanCache.open(self.base_dir, self.config)
+        self._content_bytes_left = self.config.get('max_total_content_bytes') or None
+        content_processes = self.config.get('content_processes') or 1
+        # The report-wide content budget is spent in walk order, so it is rendered inline
+        if (content_processes > 1 and self.config.get('show_content') and self._content_bytes_left is None
+                and self._tree is None):
+            from dirai.pipeline import ContentPipeline
+            self._content_pipeline = ContentPipeline(self.config, content_processes)
+        if self._tree is not None:
+            self._tree.set_root(self.base_dir.name)
+        try:
+            yield f"└── {self.base_dir.name}/"
+            lines = self._iter_directory(self.base_dir)
+            if self._content_pipeline is not None:
+                lines = self._content_pipeline.resolve(lines)
+            yield from lines
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            if self._content_pipeline is not None:
+                self._content_pipeline.close()
+                self._content_pipeline = None
+            if self._cache is not None:
+                self._cache.close()
+                self.cache_stats = self._cache.stats
+                self._cache = None
+
+    def _scan_entries(self, current_dir, rel_dir=''):
+        """List a directory once, returning its entries sorted directories first"""
+        git_index = self._git_index
+        if git_index is not None and not self.config.get('untracked', False):
+            records = git_index.listing(rel_dir) or ()
+            entries = [ScanEntry.from_record(current_dir, rel_dir, record) for record in records]
+            entries.sort(key=lambda e: (not e.is_dir, e.name))
+            return entries
+
+        cache = self._cache
+        if cache is not None:
+            dir_stat = os.stat(current_dir)
+            records = cache.get_listing(rel_dir, dir_stat)
+            if records is not None:
+                entries = [ScanEntry.from_record(current_dir, rel_dir, record) for record in records]
+                entries.sort(key=lambda e: (not e.is_dir, e.name))
+                return entries
+
+        with os.scandir(current_dir) as it:
+            entries = [ScanEntry(dirent, rel_dir) for dirent in it]
+        entries.sort(key=lambda e: (not e.is_dir, e.name))
+
+        if cache is not None:
+            cache.put_listing(rel_dir, dir_stat, [entry.to_record() for entry in entries])
+        return entries
+
+    def _skips_listing(self, rel_dir, depth):
+        """Check if a directory can be left unlisted without changing the output"""
         max_depth = self.config.get('max_depth')
         if max_depth and depth > max_depth:
-            return structure
+            return True
 
-        try:
-            items = sorted(os.listdir(current_dir),
-                         key=lambda x: (not os.path.isdir(os.path.join(current_dir, x)), x))
-        except (PermissionError, FileNotFoundError):
-            return [f"{prefix}└── [Permission denied]"]
-        except Exception as e:
-            return [f"{prefix}└── [Error: {str(e)}]"]
+        if rel_dir:
+            if self.pruning_planner.excludes_all_children(rel_dir):
+                return True
+            if self.config.get('prune_empty_dirs', False) and not self.pruning_planner.can_include_below(rel_dir):
+                return True
 
-        for index, item in enumerate(items):
-            path = current_dir / item
-            is_last = index == len(items) - 1
-            rel_path = path.relative_to(self.base_dir)
+        return False
 
-            if self._is_excluded(rel_path):
+    def _prefetch_listings(self, visible, depth):
+        """
+        List the subdirectories we are about to descend into on the worker
+        threads, while the current directory is still being rendered.
+        """
+        follow_symlinks = self.config.get('follow_symlinks')
+        listings = {}
+        for _, entry in visible:
+            if not entry.is_dir or (entry.is_link and not follow_symlinks):
                 continue
+            if self._skips_listing(entry.rel_path, depth + 1):
+                continue
+            listings[entry.rel_path] = self._executor.submit(self._scan_entries, entry.path, entry.rel_path)
+        return listings
+
+    def _process_directory(self, current_dir, prefix='', depth=0, rel_dir='', gitignore=None):
+        return list(self._iter_directory(current_dir, prefix, depth, rel_dir, gitignore))
+
+    def _iter_directory(self, current_dir, prefix='', depth=0, rel_dir='', gitignore=None, listing=None):
+        if self._skips_listing(rel_dir, depth):
+            self._hidden += 1
+            return
 
-            is_link = path.is_symlink()
+        max_depth = self.config.get('max_depth')
+        prune_empty = self.config.get('prune_empty_dirs', False)
+        tree = self._tree
+
+        try:
+            if listing is not None:
+                entries = listing.result()
+            else:
+                entries = self._scan_entries(current_dir, rel_dir)
+        except (PermissionError, FileNotFoundError):
+            if tree is not None:
+                tree.errors[tree._directories[rel_dir]] = "[Permission denied]"
+            yield f"{prefix}└── [Permission denied]"
+            return
+        except Exception as e:
+            if tree is not None:
+                tree.errors[tree._directories[rel_dir]] = f"[Error: {str(e)}]"
+            yield f"{prefix}└── [Error: {str(e)}]"
+            return
+
+        if gitignore is None:
+            gitignore = self.gitignore
+        gitignore = self._load_directory_gitignore(current_dir, rel_dir, entries, gitignore)
+
+        visible = []
+        for index, entry in enumerate(entries):
+            if not self._is_excluded(entry.rel_path, entry.is_dir, gitignore):
+                visible.append((index, entry))
+            elif self._track_walks:
+                self._note_hidden(entry)
+        listings = self._prefetch_listings(visible, depth) if self._executor is not None else {}
+
+        for index, entry in visible:
+            is_last = index == len(entries) - 1
+
+            is_link = entry.is_link
             target = None
             if is_link:
                 try:
-                    target = os.readlink(path)
+                    target = os.readlink(entry.path)
                 except Exception as e:
                     target = f"[Error: {str(e)}]"
 
             entry_line = self._format_entry(
-                name=item,
-                is_dir=path.is_dir() and not is_link,
+                name=entry.name,
+                is_dir=entry.is_dir and not is_link,
                 is_link=is_link,
                 target=target
             )
 
             connector = "└── " if is_last else "├── "
             structure_line = f"{prefix}{connector}{entry_line}"
-            structure.append(structure_line)
-
-            if path.is_dir() and (not is_link or self.config.get('follow_symlinks')):
-                if is_link and path in self.visited_links:
-                    structure.append(f"{prefix}{'    ' if is_last else '│   '}│   [Recursive symlink skipped]")
+            if tree is not None:
+                node = self._add_tree_node(tree, rel_dir, entry, is_last, target)
+
+            if entry.is_dir and (not is_link or self.config.get('follow_symlinks')):
+                identity, note = self._enter_directory(entry)
+                if note is not None:
+                    if tree is not None:
+                        tree.notes[node] = note
+                    yield structure_line
+                    yield f"{prefix}{'    ' if is_last else '│   '}│   {note}"
                     continue
-                if is_link:
-                    self.visited_links.add(path)
+                if tree is not None:
+                    tree.enter(entry.rel_path, node)
 
                 new_prefix = prefix + ('    ' if is_last else '│   ')
-                structure += self._process_directory(
-                    path,
+                children = self._iter_directory(
+                    entry.path,
                     prefix=new_prefix,
-                    depth=depth + 1
+                    depth=depth + 1,
+                    rel_dir=entry.rel_path,
+                    gitignore=gitignore,
+                    listing=listings.get(entry.rel_path)
                 )
+                if identity is not None:
+                    children = self._while_active(identity, children)
+                hidden = self._hidden
+                depth_limited = max_depth and depth + 1 > max_depth
+                if prune_empty and not depth_limited:
+                    # Only emit the directory once we know it has visible children
+                    first_child = next(children, None)
+                    if first_child is None:
+                        if tree is not None:
+                            tree.truncate(node)
+                        continue
+                    yield structure_line
+                    yield first_child
+                else:
+                    yield structure_line
+                yield from children
+                if identity is not None:
+                    self._finish_walk(identity, entry.rel_path, hidden)
+
+            else:
+                yield structure_line
+                if self.config.get('show_content') and entry.is_file:
+                    if tree is None:
+                        yield from self._iter_entry_content(entry, prefix, is_last)
+                        continue
+                    lines = list(self._iter_entry_content(entry, prefix, is_last))
+                    # Content lines are drawn below the entry as '<prefix>│   │   text'
+                    tree.contents[node] = [line[len(prefix) + 8:] for line in lines]
+                    yield from lines
+
+    def _enter_directory(self, entry):
+        """
+        With follow_symlinks, return the (st_dev, st_ino) of a directory the
+        walk is about to enter and the note shown instead of its children if
+        it repeats: a directory between the root and here (a cycle), or with
+        repeated_dirs: reference, a directory walked in full before (see
+        _finish_walk). Both are None when links are not followed.
+        """
+        if not self.config.get('follow_symlinks'):
+            return None, None
+        try:
+            stat = os.stat(entry.path) if entry.is_link else entry.stat()
+        except OSError:
+            return None, None
+        identity = (stat.st_dev, stat.st_ino)
+        if identity in self._active_dirs:
+            return identity, "[Recursive symlink skipped]"
+        first = self._walked_dirs.get(identity)
+        if first is not None:
+            return identity, f"[same directory as {first}]"
+        return identity, None
+
+    def _note_hidden(self, entry):
+        """
+        Count an excluded entry unless the rule hiding it only looks at its
+        name, so it would be hidden along any other path as well
+        """
+        name = entry.name + '/' if entry.is_dir else entry.name
+        if entry.name in VCS_DIRS and not self.config.get('include_vcs', False):
+            return
+        if self._name_excludes is not None and self._name_excludes.match_file(name):
+            return
+        self._hidden += 1
+
+    def _finish_walk(self, identity, rel_path, hidden):
+        """
+        Record the walk of a shown directory for repeated_dirs: reference,
+        unless something below it was hidden along this path only (cut by
+        max_depth or excluded by a path-scoped rule) since hidden was read:
+        later paths to it are walked again rather than referring to a walk
+        that left their children out.
+        """
+        if self._track_walks and self._hidden == hidden:
+            self._walked_dirs.setdefault(identity, rel_path)
+
+    def _while_active(self, identity, lines):
+        """Yield the lines of a directory's walk with the directory marked as active"""
+        self._active_dirs.add(identity)
+        try:
+            yield from lines
+        finally:
+            self._active_dirs.discard(identity)
+
+    @staticmethod
+    def _add_tree_node(tree, rel_dir, entry, is_last, target):
+        if entry.is_link:
+            kind = SYMLINK
+        elif entry.is_dir:
+            kind = DIRECTORY
+        elif entry.is_file:
+            kind = FILE
+        else:
+            kind = OTHER
+        try:
+            stat = entry.stat()
+        except OSError:
+            stat = None
+        return tree.add(rel_dir, entry.name, kind, is_last, stat, target)
+
+
+    def _iter_entry_content(self, entry, prefix, is_last):
+        """Content lines of a file entry, served from the scan cache when unchanged"""
+        first = self._first_copy(entry)
+        if first is not None:
+            yield f"{prefix}{'    ' if is_last else '│   '}│   [same content as {first}]"
+            return
+
+        cache = self._cache
+        if cache is None or self._content_bytes_left is not None:
+            if self._content_pipeline is not None:
+                yield self._content_pipeline.submit(entry.path, prefix, is_last)
+            else:
+                yield from self._iter_file_content(entry.path, prefix, is_last)
+            return
 
-            elif self.config.get('show_content') and path.is_file() and not is_link:
-                structure += self._show_file_content(path, prefix, is_last)
-
-        return structure
-
+        content_prefix = prefix + ('    ' if is_last else '│   ')
+        try:
+            file_stat = entry.stat()
+        except OSError:
+            yield from self._iter_file_content(entry.path, prefix, is_last)
+            return
+
+        cached = cache.get_content(entry.rel_path, file_stat)
+        if cached is not None:
+            if self._render_bytes and cached:
+                separator = '\n' + content_prefix
+                yield (content_prefix + separator.join(cached) + '\n').encode('utf-8')
+                return
+            for line in cached:
+                yield content_prefix + line
+            return
+
+        def store(lines):
+            if self._render_bytes:
+                lines = _decode_chunks(lines)
+            cache.put_content(entry.rel_path, file_stat, [line[len(content_prefix):] for line in lines])
+
+        if self._content_pipeline is not None:
+            yield self._content_pipeline.submit(entry.path, prefix, is_last, on_result=store)
+        else:
+            lines = list(self._iter_file_content(entry.path, prefix, is_last))
+            store(lines)
+            yield from lines
+
+    def _first_copy(self, entry):
+        """rel_path of an earlier file in the report with the same content (dedupe_content)"""
+        if self._duplicates is None:
+            return None
+        try:
+            return self._duplicates.first_copy(entry.path, entry.rel_path, entry.stat())
+        except OSError:
+            return None
 
     def _show_file_content(self, file_path, prefix, is_last):
-        content_lines = []
+        return list(self._iter_file_content(file_path, prefix, is_last))
+
+    def _iter_file_content(self, file_path, prefix, is_last):
         content_prefix = prefix + ('    ' if is_last else '│   ')
-        max_lines = self.config.get('max_lines', 50)
-        infinite_mode = max_lines == -1
+        if self._content_bytes_left is not None and self._content_bytes_left <= 0:
+            yield f"{content_prefix}│   [Content omitted: report content budget reached]"
+            return
 
         try:
-            if is_binary(file_path):
-                content_lines.append(f"{content_prefix}│   [Binary content omitted]")
-                return content_lines
-
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f):
-                    # Handle infinite lines if max_lines is -1
-                    if not infinite_mode and line_num >= max_lines:
-                        content_lines.append(f"{content_prefix}│   [... {max_lines} lines shown]")
-                        break
-
-                    # Redact sensitive data before adding to output
-                    cleaned_line = redact_sensitive_data(line.rstrip(), self.config.get('ignore_variables', []), self.config.get('redaction_patterns', []))
-                    content_lines.append(f"{content_prefix}│   {cleaned_line}")
-
-                    # Safety limit
-                    if infinite_mode and line_num > 1000000:
-                        content_lines.append(f"{content_prefix}│   [Stopped after 1,000,000 lines]")
-                        break
+            text = open_text(file_path, self.config.get('decode_errors', 'strict'), self._content_read_limit())
+            if text is None:
+                yield f"{content_prefix}│   [Binary content omitted]"
+                return
+
+            with text:
+                if self._render_bytes:
+                    yield from self._render_content_blocks(text, content_prefix)
+                else:
+                    yield from self._render_content_lines(text, content_prefix)
+            if self.stats is not None:
+                self.stats.file_read(text.bytes_read)
         except Exception as e:
-            content_lines.append(f"{content_prefix}│   [Error reading file: {str(e)}]")
+            yield f"{content_prefix}│   [Error reading file: {str(e)}]"
+
+    def _content_read_limit(self):
+        """Bytes of a file that max_bytes_per_file and the report budget may show, or None"""
+        limits = [limit for limit in (self.config.get('max_bytes_per_file') or None, self._content_bytes_left)
+                  if limit is not None]
+        return min(limits) if limits else None
+
+    def _redaction_engine(self):
+        return get_redaction_engine(
+            self.config.get('ignore_variables', []),
+            self.config.get('redaction_patterns', [])
+        )
+
+    def _render_content_lines(self, lines, content_prefix, first_line=0, file_bytes=0):
+        """
+        Apply line and byte limits and redaction to raw text lines of a file.
+        first_line and file_bytes continue the count of lines already shown;
+        returns the counts to continue from, or None once a limit was hit.
+        """
+        max_lines = self.config.get('max_lines', 50)
+        infinite_mode = max_lines == -1
+        max_bytes = self.config.get('max_bytes_per_file') or None
+        redaction_engine = self._redaction_engine()
+        line_num = first_line - 1
+
+        for line_num, line in enumerate(lines, first_line):
+            # Handle infinite lines if max_lines is -1
+            if not infinite_mode and line_num >= max_lines:
+                yield f"{content_prefix}│   [... {max_lines} lines shown]"
+                return None
+
+            if max_bytes is not None or self._content_bytes_left is not None:
+                line_bytes = len(line) if line.isascii() else len(line.encode('utf-8', 'replace'))
+                room = marker = None
+                if max_bytes is not None and file_bytes + line_bytes > max_bytes:
+                    room, marker = max_bytes - file_bytes, f"[... truncated after {max_bytes} bytes]"
+                budget_left = self._content_bytes_left
+                if budget_left is not None and line_bytes > budget_left and (room is None or budget_left < room):
+                    room, marker = budget_left, "[... report content budget reached]"
+                if marker is not None:
+                    # Show the part of the line that fits, then the marker
+                    if budget_left is not None:
+                        self._content_bytes_left = budget_left - room
+                    head = line.encode('utf-8', 'replace')[:room].decode('utf-8', 'ignore')
+                    if head:
+                        yield f"{content_prefix}│   {redaction_engine.redact(head.rstrip())}"
+                    yield f"{content_prefix}│   {marker}"
+                    return None
+                if budget_left is not None:
+                    self._content_bytes_left = budget_left - line_bytes
+                file_bytes += line_bytes
+
+            # Redact sensitive data before adding to output
+            cleaned_line = redaction_engine.redact(line.rstrip())
+            yield f"{content_prefix}│   {cleaned_line}"
+
+            # Safety limit
+            if infinite_mode and line_num > 1000000:
+                yield f"{content_prefix}│   [Stopped after 1,000,000 lines]"
+                return None
+
+        return line_num + 1, file_bytes
+
+    def _render_content_blocks(self, text, content_prefix):
+        """
+        _render_content_lines() for iter_structure_bytes(): yields the
+        content of a TextContent as UTF-8 bytes. A run of ASCII lines that
+        needs no stripping or redaction and stays within the limits is
+        rendered with a single replace() of its newlines, so its lines are
+        never split, decoded or formatted one by one. Other lines go
+        through _render_content_lines().
+        """
+        line_prefix = f"{content_prefix}│   ".encode('utf-8')
+        newline_prefix = b'\n' + line_prefix
+        max_lines = self.config.get('max_lines', 50)
+        # Without max_lines, _render_content_lines() stops after line 1,000,001
+        line_limit = 1000001 if max_lines == -1 else max_lines
+        max_bytes = self.config.get('max_bytes_per_file') or None
+        redaction_engine = self._redaction_engine()
+        errors = self.config.get('decode_errors', 'strict')
+        line_num = file_bytes = 0
+
+        for block in text.iter_blocks():
+            if block.isascii() and b'\r' not in block:
+                # Runs between the lines that rstrip() or redaction may change
+                pieces = []
+                pos = 0
+                for start, end in _changed_lines(block, redaction_engine):
+                    if start > pos:
+                        pieces.append((block[pos:start], True))
+                    pieces.append((block[start:end], False))
+                    pos = end
+                if pos < len(block):
+                    pieces.append((block[pos:] if pos else block, True))
+            else:
+                pieces = [(block, False)]
+
+            for piece, plain in pieces:
+                size = len(piece)
+                ends_line = piece.endswith(b'\n')
+                lines = piece.count(b'\n') + (not ends_line)
+                budget_left = self._content_bytes_left
+                if (plain and line_num + lines <= line_limit
+                        and (max_bytes is None or file_bytes + size <= max_bytes)
+                        and (budget_left is None or size <= budget_left)):
+                    rendered = line_prefix + piece.replace(b'\n', newline_prefix)
+                    if ends_line:
+                        # Drop the prefix added after the last newline, without a copy
+                        yield memoryview(rendered)[:-len(line_prefix)]
+                    else:
+                        yield rendered
+                        yield b'\n'
+                    line_num += lines
+                    file_bytes += size
+                    if budget_left is not None:
+                        self._content_bytes_left = budget_left - size
+                    continue
 
-        return content_lines
\ No newline at end of file
+                decoded = (raw.decode('utf-8', errors) for raw in piece.splitlines(True))
+                counts = yield from self._encode_lines(
+                    self._render_content_lines(decoded, content_prefix, line_num, file_bytes))
+                if counts is None:
+                    return
+                line_num, file_bytes = counts
+
+    @staticmethod
+    def _encode_lines(lines):
+        """Yield str lines as UTF-8 bytes with their newline; returns what the generator returned"""
+        while True:
+            try:
+                line = next(lines)
+            except StopIteration as stop:
+                return stop.value
+            yield (line + '\n').encode('utf-8')
@@ -0,0 +1,220 @@
+# stats.py
+"""
+DIRAI Scan Statistics
+
+Phase timings and counters for a single scan. ScanStats.instrument()
+wraps the hot methods of one DirectoryScanner instance, so scans without
+--stats run the plain methods and pay nothing.
+
+Phases nest: content time excludes redaction, "walk" is the scan time not
+spent in any other phase, and "output" is the time the consumer of the
+lines took (writing the report). Listing time is summed over threads when
+directories are listed concurrently, and content rendered on worker
+processes (--content-processes) is not measured.
+"""
+
+import heapq
+import os
+import threading
+import time
+
+SLOWEST = 10
+
+PHASES = ('gitignore', 'listing', 'matching', 'content', 'redaction', 'walk', 'output')
+
+
+class _TimedEngine:
+    """Redaction engine proxy that counts redacted lines and their time"""
+    __slots__ = ('_engine', '_stats')
+
+    def __init__(self, engine, stats):
+        self._engine = engine
+        self._stats = stats
+
+    def matching_lines(self, block):
+        start = time.perf_counter()
+        try:
+            return self._engine.matching_lines(block)
+        finally:
+            self._stats.add_time('redaction', time.perf_counter() - start)
+
+    def redact(self, line):
+        start = time.perf_counter()
+        result = self._engine.redact(line)
+        self._stats.add_time('redaction', time.perf_counter() - start)
+        if result != line:
+            self._stats.counts['lines_redacted'] += 1
+        return result
+
+
+class ScanStats:
+    def __init__(self, slowest=SLOWEST):
+        self.times = dict.fromkeys(('gitignore', 'listing', 'matching', 'file_content', 'redaction', 'scan'), 0.0)
+        self.counts = dict.fromkeys(
+            ('directories_listed', 'entries_visited', 'entries_excluded', 'directories_pruned',
+             'files_read', 'bytes_read', 'lines_redacted'),
+            0
+        )
+        self.total = 0.0
+        self.slowest = slowest
+        self._slowest_dirs = []
+        self._slowest_files = []
+        self._lock = threading.Lock()
+
+    def add_time(self, phase, seconds):
+        with self._lock:
+            self.times[phase] += seconds
+
+    def _rank(self, heap, seconds, path):
+        with self._lock:
+            item = (seconds, str(path))
+            if len(heap) < self.slowest:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+    def file_read(self, nbytes):
+        self.counts['files_read'] += 1
+        self.counts['bytes_read'] += nbytes
+
+    def instrument(self, scanner):
+        """Wrap the phase methods of a scanner instance with timers"""
+        stats = self
+        counts = self.counts
+        perf_counter = time.perf_counter
+
+        def timed(phase, method):
+            def wrapper(*args, **kwargs):
+                start = perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    stats.add_time(phase, perf_counter() - start)
+            return wrapper
+
+        def timed_iter(phase, iterator, path=None, heap=None):
+            elapsed = 0.0
+            try:
+                while True:
+                    start = perf_counter()
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        elapsed += perf_counter() - start
+                    yield item
+            finally:
+                stats.add_time(phase, elapsed)
+                if heap is not None:
+                    stats._rank(heap, elapsed, path)
+
+        scan_entries = scanner._scan_entries
+
+        def listing(current_dir, rel_dir=''):
+            start = perf_counter()
+            try:
+                return scan_entries(current_dir, rel_dir)
+            finally:
+                elapsed = perf_counter() - start
+                stats._rank(stats._slowest_dirs, elapsed, rel_dir or '.')
+                with stats._lock:
+                    stats.times['listing'] += elapsed
+                    counts['directories_listed'] += 1
+
+        is_excluded = scanner._is_excluded
+
+        def matching(rel_path, is_dir=None, gitignore=None):
+            start = perf_counter()
+            excluded = is_excluded(rel_path, is_dir, gitignore)
+            stats.add_time('matching', perf_counter() - start)
+            counts['entries_visited'] += 1
+            if excluded:
+                counts['entries_excluded'] += 1
+            return excluded
+
+        skips_listing = scanner._skips_listing
+
+        def pruning(rel_dir, depth):
+            skipped = skips_listing(rel_dir, depth)
+            if skipped:
+                counts['directories_pruned'] += 1
+            return skipped
+
+        iter_file_content = scanner._iter_file_content
+
+        def file_content(file_path, prefix, is_last):
+            path = os.path.relpath(file_path, scanner.base_dir) if scanner.base_dir else file_path
+            return timed_iter('file_content', iter_file_content(file_path, prefix, is_last),
+                              path, stats._slowest_files)
+
+        redaction_engine = scanner._redaction_engine
+
+        def engine():
+            return _TimedEngine(redaction_engine(), stats)
+
+        iter_structure = scanner.iter_structure
+
+        def structure(directory):
+            start = perf_counter()
+            try:
+                yield from timed_iter('scan', iter_structure(directory))
+            finally:
+                stats.total += perf_counter() - start
+
+        scanner._load_gitignore_spec = timed('gitignore', scanner._load_gitignore_spec)
+        scanner._read_directory_gitignore = timed('gitignore', scanner._read_directory_gitignore)
+        scanner._scan_entries = listing
+        scanner._is_excluded = matching
+        scanner._skips_listing = pruning
+        scanner._iter_file_content = file_content
+        scanner._redaction_engine = engine
+        scanner.iter_structure = structure
+
+    def phases(self):
+        """Exclusive wall time per phase, in seconds"""
+        times = self.times
+        content = max(times['file_content'] - times['redaction'], 0.0)
+        walk = times['scan'] - times['gitignore'] - times['listing'] - times['matching'] - times['file_content']
+        return {
+            'gitignore': times['gitignore'],
+            'listing': times['listing'],
+            'matching': times['matching'],
+            'content': content,
+            'redaction': times['redaction'],
+            'walk': max(walk, 0.0),
+            'output': max(self.total - times['scan'], 0.0),
+        }
+
+    def to_dict(self):
+        return {
+            'total_seconds': self.total,
+            'phases': self.phases(),
+            'counts': dict(self.counts),
+            'slowest_directories': [
+                {'path': path, 'seconds': seconds} for seconds, path in sorted(self._slowest_dirs, reverse=True)
+            ],
+            'slowest_files': [
+                {'path': path, 'seconds': seconds} for seconds, path in sorted(self._slowest_files, reverse=True)
+            ],
+        }
+
+    def format_table(self):
+        """Render the statistics as a plain text summary"""
+        data = self.to_dict()
+        total = data['total_seconds'] or 1.0
+        lines = [f"{'phase':<12} {'seconds':>10} {'share':>7}"]
+        for phase in PHASES:
+            seconds = data['phases'][phase]
+            lines.append(f"{phase:<12} {seconds:10.4f} {seconds / total:7.1%}")
+        lines.append(f"{'total':<12} {data['total_seconds']:10.4f}")
+        lines.append("")
+        for name, value in data['counts'].items():
+            lines.append(f"{name.replace('_', ' '):<20} {value:>12,}")
+        for title, key in (('Slowest directories', 'slowest_directories'), ('Slowest files', 'slowest_files')):
+            if data[key]:
+                lines.append("")
+                lines.append(f"{title}:")
+                for item in data[key]:
+                    lines.append(f"  {item['seconds']:10.4f}  {item['path']}")
+        return '\n'.join(lines)
@@ -0,0 +1,125 @@
+# tree.py
+"""
+DIRAI Tree Model
+
+A scanned tree kept as parallel arrays instead of formatted lines. Nodes
+are stored in walk order (a directory before its children, children in
+report order), so a node's subtree is the run of nodes that follows it and
+renderers never need child lists. Per node it holds an interned name id,
+the parent index, the kind, the size and the mtime. Symlink targets, file
+content lines and notes are kept in side tables for the nodes that have
+them.
+
+DirectoryScanner.build_tree() fills a model from the same walk that
+produces the text report, and dirai.render turns it into text, Markdown
+or JSON.
+"""
+
+from array import array
+
+DIRECTORY = 0
+FILE = 1
+SYMLINK = 2
+OTHER = 3
+
+# Set on a node drawn with the closing connector ('└── ') in the text tree
+LAST = 0x80
+KIND_MASK = 0x7f
+
+KIND_NAMES = {DIRECTORY: 'directory', FILE: 'file', SYMLINK: 'symlink', OTHER: 'other'}
+
+
+class TreeModel:
+    __slots__ = ('strings', '_ids', 'names', 'parents', 'kinds', 'sizes', 'mtimes',
+                 'targets', 'contents', 'notes', 'errors', '_directories')
+
+    def __init__(self, root_name=''):
+        self.strings = []
+        self._ids = {}
+        self.names = array('I')
+        self.parents = array('i')
+        self.kinds = array('B')
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.targets = {}
+        self.contents = {}
+        self.notes = {}
+        self.errors = {}
+        # rel_dir -> node of the directories being walked; dropped by finish()
+        self._directories = {'': 0}
+        self._append(root_name, -1, DIRECTORY | LAST, -1, -1.0)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _intern(self, name):
+        name_id = self._ids.get(name)
+        if name_id is None:
+            name_id = len(self.strings)
+            self._ids[name] = name_id
+            self.strings.append(name)
+        return name_id
+
+    def _append(self, name, parent, kind, size, mtime):
+        self.names.append(self._intern(name))
+        self.parents.append(parent)
+        self.kinds.append(kind)
+        self.sizes.append(size)
+        self.mtimes.append(mtime)
+        return len(self.names) - 1
+
+    def set_root(self, name):
+        self.names[0] = self._intern(name)
+
+    def add(self, rel_dir, name, kind, last=False, stat=None, target=None):
+        """Append a node under the directory walked as rel_dir; returns its index"""
+        size, mtime = (stat.st_size, stat.st_mtime) if stat is not None else (-1, -1.0)
+        index = self._append(name, self._directories[rel_dir], kind | (LAST if last else 0), size, mtime)
+        if target is not None:
+            self.targets[index] = target
+        return index
+
+    def enter(self, rel_dir, index):
+        """Register the node of a directory the walk descends into"""
+        self._directories[rel_dir] = index
+
+    def truncate(self, index):
+        """Drop node index and every node after it (a directory pruned after all)"""
+        for array_ in (self.names, self.parents, self.kinds, self.sizes, self.mtimes):
+            del array_[index:]
+        for table in (self.targets, self.contents, self.notes, self.errors):
+            # Side tables are filled in node order
+            while table and next(reversed(table)) >= index:
+                table.popitem()
+
+    def finish(self):
+        self._directories = {}
+        self._ids = {}
+
+    def name(self, index):
+        return self.strings[self.names[index]]
+
+    def kind(self, index):
+        return self.kinds[index] & KIND_MASK
+
+    def is_last(self, index):
+        return bool(self.kinds[index] & LAST)
+
+    def has_children(self, index):
+        return index + 1 < len(self.parents) and self.parents[index + 1] == index
+
+    def depths(self):
+        """Depth of every node (the root is 0), computed in one pass"""
+        depths = array('H', [0]) * len(self.parents)
+        parents = self.parents
+        for index in range(1, len(parents)):
+            depths[index] = depths[parents[index]] + 1
+        return depths
+
+    def path(self, index):
+        """Path of a node relative to the root, '/' separated"""
+        parts = []
+        while index > 0:
+            parts.append(self.name(index))
+            index = self.parents[index]
+        return '/'.join(reversed(parts))
@@ -3,17 +3,19 @@
 DIRAI Utility Functions
 """
 
-import re
 import sys
 from pathlib import Path
 from typing import Union
 import pathspec
 
+from dirai.content import SNIFF_SIZE, looks_binary
+from dirai.redaction import get_redaction_engine
+
 def is_binary(file_path: Union[str, Path]) -> bool:
     """Check if a file is binary"""
     try:
         with open(file_path, 'rb') as f:
-            return b'\x00' in f.read(1024)
+            return looks_binary(f.read(SNIFF_SIZE))
     except Exception:
         return True
 
@@ -27,25 +29,7 @@ def redact_sensitive_data(line: str, ignore_variables: list, redaction_patterns:
     Returns:
         Redacted text line
     """
-    # Redact variables from ignore list
-    for var in ignore_variables:
-        line = re.sub(
-            fr'(\b{re.escape(var)}\b\s*[:=]\s*)(["\']?)([^"\'\n]+)(["\']?)',
-            r'\1\2\4',  # Preserve quotes but empty the value
-            line,
-            flags=re.IGNORECASE
-        )
-
-    # Redact common patterns
-    for pattern in redaction_patterns:
-        line = re.sub(
-            fr'(\b{pattern}\b\s*[:=]\s*)(["\']?)([^"\'\n]+)(["\']?)',
-            r'\1\2\4',
-            line,
-            flags=re.IGNORECASE
-        )
-
-    return line
+    return get_redaction_engine(ignore_variables, redaction_patterns).redact(line)
 
 def validate_config(config: dict) -> None:
     """Validate configuration parameters"""
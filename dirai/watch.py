@@ -0,0 +1,469 @@
+# watch.py
+"""
+DIRAI Watch Mode
+
+Keeps the report of a directory up to date as files change. WatchScanner
+remembers, per directory, the listing and the rendered lines of its
+subtree, and per file its rendered content. A change to a path drops the
+cached lines of the path and of its ancestor directories only, so an
+update lists the changed directories, reads the changed files and reuses
+every other subtree as it was rendered.
+
+Changes come from inotify on Linux and from polling mtimes elsewhere (or
+with poll=True). Only directories the report actually lists are watched,
+so excluded trees such as node_modules/ cost nothing.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+
+from dirai.gitindex import find_git_dir
+from dirai.output import compression_format, open_output
+from dirai.scanner import DirectoryScanner
+
+POLL_INTERVAL = 0.5
+
+# Time to wait for more events once one arrived, so a burst of changes
+# (a git checkout, an editor's save) is applied in one update
+DEBOUNCE = 0.05
+
+# Files modified this close to the start of a render may have changed after
+# being read (mtimes come from a coarse clock), so they are checked again
+MTIME_SLACK_NS = 1_000_000_000
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class WatchScanner(DirectoryScanner):
+    """
+    A scanner that can render the same directory again after changes,
+    reusing everything that did not change.
+
+    Subtree lines are cached without their tree prefix, so a directory
+    whose connectors change (a sibling was added after it) is not read
+    again. When the output depends on walk order (follow_symlinks,
+    dedupe_content or a report-wide content budget), every update renders
+    from scratch.
+    """
+
+    def __init__(self, config, ignore=()):
+        # Listings and contents are reused across updates instead of
+        # being prefetched on threads or rendered on other processes
+        super().__init__(dict(config, workers=1, content_processes=1))
+        self.ignore = {os.path.realpath(path) for path in ignore}
+        self.incremental = (not self.config.get('follow_symlinks') and self._content_bytes_left is None
+                            and not self.config.get('dedupe_content'))
+        self._listings = {}
+        self._segments = {}
+        self._contents = {}
+        self._reset_files = set()
+
+    def render(self, directory):
+        """Render the report of directory, reusing what is cached"""
+        lines = list(self.iter_structure(directory))
+        self._reset_files = self._find_reset_files()
+        return lines
+
+    def reset(self):
+        self._listings.clear()
+        self._segments.clear()
+        self._contents.clear()
+
+    def _find_reset_files(self):
+        """Files whose change affects the whole report"""
+        files = {os.path.abspath(path) for path in self.config.get('gitignore_paths', [])}
+        files.add(os.path.join(self.base_dir, '.git', 'info', 'exclude'))
+        if self._git_index is not None:
+            found = find_git_dir(self.base_dir)
+            if found is not None:
+                files.add(os.path.join(found[0], 'index'))
+        return files
+
+    def changed(self, path):
+        """Forget what a change to path (absolute) may have made stale"""
+        path = os.path.abspath(path)
+        if path in self._reset_files or not self.incremental:
+            self.reset()
+            return
+        if path in self.ignore or self.base_dir is None:
+            return
+        rel_path = os.path.relpath(path, self.base_dir)
+        if rel_path == os.curdir:
+            self.reset()
+            return
+        if rel_path.startswith(os.pardir + os.sep) or rel_path == os.pardir:
+            return
+
+        parent = os.path.dirname(rel_path)
+        self._contents.pop(rel_path, None)
+        self._listings.pop(parent, None)
+        if rel_path in self._listings or rel_path in self._segments:
+            # A directory that was replaced, moved or removed
+            self._forget_subtree(rel_path)
+        if os.path.basename(rel_path) == '.gitignore':
+            self._forget_subtree(parent, listings=False)
+
+        while True:
+            self._segments.pop(parent, None)
+            if not parent:
+                break
+            parent = os.path.dirname(parent)
+
+    def _forget_subtree(self, rel_dir, listings=True):
+        below = rel_dir + os.sep if rel_dir else ''
+        caches = (self._segments, self._listings, self._contents) if listings else (self._segments,)
+        for cache in caches:
+            for key in [key for key in cache if key == rel_dir or key.startswith(below)]:
+                del cache[key]
+
+    def watched_paths(self):
+        """
+        (directories, files) whose changes can alter the report, directories
+        mapped to the names of the entries they were rendered with
+        """
+        directories = {}
+        files = list(self._reset_files)
+        for rel_dir, entries in self._listings.items():
+            directories[os.path.join(self.base_dir, rel_dir)] = frozenset(entry.name for entry in entries)
+            files.extend(entry.path for entry in entries if entry.is_file)
+        return directories, files
+
+    def _is_excluded(self, rel_path, is_dir=None, gitignore=None):
+        if self.ignore and os.path.join(self.base_dir, rel_path) in self.ignore:
+            return True
+        return super()._is_excluded(rel_path, is_dir, gitignore)
+
+    def _scan_entries(self, current_dir, rel_dir=''):
+        entries = self._listings.get(rel_dir)
+        if entries is None:
+            entries = super()._scan_entries(current_dir, rel_dir)
+            self._listings[rel_dir] = entries
+        return entries
+
+    def _iter_directory(self, current_dir, prefix='', depth=0, rel_dir='', gitignore=None, listing=None):
+        cached = self._segments.get(rel_dir)
+        if cached is not None:
+            for line in cached:
+                yield prefix + line
+            return
+
+        lines = []
+        for line in super()._iter_directory(current_dir, prefix, depth, rel_dir, gitignore, listing):
+            lines.append(line)
+            yield line
+        self._segments[rel_dir] = [line[len(prefix):] for line in lines]
+
+    def _iter_entry_content(self, entry, prefix, is_last):
+        content_prefix = prefix + ('    ' if is_last else '│   ')
+        cached = self._contents.get(entry.rel_path)
+        if cached is not None:
+            for line in cached:
+                yield content_prefix + line
+            return
+
+        lines = list(super()._iter_entry_content(entry, prefix, is_last))
+        self._contents[entry.rel_path] = [line[len(content_prefix):] for line in lines]
+        yield from lines
+
+
+def _load_libc():
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, 'inotify_init1'):
+        return None
+    libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+    libc.inotify_rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+    return libc
+
+
+class InotifyWatcher:
+    """Changed paths reported by inotify for a set of watched directories"""
+
+    def __init__(self, libc):
+        self._libc = libc
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._directories = {}
+        self._descriptors = {}
+        self._pending = set()
+
+    @classmethod
+    def create(cls):
+        """An inotify watcher, or None where inotify is not available"""
+        libc = _load_libc()
+        if libc is None:
+            return None
+        try:
+            return cls(libc)
+        except OSError:
+            return None
+
+    def watch(self, directories, files, since):
+        """
+        Watch exactly these directories (files are covered by their
+        directory). directories maps each one to the names it was rendered
+        with, since is the time_ns() the render started at.
+        """
+        wanted = set(directories)
+        wanted.update(os.path.dirname(path) for path in files)
+        for directory in list(self._descriptors):
+            if directory not in wanted:
+                self._libc.inotify_rm_watch(self._fd, self._descriptors.pop(directory))
+        for directory in wanted - self._descriptors.keys():
+            descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if descriptor < 0:
+                # A directory removed meanwhile fails to watch; its parent reports it
+                continue
+            self._descriptors[directory] = descriptor
+            self._directories[descriptor] = directory
+            if directory in directories:
+                # Entries that changed before the watch existed
+                self._pending.update(_changed_since(directory, directories[directory], since))
+
+    def wait(self, timeout):
+        """
+        Wait up to timeout seconds for changes and return the changed paths,
+        or None if events were lost and everything must be considered changed.
+        """
+        changed, self._pending = self._pending, set()
+        readable, _, _ = select.select([self._fd], [], [], 0 if changed else timeout)
+        if not readable:
+            return changed
+
+        overflow = False
+        while True:
+            try:
+                data = os.read(self._fd, 1 << 16)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise
+            pos = 0
+            while pos < len(data):
+                descriptor, mask, _, length = _EVENT_HEADER.unpack_from(data, pos)
+                pos += _EVENT_HEADER.size
+                name = data[pos:pos + length].rstrip(b'\0')
+                pos += length
+
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                directory = self._directories.get(descriptor)
+                if directory is None:
+                    continue
+                if mask & IN_IGNORED:
+                    del self._directories[descriptor]
+                    if self._descriptors.get(directory) == descriptor:
+                        del self._descriptors[directory]
+                    continue
+                changed.add(os.path.join(directory, os.fsdecode(name)) if name else directory)
+        return None if overflow else changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Changed paths found by comparing the mtimes of watched directories and files"""
+
+    def __init__(self):
+        self._directories = {}
+        self._files = {}
+
+    @staticmethod
+    def _signature(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    @staticmethod
+    def _names(directory):
+        try:
+            return frozenset(os.listdir(directory))
+        except OSError:
+            return frozenset()
+
+    def watch(self, directories, files, since):
+        """
+        Poll these directories and files. directories maps each one to the
+        names it was rendered with, since is the time_ns() the render started at.
+        """
+        snapshot = {}
+        for directory, names in directories.items():
+            known = self._directories.get(directory)
+            if known is not None and known[1] == names:
+                snapshot[directory] = known
+            else:
+                # Compared against the rendered names at the next poll
+                snapshot[directory] = (None, names)
+        self._directories = snapshot
+
+        known_files = self._files
+        self._files = {}
+        for path in files:
+            signature = known_files.get(path)
+            if signature is None:
+                signature = self._signature(path)
+                if signature is not None and signature[0] >= since:
+                    # Possibly written after it was read; check it again
+                    signature = None
+            self._files[path] = signature
+
+    def wait(self, timeout):
+        time.sleep(timeout)
+        changed = set()
+        for directory, (signature, names) in list(self._directories.items()):
+            current = self._signature(directory)
+            if current == signature:
+                continue
+            if current is None:
+                changed.add(directory)
+                continue
+            current_names = self._names(directory)
+            # Entries added or removed; modified files are found by their own mtime
+            changed.update(os.path.join(directory, name) for name in names ^ current_names)
+            self._directories[directory] = (current, current_names)
+        for path, signature in list(self._files.items()):
+            current = self._signature(path)
+            if current != signature:
+                changed.add(path)
+                self._files[path] = current
+        return changed
+
+    def close(self):
+        pass
+
+
+def _changed_since(directory, names, since):
+    """Paths in directory added, removed or modified since it was rendered"""
+    try:
+        with os.scandir(directory) as it:
+            current = {}
+            for entry in it:
+                current[entry.name] = entry
+    except OSError:
+        return {directory}
+    changed = {os.path.join(directory, name) for name in names ^ current.keys()}
+    for name, entry in current.items():
+        try:
+            if entry.stat(follow_symlinks=False).st_mtime_ns >= since:
+                changed.add(entry.path)
+        except OSError:
+            changed.add(entry.path)
+    return changed
+
+
+class ReportWatch:
+    """One report kept up to date: a scanner, its directory and its output file"""
+
+    def __init__(self, config, directory, output_file):
+        self.directory = directory
+        self.output_file = output_file
+        ignore = ()
+        if output_file != '-':
+            ignore = (output_file, self._temporary_path(output_file))
+        self.scanner = WatchScanner(config, ignore)
+        self.compress_threads = config.get('compress_threads') or 1
+        self.lines = None
+
+    @staticmethod
+    def _temporary_path(output_file):
+        return f"{output_file}.dirai-tmp"
+
+    def update(self):
+        """Render again and rewrite the output if it changed; True if it did"""
+        lines = self.scanner.render(self.directory)
+        if lines == self.lines:
+            return False
+        self.lines = lines
+        self._write(lines)
+        return True
+
+    def _write(self, lines):
+        if self.output_file == '-':
+            sys.stdout.write('\n'.join(lines) + '\n')
+            sys.stdout.flush()
+            return
+        # Readers of the report never see a half-written file
+        temporary = self._temporary_path(self.output_file)
+        with open_output(temporary, self.compress_threads, compression_format(self.output_file)) as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(temporary, self.output_file)
+
+
+def watch(reports, interval=POLL_INTERVAL, poll=False, stop=None, on_update=None):
+    """
+    Write the reports, then rewrite them as their directories change until
+    stop (a threading.Event) is set. on_update(report, seconds) is called
+    after each rewrite.
+    """
+    watcher = None if poll else InotifyWatcher.create()
+    if watcher is None:
+        watcher = PollingWatcher()
+
+    def sync(since):
+        directories, files = {}, set()
+        for report in reports:
+            report_directories, report_files = report.scanner.watched_paths()
+            directories.update(report_directories)
+            files.update(report_files)
+        watcher.watch(directories, files, since)
+
+    since = time.time_ns() - MTIME_SLACK_NS
+    for report in reports:
+        report.update()
+
+    try:
+        sync(since)
+        while stop is None or not stop.is_set():
+            changed = watcher.wait(interval)
+            if changed is not None and not changed:
+                continue
+            more = watcher.wait(DEBOUNCE) if changed is not None else set()
+            changed = None if more is None else changed | more
+
+            since = time.time_ns() - MTIME_SLACK_NS
+            start = time.perf_counter()
+            for report in reports:
+                if changed is None:
+                    report.scanner.reset()
+                else:
+                    for path in changed:
+                        report.scanner.changed(path)
+                if report.update() and on_update is not None:
+                    on_update(report, time.perf_counter() - start)
+            sync(since)
+    finally:
+        watcher.close()
@@ -0,0 +1,25 @@
+import pytest
+
+
+@pytest.fixture
+def make_config():
+    """
+    Factory of scanner configs: the defaults the tests share, plus the
+    keyword overrides given. A module needing other defaults overrides
+    this fixture with a functools.partial of it.
+    """
+    def make(**overrides):
+        config = {
+            'exclude': [],
+            'include': [],
+            'use_gitignore': False,
+            'show_content': False,
+            'max_depth': None,
+            'follow_symlinks': False,
+            'gitignore_paths': [],
+            'verbose': False,
+            'max_lines': -1,
+        }
+        config.update(overrides)
+        return config
+    return make
@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from dirai.aio import AsyncDirectoryScanner
+from dirai.scanner import DirectoryScanner
+
+
+@pytest.fixture
+def make_config(make_config):
+    return partial(make_config, show_content=True)
+
+def make_tree(root, dirs=5, files=10):
+    for i in range(dirs):
+        directory = root / f'dir_{i}'
+        directory.mkdir()
+        for j in range(files):
+            (directory / f'file_{j}.txt').write_text(f'line {i} {j}\npassword = secret\n')
+
+class TrackedScanner(AsyncDirectoryScanner):
+    """Counts the lines the synchronous walk produced and notes when it was closed"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.produced = 0
+        self.closed = False
+
+    def _make_scanner(self):
+        scanner = DirectoryScanner(self.config)
+        iter_structure = scanner.iter_structure
+
+        def tracked(directory):
+            try:
+                for line in iter_structure(directory):
+                    self.produced += 1
+                    yield line
+            finally:
+                self.closed = True
+
+        scanner.iter_structure = tracked
+        return scanner
+
+
+def test_async_scan_matches_sync(tmp_path, make_config):
+    make_tree(tmp_path)
+    expected = DirectoryScanner(make_config(workers=2)).generate_structure(tmp_path)
+    scanner = AsyncDirectoryScanner(make_config(workers=2), batch_size=7)
+    assert asyncio.run(scanner.generate_structure(tmp_path)) == expected
+
+def test_concurrent_scans_share_a_bounded_executor(tmp_path, make_config):
+    for name in ('a', 'b', 'c'):
+        (tmp_path / name).mkdir()
+        make_tree(tmp_path / name, dirs=3, files=5)
+    expected = {
+        name: DirectoryScanner(make_config()).generate_structure(tmp_path / name) for name in 'abc'
+    }
+
+    async def main():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            scanner = AsyncDirectoryScanner(make_config(), executor=executor, batch_size=5)
+            results = await asyncio.gather(*(scanner.generate_structure(tmp_path / name) for name in 'abc'))
+        return dict(zip('abc', results))
+
+    assert asyncio.run(main()) == expected
+
+def test_slow_consumer_pauses_the_walk(tmp_path, make_config):
+    make_tree(tmp_path, dirs=10, files=20)
+    scanner = TrackedScanner(make_config(), batch_size=10)
+
+    async def main():
+        lines = scanner.iter_structure(tmp_path)
+        await lines.__anext__()
+        await asyncio.sleep(0.2)
+        produced = scanner.produced
+        await lines.aclose()
+        return produced
+
+    # The batch being consumed and the one prefetched, nothing more
+    assert asyncio.run(main()) <= 20
+    assert scanner.closed
+
+def test_cancelled_scan_closes_the_walk(tmp_path, make_config):
+    make_tree(tmp_path, dirs=10, files=20)
+    scanner = TrackedScanner(make_config(), batch_size=10)
+
+    async def main():
+        seen = []
+
+        async def consume():
+            async for line in scanner.iter_structure(tmp_path):
+                seen.append(line)
+                if len(seen) == 15:
+                    task.cancel()
+                await asyncio.sleep(0)
+
+        task = asyncio.ensure_future(consume())
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return seen
+
+    seen = asyncio.run(main())
+    assert len(seen) == 15
+    assert scanner.closed
+    assert scanner.produced < 200
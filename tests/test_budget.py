@@ -0,0 +1,112 @@
+import os
+import pytest
+from functools import partial
+from dirai.budget import estimate_tokens, pack_tree
+from dirai.render import render_json, render_markdown, render_text
+from dirai.scanner import DirectoryScanner
+
+
+@pytest.fixture
+def make_config(make_config):
+    return partial(make_config, show_content=True)
+
+def write(path, text, mtime):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    os.utime(path, (mtime, mtime))
+
+@pytest.fixture
+def tree_dir(tmp_path):
+    write(tmp_path / 'README.md', 'Project readme with a short introduction.\n' * 20, 1000)
+    write(tmp_path / 'big.txt', 'lorem ipsum dolor sit amet consectetur\n' * 200, 2000)
+    write(tmp_path / 'src' / 'app.py', 'def main():\n    return compute(1, 2)\n' * 10, 3000)
+    write(tmp_path / 'src' / 'deep' / 'old.py', 'x = 1\n' * 10, 500)
+    return tmp_path
+
+def content_of(lines, name):
+    """Content lines drawn right below the entry line of name"""
+    start = next(i for i, line in enumerate(lines) if line.endswith(('── ' + name)))
+    body = []
+    for line in lines[start + 1:]:
+        if '── ' in line:
+            break
+        body.append(line)
+    return body
+
+
+def test_estimate_tokens():
+    assert estimate_tokens('') == 0
+    assert estimate_tokens('hello world') == 2
+    assert estimate_tokens('getUserName(id=42)') == 8
+    assert estimate_tokens('internationalization') == 3
+    assert estimate_tokens('    return 1234567') == 5
+
+def test_large_budget_keeps_everything(tree_dir, make_config):
+    config = make_config()
+    tree = DirectoryScanner(config).build_tree(tree_dir)
+    packing = pack_tree(tree, 10 ** 6, config)
+
+    assert packing['files_omitted'] == 0
+    assert list(render_text(tree)) == DirectoryScanner(config).generate_structure(tree_dir)
+
+def test_small_budget_keeps_skeleton(tree_dir, make_config):
+    config = make_config()
+    full = DirectoryScanner(config).generate_structure(tree_dir)
+    tree = DirectoryScanner(config).build_tree(tree_dir)
+    packing = pack_tree(tree, 10, config)
+
+    lines = list(render_text(tree))
+    assert packing['files_kept'] == 0
+    assert packing['skeleton_tokens'] > 10
+    assert [line for line in lines if '── ' in line] == [line for line in full if '── ' in line]
+    assert all('[Content omitted: ~' in content_of(lines, name)[0]
+               for name in ('README.md', 'big.txt', 'app.py', 'old.py'))
+
+@pytest.mark.parametrize('renderer', [render_text, render_markdown, render_json])
+def test_packed_report_fits_budget(tree_dir, renderer, make_config):
+    config = make_config()
+    tree = DirectoryScanner(config).build_tree(tree_dir)
+    packing = pack_tree(tree, 600, config, renderer)
+
+    assert 0 < packing['files_kept'] < 4
+    assert packing['tokens'] <= 600
+    assert sum(estimate_tokens(line) for line in renderer(tree)) <= 600
+
+def test_priority_weights(tree_dir, make_config):
+    # Only recency counts: the newest files are kept first
+    config = make_config(token_priority={'depth': 0, 'size': 0, 'patterns': 0})
+    tree = DirectoryScanner(config).build_tree(tree_dir)
+    pack_tree(tree, 400, config)
+    lines = list(render_text(tree))
+    assert 'return compute(1, 2)' in content_of(lines, 'app.py')[1]
+    assert 'Content omitted' in content_of(lines, 'README.md')[0]
+
+    # Priority patterns win over depth and size
+    config = make_config(priority_patterns=['deep/*.py'], token_priority={'depth': 0, 'recency': 0})
+    tree = DirectoryScanner(config).build_tree(tree_dir)
+    pack_tree(tree, 300, config)
+    lines = list(render_text(tree))
+    assert content_of(lines, 'old.py')[0].endswith('x = 1')
+
+    with pytest.raises(ValueError):
+        pack_tree(tree, 300, make_config(token_priority={'age': 1}))
+
+def test_references_follow_their_content(tmp_path, make_config):
+    write(tmp_path / 'a' / 'big.txt', 'lorem ipsum dolor sit amet consectetur\n' * 100, 1000)
+    write(tmp_path / 'z' / 'copy.txt', 'lorem ipsum dolor sit amet consectetur\n' * 100, 2000)
+    config = make_config(dedupe_content=True)
+    reference = f"[same content as {os.path.join('a', 'big.txt')}]"
+
+    tree = DirectoryScanner(config).build_tree(tmp_path)
+    packing = pack_tree(tree, 200, config)
+    lines = list(render_text(tree))
+    assert packing['files_omitted'] == 2
+    assert 'Content omitted' in content_of(lines, 'big.txt')[0]
+    assert content_of(lines, 'copy.txt')[0].strip(' │') == content_of(lines, 'big.txt')[0].strip(' │')
+    assert sum(estimate_tokens(line) for line in lines) <= 200
+
+    tree = DirectoryScanner(config).build_tree(tmp_path)
+    packing = pack_tree(tree, 10 ** 4, config)
+    lines = list(render_text(tree))
+    assert packing['files_kept'] == 2
+    assert content_of(lines, 'copy.txt')[0].endswith(reference)
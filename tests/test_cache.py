@@ -0,0 +1,96 @@
+import os
+import time
+import pytest
+from functools import partial
+from unittest.mock import patch
+from dirai.cache import ScanCache, profile_hash
+from dirai.constants import CACHE_DIR_NAME
+from dirai.scanner import DirectoryScanner
+
+
+@pytest.fixture
+def make_config(make_config):
+    return partial(make_config, show_content=True, cache=True)
+
+def make_old(*paths):
+    # Entries modified just now are never cached, so backdate them
+    old = time.time() - 60
+    for path in paths:
+        os.utime(path, (old, old))
+
+def make_tree(root):
+    (root / 'src').mkdir()
+    (root / 'src' / 'main.py').write_text('print(1)\npassword = "x"\n')
+    (root / 'README.md').write_text('# Title\n')
+    make_old(root / 'src' / 'main.py', root / 'README.md', root / 'src')
+
+@pytest.fixture
+def scan(make_config):
+    def scan(root, **overrides):
+        scanner = DirectoryScanner(make_config(**overrides))
+        structure = scanner.generate_structure(root)
+        return structure, scanner.cache_stats
+    return scan
+
+def test_profile_hash_depends_on_content_settings():
+    assert profile_hash({'max_lines': 5}) == profile_hash({'max_lines': 5, 'exclude': ['x']})
+    assert profile_hash({'max_lines': 5}) != profile_hash({'max_lines': 6})
+
+def test_second_scan_hits_cache(tmp_path, scan):
+    make_tree(tmp_path)
+    first, stats = scan(tmp_path)
+    assert stats['content_misses'] == 2
+    make_old(tmp_path)
+
+    second, stats = scan(tmp_path)
+    assert second == first
+    assert stats['content_hits'] == 2
+    # The root listing changed when .dirai_cache was created, src/ did not
+    assert stats['listing_hits'] == 1
+    assert not any(CACHE_DIR_NAME in line for line in second)
+    assert (tmp_path / CACHE_DIR_NAME / '.gitignore').read_text() == '*\n'
+
+def test_changed_file_is_rendered_again(tmp_path, scan):
+    make_tree(tmp_path)
+    scan(tmp_path)
+
+    (tmp_path / 'README.md').write_text('# New title\n')
+    structure, stats = scan(tmp_path)
+    assert "    │   # New title" in structure
+    assert stats['content_hits'] == 1
+    assert stats['content_misses'] == 1
+
+def test_recent_changes_are_not_stored(tmp_path, scan):
+    (tmp_path / 'fresh.txt').write_text('new\n')
+    scan(tmp_path)
+    _, stats = scan(tmp_path)
+    assert stats['content_hits'] == 0
+
+def test_rebuild_and_disable(tmp_path, scan):
+    make_tree(tmp_path)
+    scan(tmp_path)
+
+    _, stats = scan(tmp_path, rebuild_cache=True)
+    assert stats['content_hits'] == 0
+    _, stats = scan(tmp_path, cache=False)
+    assert stats is None
+
+def test_read_errors_are_not_stored(tmp_path, scan):
+    make_tree(tmp_path)
+    with patch('dirai.scanner.open_text', side_effect=PermissionError("Permission denied")):
+        structure, _ = scan(tmp_path)
+    assert "    │   [Error reading file: Permission denied]" in structure
+
+    structure, stats = scan(tmp_path)
+    assert "    │   # Title" in structure
+    assert stats['content_hits'] == 0
+
+def test_profile_settings_are_part_of_the_key(tmp_path, scan):
+    make_tree(tmp_path)
+    scan(tmp_path)
+    structure, stats = scan(tmp_path, redaction_patterns=['password'])
+    assert stats['content_hits'] == 0
+    assert '│       │   password = ""' in structure
+
+def test_open_returns_none_when_disabled(tmp_path):
+    assert ScanCache.open(str(tmp_path), {'cache': False}) is None
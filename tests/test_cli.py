@@ -5,6 +5,7 @@ DIRAI - Enhanced Directory Structure Analyzer (No Color Version)
 """
 
 import os
+import subprocess
 import sys
 from pathlib import Path
 import click
@@ -13,7 +14,7 @@ from dirai.config import DiraiConfig
 from dirai.constants import CONFIG_FILE_NAME, DEFAULT_CONFIG
 import pytest
 from unittest.mock import patch, MagicMock
-from dirai.cli import parse_arguments
+from dirai.cli import parse_arguments, run_profiles
 
 @click.command()
 @click.option("--profiles", default="default", help="Run multiple profiles sequentially. Use 'all' to run all profiles from config")
@@ -127,6 +128,31 @@ def test_parse_arguments_custom(mock_config_handler):
         assert args.exclude == ['*.log', '*.tmp']
         assert args.max_depth == 3
 
+def test_startup_defers_heavy_imports():
+    code = (
+        "import sys\n"
+        "sys.argv = ['dirai', '--max-depth', '2']\n"
+        "from dirai.cli import parse_arguments\n"
+        "parse_arguments()\n"
+        "print(sorted(m for m in ('yaml', 'pathspec', 'dirai.scanner', 'dirai.config') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=Path(__file__).parent.parent,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
+
+def test_run_profiles_with_content_processes_runs_one_after_another(tmp_path):
+    handler = MagicMock()
+    handler.get_profile.side_effect = lambda name: {
+        'directory': str(tmp_path), 'output': str(tmp_path / f'{name}.txt'),
+        'show_content': True, 'content_processes': 2,
+    }
+    with patch('sys.argv', ['dirai', '-p', 'a', 'b']):
+        args = parse_arguments()
+    with patch('dirai.cli.run_profile') as run_profile, patch('dirai.multi.MultiProfileScanner') as multi:
+        run_profiles(['a', 'b'], handler, args)
+    assert run_profile.call_count == 2
+    assert multi.call_count == 0
+
 # def test_run_profile(mock_config_handler, tmp_path):
 #     cli_args = MagicMock()
 #     cli_args.directory = str(tmp_path)
@@ -196,4 +222,4 @@ if __name__ == "__main__":
         main()
     except KeyboardInterrupt:
         print("\nOperation cancelled by user")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
@@ -83,4 +83,31 @@ def test_merge_configs():
         'default': {'a': 1, 'b': 2},
         'web': {'b': 3, 'c': 5, 'd': 6},
         'docs': {'e': 7}
-    }
\ No newline at end of file
+    }
+
+def test_config_snapshot_skips_yaml(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    config_file = tmp_path / CONFIG_FILE_NAME
+    config_file.write_text("web:\n  exclude: ['node_modules']\n  max_depth: 2\n")
+
+    config = DiraiConfig()
+    config.config_path = config_file
+    parsed = config._load_config()
+    assert parsed['web'] == {'exclude': ['node_modules'], 'max_depth': 2}
+
+    with patch('yaml.safe_load', side_effect=AssertionError("config parsed again")):
+        assert config._load_config() == parsed
+
+    config_file.write_text("web:\n  exclude: ['dist']\n")
+    assert config._load_config()['web'] == {'exclude': ['dist']}
+
+def test_config_snapshot_unwritable_cache(tmp_path, monkeypatch):
+    blocker = tmp_path / 'cache'
+    blocker.write_text('not a directory')
+    monkeypatch.setenv('XDG_CACHE_HOME', str(blocker))
+    config_file = tmp_path / CONFIG_FILE_NAME
+    config_file.write_text("docs:\n  include: ['*.md']\n")
+
+    config = DiraiConfig()
+    config.config_path = config_file
+    assert config._load_config()['docs'] == {'include': ['*.md']}
@@ -0,0 +1,54 @@
+import pytest
+from unittest.mock import patch
+from dirai import content
+from dirai.content import looks_binary, open_text
+
+
+def test_looks_binary_nul_byte():
+    assert looks_binary(b'abc\x00def') is True
+    assert looks_binary(b'plain text\n') is False
+
+def test_looks_binary_signatures():
+    assert looks_binary(b'\x89PNG\r\n\x1a\n....') is True
+    assert looks_binary(b'\x7fELF\x02\x01\x01') is True
+    assert looks_binary(b'SQLite format 3\x00') is True
+    assert looks_binary(b'BZh91AY&SY') is True
+    assert looks_binary(b'BZh is not bzip2') is False
+
+def test_open_text_binary(tmp_path):
+    path = tmp_path / 'image.png'
+    path.write_bytes(b'\x89PNG\r\n\x1a\nrest')
+    assert open_text(path) is None
+
+def test_open_text_opens_file_once(tmp_path):
+    path = tmp_path / 'text.txt'
+    path.write_text('one\r\ntwo\n')
+    real_open = open
+    with patch('builtins.open', side_effect=real_open) as opener:
+        with open_text(path) as text:
+            assert list(text) == ['one\r\n', 'two\n']
+    assert opener.call_count == 1
+
+def test_open_text_late_decode_error(tmp_path):
+    path = tmp_path / 'late.txt'
+    path.write_bytes(b'a' * 5000 + b'\n\xff tail\n')
+
+    with open_text(path, 'replace') as text:
+        assert list(text)[-1] == '� tail\n'
+
+    with open_text(path) as text:
+        with pytest.raises(UnicodeDecodeError):
+            list(text)
+
+def test_open_text_mmap_matches_small_read(tmp_path, monkeypatch):
+    path = tmp_path / 'mixed.txt'
+    path.write_bytes(b'one\r\ntwo\rthree\n\xff four\nno newline')
+
+    with open_text(path, 'replace') as text:
+        expected = list(text)
+    monkeypatch.setattr(content, 'MMAP_THRESHOLD', 1)
+    monkeypatch.setattr(content, 'MMAP_BLOCK_SIZE', 4)
+    with open_text(path, 'replace') as text:
+        assert text._map is not None
+        assert list(text) == expected
+    assert expected == ['one\r\n', 'two\r', 'three\n', '\ufffd four\n', 'no newline']
@@ -0,0 +1,63 @@
+import os
+import pytest
+from functools import partial
+from unittest.mock import patch
+from dirai.dedupe import DuplicateFinder
+from dirai.multi import MultiProfileScanner, ProfileOutput
+from dirai.scanner import DirectoryScanner
+
+
+BODY = 'def main():\n    # Long enough to be deduplicated\n    return "the same body in several places"\n'
+
+
+@pytest.fixture
+def make_config(make_config):
+    return partial(make_config, show_content=True, dedupe_content=True)
+
+def make_tree(root):
+    (root / 'a').mkdir()
+    (root / 'b').mkdir()
+    (root / 'a' / 'main.py').write_text(BODY)
+    (root / 'b' / 'copy.py').write_text(BODY)
+    # Same size, different content
+    (root / 'b' / 'other.py').write_text(BODY.replace('same', 'SAME'))
+    (root / 'small.txt').write_text('tiny\n')
+    (root / 'tiny.txt').write_text('tiny\n')
+
+def test_copies_refer_to_first(tmp_path, make_config):
+    make_tree(tmp_path)
+    lines = DirectoryScanner(make_config()).generate_structure(tmp_path)
+
+    assert f"│   │   │   [same content as {os.path.join('a', 'main.py')}]" in lines
+    assert sum(line.endswith('"the same body in several places"') for line in lines) == 1
+    assert sum(line.endswith('"the SAME body in several places"') for line in lines) == 1
+    # Files below the minimum size are always shown
+    assert sum(line.endswith('│   tiny') for line in lines) == 2
+
+def test_disabled_by_default(tmp_path, make_config):
+    make_tree(tmp_path)
+    lines = DirectoryScanner(make_config(dedupe_content=False)).generate_structure(tmp_path)
+    assert not any('[same content as' in line for line in lines)
+
+def test_hardlinks_are_not_read_again(tmp_path):
+    (tmp_path / 'one.txt').write_text(BODY)
+    os.link(tmp_path / 'one.txt', tmp_path / 'two.txt')
+
+    finder = DuplicateFinder()
+    first = tmp_path / 'one.txt'
+    assert finder.first_copy(str(first), 'one.txt', first.stat()) is None
+    second = tmp_path / 'two.txt'
+    with patch('dirai.dedupe.content_digest') as digest:
+        assert finder.first_copy(str(second), 'two.txt', second.stat()) == 'one.txt'
+    # The inode identifies the copy without hashing either file
+    assert digest.call_count == 0
+
+def test_pipeline_and_multi_profile_match(tmp_path, make_config):
+    make_tree(tmp_path)
+    expected = DirectoryScanner(make_config()).generate_structure(tmp_path)
+
+    assert DirectoryScanner(make_config(content_processes=2)).generate_structure(tmp_path) == expected
+
+    result = []
+    MultiProfileScanner([ProfileOutput(DirectoryScanner(make_config()), result.append)]).scan(tmp_path)
+    assert result == expected
@@ -0,0 +1,153 @@
+import os
+import shutil
+import subprocess
+import pytest
+from dirai.gitignore import GitignoreMatcher, compile_rules, parse_gitignore
+from dirai.scanner import DirectoryScanner
+
+requires_git = pytest.mark.skipif(shutil.which('git') is None, reason="git is not installed")
+
+# Fixture trees: {path: content}, directories end with '/'
+FIXTURES = {
+    'negation': {
+        '.gitignore': '*.log\n!keep.log\n',
+        'a.log': '', 'keep.log': '', 'sub/b.log': '', 'sub/keep.log': '', 'sub/c.txt': '',
+    },
+    'nested_negation': {
+        '.gitignore': '*.log\nbuild/\n',
+        'a.log': '',
+        'sub/.gitignore': '!important.log\n',
+        'sub/important.log': '', 'sub/other.log': '', 'sub/deep/important.log': '',
+        'sub/build/out.txt': '',
+    },
+    'anchoring': {
+        '.gitignore': '/build\n/top.txt\n',
+        'build/x': '', 'top.txt': '', 'sub/build/x': '', 'sub/top.txt': '',
+        'sub/.gitignore': '/out\ndocs/*.md\n',
+        'sub/out/y': '', 'sub/deep/out/y': '', 'sub/docs/a.md': '', 'sub/docs/b.txt': '',
+        'sub/deep/docs/a.md': '', 'docs/a.md': '',
+    },
+    'any_depth': {
+        'sub/.gitignore': '*.tmp\ncache\n',
+        'x.tmp': '', 'cache/a': '', 'sub/x.tmp': '', 'sub/deep/er/y.tmp': '',
+        'sub/deep/cache/a': '', 'sub/cache': '',
+    },
+    'directory_only': {
+        '.gitignore': 'logs/\n*.d/\n',
+        'logs/a': '', 'x/logs': '', 'y/logs/b': '', 'conf.d/a': '', 'file.d': '',
+    },
+    'directory_contents': {
+        '.gitignore': 'dir/*\n!dir/keep\nother/**\n',
+        'dir/a': '', 'dir/keep': '', 'dir/sub/b': '', 'other/c': '', 'other/d/e': '',
+    },
+    'double_star': {
+        '.gitignore': 'a/**/b\n**/cache\nlib/**/*.pyc\n',
+        'a/b': '', 'a/x/b': '', 'a/x/y/b': '', 'c/a/b': '', 'cache/z': '', 'deep/er/cache/z': '',
+        'lib/m.pyc': '', 'lib/p/q/m.pyc': '', 'm.pyc': '',
+    },
+    'precedence': {
+        '.gitignore': '*.keep\n!*.txt\n',
+        'a.keep': '', 'a.txt': '',
+        'sub/.gitignore': '!*.keep\n*.txt\n',
+        'sub/b.keep': '', 'sub/b.txt': '', 'sub/inner/c.keep': '', 'sub/inner/c.txt': '',
+    },
+    'syntax': {
+        '.gitignore': '# comment\n\\#hash\n\\!bang\ntrail   \n\r\n  lead\nfo?\n[ab].md\n*.bak\n',
+        '#hash': '', '!bang': '', 'trail': '', 'foo': '', 'fxo': '', 'a.md': '', 'c.md': '',
+        'x.bak': '', 'comment': '',
+    },
+    'info_exclude': {
+        '.git/info/exclude': '*.secret\n',
+        '.gitignore': '!public.secret\n',
+        'a.secret': '', 'public.secret': '', 'sub/b.secret': '',
+    },
+}
+
+
+def make_fixture(root, files):
+    subprocess.run(['git', 'init', '-q', str(root)], check=True, env=git_env(root))
+    for path, content in files.items():
+        full = root / path
+        full.parent.mkdir(parents=True, exist_ok=True)
+        if path.endswith('/'):
+            full.mkdir(exist_ok=True)
+        else:
+            full.write_text(content)
+
+def git_env(root):
+    return dict(os.environ, GIT_CONFIG_GLOBAL=os.devnull, GIT_CONFIG_NOSYSTEM='1', HOME=str(root))
+
+def git_ignored(root, paths):
+    result = subprocess.run(
+        ['git', 'check-ignore', '--stdin', '--no-index'], cwd=root, env=git_env(root),
+        input='\n'.join(paths) + '\n', capture_output=True, text=True
+    )
+    return set(result.stdout.splitlines())
+
+def git_untracked_files(root):
+    result = subprocess.run(
+        ['git', 'ls-files', '--others', '--exclude-standard'], cwd=root, env=git_env(root),
+        capture_output=True, text=True, check=True
+    )
+    return set(result.stdout.splitlines())
+
+def listed_files(structure):
+    """Rebuild file paths from the tree lines of a report"""
+    stack = []
+    files = set()
+    for line in structure[1:]:
+        for connector in ('├── ', '└── '):
+            position = line.find(connector)
+            if position != -1:
+                break
+        depth = position // 4
+        name = line[position + 4:]
+        del stack[depth:]
+        if name.endswith('/'):
+            stack.append(name[:-1])
+        else:
+            files.add('/'.join(stack + [name]))
+    return files
+
+
+@requires_git
+@pytest.mark.parametrize('fixture', sorted(FIXTURES))
+def test_gitignore_parity_with_git(tmp_path, fixture, make_config):
+    make_fixture(tmp_path, FIXTURES[fixture])
+    scanner = DirectoryScanner(make_config(use_gitignore=True))
+
+    assert listed_files(scanner.generate_structure(tmp_path)) == git_untracked_files(tmp_path)
+
+    # Every path the walk reaches gets the same decision as git check-ignore
+    decisions = {}
+
+    def visit(directory, rel_dir, matcher):
+        entries = scanner._scan_entries(directory, rel_dir)
+        matcher = scanner._load_directory_gitignore(directory, rel_dir, entries, matcher)
+        for entry in entries:
+            if entry.name == '.git':
+                continue
+            ignored = matcher.is_ignored(entry.rel_path, entry.is_dir)
+            decisions[entry.rel_path] = ignored
+            if entry.is_dir and not ignored:
+                visit(entry.path, entry.rel_path, matcher)
+
+    visit(str(tmp_path), '', scanner.gitignore)
+    expected = git_ignored(tmp_path, sorted(decisions))
+    assert {path for path, ignored in decisions.items() if ignored} == expected
+
+def test_parse_gitignore_bom_and_crlf():
+    assert parse_gitignore(b'\xef\xbb\xbf*.log\r\nbuild/\n') == ('*.log', 'build/', '')
+
+def test_compile_rules_is_shared():
+    assert compile_rules(('*.log',)) is compile_rules(('*.log',))
+    assert compile_rules(('# only comments', '')) is None
+
+def test_matcher_deepest_rule_wins():
+    root = GitignoreMatcher('', compile_rules(('*.log',)))
+    sub = root.stack('sub', compile_rules(('!keep.log', '/local.log')))
+    assert root.stack('other', None) is root
+    assert sub.is_ignored('sub/deep/keep.log') is False
+    assert sub.is_ignored('sub/deep/local.log') is True
+    assert sub.is_ignored('sub/local.log') is True
+    assert sub.is_ignored('sub/x.txt') is False
@@ -0,0 +1,142 @@
+import os
+import shutil
+import subprocess
+import pytest
+from functools import partial
+from unittest.mock import patch
+from dirai.gitindex import GitIndexError, GitIndexTree, find_git_dir, parse_index
+from dirai.scanner import DirectoryScanner
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason="git is not installed")
+
+
+def git(root, *args):
+    env = dict(os.environ, GIT_CONFIG_GLOBAL=os.devnull, GIT_CONFIG_NOSYSTEM='1', HOME=str(root))
+    return subprocess.run(['git', *args], cwd=root, env=env, check=True, capture_output=True, text=True).stdout
+
+def make_repo(root, index_version=None):
+    git(root, 'init', '-q')
+    files = {
+        '.gitignore': '*.log\nbuild/\n',
+        'README.md': '# Readme\n',
+        'src/main.py': 'print(1)\n',
+        'src/pkg/__init__.py': '',
+        'src/pkg/deep/a_rather_long_module_name.py': 'x = 1\n',
+        'docs/guide.md': 'guide\n',
+        'build/keep.txt': 'tracked though ignored\n',
+        'tracked.log': 'tracked though ignored\n',
+    }
+    for path, content in files.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(content)
+    os.symlink('src/main.py', root / 'main_link')
+    git(root, 'add', '.')
+    git(root, 'add', '-f', 'build/keep.txt', 'tracked.log')
+    if index_version:
+        git(root, 'update-index', '--index-version', str(index_version))
+
+    # Untracked files, ignored or not
+    (root / 'notes.txt').write_text('untracked\n')
+    (root / 'src' / 'scratch.py').write_text('untracked\n')
+    (root / 'debug.log').write_text('ignored\n')
+    (root / 'build' / 'out.o').write_text('ignored\n')
+
+@pytest.fixture
+def make_config(make_config):
+    return partial(make_config, use_gitignore=True, source='git-index')
+
+def listed_paths(structure):
+    """Rebuild the paths of a report from its tree lines"""
+    stack = []
+    paths = set()
+    for line in structure[1:]:
+        position = max(line.find('├── '), line.find('└── '))
+        depth = position // 4
+        name = line[position + 4:].split('@ -> ')[0]
+        del stack[depth:]
+        if name.endswith('/'):
+            stack.append(name[:-1])
+        else:
+            paths.add('/'.join(stack + [name]))
+    return paths
+
+
+@pytest.mark.parametrize('version', [2, 3, 4])
+def test_parse_index_matches_git(tmp_path, version):
+    make_repo(tmp_path, index_version=version)
+    if version == 3:
+        # An intent-to-add entry needs the extended flags of version 3
+        git(tmp_path, 'add', '-N', 'notes.txt')
+
+    with open(tmp_path / '.git' / 'index', 'rb') as f:
+        data = f.read()
+    assert int.from_bytes(data[4:8], 'big') == version
+
+    expected = []
+    for line in git(tmp_path, 'ls-files', '-s').splitlines():
+        info, path = line.split('\t', 1)
+        expected.append((path, int(info.split()[0], 8)))
+    assert parse_index(data) == expected
+
+def test_parse_index_rejects_corrupt_data(tmp_path):
+    make_repo(tmp_path)
+    data = bytearray((tmp_path / '.git' / 'index').read_bytes())
+    data[20] ^= 0xff
+    with pytest.raises(GitIndexError):
+        parse_index(bytes(data))
+    with pytest.raises(GitIndexError):
+        parse_index(b'not an index at all, clearly not one')
+
+def test_parse_index_without_checksum(tmp_path, make_config):
+    make_repo(tmp_path)
+    git(tmp_path, '-c', 'index.skipHash=true', 'update-index', '--force-write-index')
+    index = tmp_path / '.git' / 'index'
+    data = index.read_bytes()
+    if any(data[-20:]):
+        # git before 2.40 ignores index.skipHash; write the zero checksum it stands for
+        index.write_bytes(data[:-20] + bytes(20))
+
+    with patch('os.scandir', wraps=os.scandir) as scandir:
+        structure = DirectoryScanner(make_config()).generate_structure(tmp_path)
+        assert scandir.call_count == 0
+    assert listed_paths(structure) == set(git(tmp_path, 'ls-files').splitlines())
+
+def test_git_index_source_lists_tracked_files(tmp_path, make_config):
+    make_repo(tmp_path)
+    with patch('os.scandir', wraps=os.scandir) as scandir:
+        structure = DirectoryScanner(make_config()).generate_structure(tmp_path)
+        assert scandir.call_count == 0
+
+    assert listed_paths(structure) == set(git(tmp_path, 'ls-files').splitlines())
+    assert "├── main_link@ -> src/main.py" in structure
+
+def test_git_index_source_matches_filesystem_walk_of_clean_checkout(tmp_path, make_config):
+    make_repo(tmp_path)
+    for path in ('notes.txt', 'src/scratch.py', 'debug.log', 'build/out.o'):
+        os.remove(tmp_path / path)
+
+    indexed = DirectoryScanner(make_config(show_content=True)).generate_structure(tmp_path)
+    walked = DirectoryScanner(make_config(show_content=True, source='filesystem', use_gitignore=False)).generate_structure(tmp_path)
+    assert indexed == walked
+
+def test_git_index_source_with_untracked_files(tmp_path, make_config):
+    make_repo(tmp_path)
+    structure = DirectoryScanner(make_config(untracked=True)).generate_structure(tmp_path)
+    expected = git(tmp_path, 'ls-files', '--cached', '--others', '--exclude-standard').splitlines()
+    assert listed_paths(structure) == set(expected)
+
+def test_git_index_source_in_subdirectory(tmp_path):
+    make_repo(tmp_path)
+    tree = GitIndexTree.load(tmp_path / 'src')
+    assert find_git_dir(tmp_path / 'src' / 'pkg') == (str(tmp_path / '.git'), str(tmp_path))
+    assert sorted(tree.listing('')) == [
+        ('main.py', False, False, True),
+        ('pkg', False, True, False),
+    ]
+    assert tree.is_tracked(os.path.join('pkg', 'deep'), is_dir=True)
+
+def test_git_index_source_outside_checkout(tmp_path, capsys, make_config):
+    (tmp_path / 'file.txt').write_text('x\n')
+    structure = DirectoryScanner(make_config()).generate_structure(tmp_path)
+    assert structure[1:] == ["└── file.txt"]
+    assert "scanning the filesystem" in capsys.readouterr().err
@@ -0,0 +1,47 @@
+import random
+import pathspec
+from dirai.matching import compile_spec, PatternIndex
+
+
+def make_spec(lines):
+    return pathspec.PathSpec.from_lines('gitwildmatch', lines)
+
+def test_compile_spec_empty():
+    assert compile_spec(make_spec([])) is None
+    assert compile_spec(make_spec(['# only a comment', ''])) is None
+
+def test_pattern_index_buckets():
+    index = compile_spec(make_spec(['node_modules', 'build/', '*.pyc', '*.tar.gz', '!keep.pyc', 'src/*.py', 'fo?']))
+    assert set(index.names) == {'node_modules', 'build', 'keep.pyc'}
+    assert set(index.extensions) == {'pyc', 'tar.gz'}
+    assert list(index.buckets) == ['src']
+    assert len(index.unrooted.rules) == 1
+
+def test_pattern_index_last_match_wins():
+    index = compile_spec(make_spec(['*.log', '!keep.log', 'logs/']))
+    assert index.match_file('debug.log') is True
+    assert index.match_file('a/keep.log') is False
+    assert index.match_file('logs/keep.log') is True
+    assert index.match_file('logs') is False
+    assert index.match_file('logs/') is True
+
+def test_pattern_index_matches_pathspec():
+    rng = random.Random(0)
+    names = ['foo', 'a.log', 'b.py', 'x.tar.gz', '.env', 'build', 'keep.log', 'src', 'a', 'b', 'c.d', 'x\ny']
+    lines_pool = [
+        'foo', '*.log', '*.py', '*.tar.gz', 'build/', '!keep.log', '!*.py', '/src', 'src/*.py',
+        'a/**/b', '**/foo', '*', '?oo', '[ab]*', 'a/b/', 'src/', '#comment', '!src/', '.env',
+        '*.d/', 'b/c.d', 'a\\*b', 'src/a/*.log', '**/*.log', 'src/**',
+    ]
+    for _ in range(500):
+        lines = [rng.choice(lines_pool) for _ in range(rng.randrange(1, 12))]
+        if rng.random() < 0.5:
+            prefix = rng.choice(['src', 'src/a', 'a/b'])
+            lines = [f"{prefix}/{line}" if line and line[0] not in '#!' else line for line in lines]
+        spec = make_spec(lines)
+        index = PatternIndex(spec.patterns)
+        for _ in range(40):
+            path = '/'.join(rng.choice(names) for _ in range(rng.randrange(1, 5)))
+            if rng.random() < 0.4:
+                path += '/'
+            assert index.match_file(path) == spec.match_file(path), (lines, path)
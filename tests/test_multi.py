@@ -0,0 +1,96 @@
+import os
+import time
+import pytest
+from functools import partial
+from unittest.mock import patch
+from dirai.content import open_text
+from dirai.multi import MultiProfileScanner, ProfileOutput
+from dirai.scanner import DirectoryScanner
+
+
+@pytest.fixture
+def make_config(make_config):
+    return partial(make_config, use_gitignore=True, show_content=True)
+
+def make_tree(root):
+    (root / 'src' / 'pkg').mkdir(parents=True)
+    (root / 'src' / 'main.py').write_text('print(1)\nAPI_KEY="abc"\n')
+    (root / 'src' / 'pkg' / '__init__.py').write_text('x = 1\ny = 2\nz = 3\n')
+    (root / 'docs').mkdir()
+    (root / 'docs' / 'index.md').write_text('# Docs\npassword: hunter2\n')
+    (root / 'logs').mkdir()
+    (root / 'logs' / 'app.log').write_text('log\n')
+    (root / 'data.bin').write_bytes(b'\x00\x01')
+    (root / '.gitignore').write_text('*.log\n')
+
+def test_multi_profile_matches_individual_scans(tmp_path, make_config):
+    make_tree(tmp_path)
+    configs = [
+        make_config(),
+        make_config(include=['*.py'], max_lines=1),
+        make_config(exclude=['src/'], use_gitignore=False, redaction_patterns=['password']),
+        make_config(include=['docs/*.md'], prune_empty_dirs=True),
+        make_config(max_depth=1, show_content=False),
+        make_config(max_bytes_per_file=10, max_total_content_bytes=25),
+    ]
+
+    results = [[] for _ in configs]
+    outputs = [ProfileOutput(DirectoryScanner(config), result.append) for config, result in zip(configs, results)]
+
+    with patch('os.scandir', wraps=os.scandir) as scandir:
+        MultiProfileScanner(outputs).scan(tmp_path)
+        # root, src, src/pkg, docs and logs are each listed once
+        assert scandir.call_count == 5
+
+    for config, result in zip(configs, results):
+        assert result == DirectoryScanner(config).generate_structure(tmp_path)
+
+def test_multi_profile_reads_each_file_once(tmp_path, make_config):
+    make_tree(tmp_path)
+    configs = [make_config(exclude=['.gitignore']), make_config(exclude=['.gitignore'], max_lines=1)]
+    outputs = [ProfileOutput(DirectoryScanner(config), lambda line: None) for config in configs]
+
+    opened = []
+    real_open = open
+
+    def counting_open(file, *args, **kwargs):
+        opened.append(os.path.basename(str(file)))
+        return real_open(file, *args, **kwargs)
+
+    with patch('builtins.open', side_effect=counting_open):
+        MultiProfileScanner(outputs).scan(tmp_path)
+
+    assert opened.count('main.py') == 1
+    assert opened.count('.gitignore') == 1
+
+def test_multi_profile_uses_scan_cache(tmp_path, make_config):
+    make_tree(tmp_path)
+    old = time.time() - 60
+    for path in tmp_path.rglob('*'):
+        os.utime(path, (old, old))
+    configs = [make_config(cache=True), make_config(cache=True, max_lines=1), make_config(cache=False)]
+
+    def scan():
+        results = [[] for _ in configs]
+        scanners = [DirectoryScanner(config) for config in configs]
+        MultiProfileScanner([ProfileOutput(scanner, result.append)
+                             for scanner, result in zip(scanners, results)]).scan(tmp_path)
+        return results, [scanner.cache_stats for scanner in scanners]
+
+    first, stats = scan()
+    assert [s and s['content_misses'] for s in stats] == [5, 5, None]
+    os.utime(tmp_path, (old, old))
+
+    with patch('dirai.multi.open_text', wraps=open_text) as opened:
+        second, stats = scan()
+    # Every profile using the cache is served from it; the other one reads
+    assert [s and s['content_hits'] for s in stats] == [5, 5, None]
+    assert opened.call_count == 5
+    assert second == first
+    for config, result in zip(configs[:2], second[:2]):
+        assert result == DirectoryScanner(config).generate_structure(tmp_path)
+
+    for config in configs:
+        config['rebuild_cache'] = True
+    _, stats = scan()
+    assert stats[0]['content_hits'] == stats[1]['content_hits'] == 0
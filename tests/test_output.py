@@ -0,0 +1,80 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+from unittest.mock import patch
+from dirai.output import ParallelGzipWriter, open_output, write_chunks, write_lines
+
+def test_write_lines_to_file(tmp_path):
+    output_file = tmp_path / 'out.txt'
+    with open_output(str(output_file)) as f:
+        count = write_lines(f, (line for line in ['└── root/', '├── a.txt']))
+    assert count == 2
+    assert output_file.read_text(encoding='utf-8') == '└── root/\n├── a.txt\n'
+
+def test_write_lines_to_stdout(capsys):
+    with open_output('-') as f:
+        write_lines(f, ['line'])
+    assert capsys.readouterr().out == 'line\n'
+
+def test_compressed_outputs(tmp_path):
+    lines = [f'│   line {i}' for i in range(1000)]
+    expected = ''.join(line + '\n' for line in lines).encode('utf-8')
+    for name, opener in [('out.txt.gz', gzip.open), ('out.txt.xz', lzma.open), ('out.txt.bz2', bz2.open)]:
+        with open_output(str(tmp_path / name)) as f:
+            write_lines(f, lines)
+        with opener(tmp_path / name) as f:
+            assert f.read() == expected
+
+def test_parallel_gzip_writes_members_in_order(tmp_path):
+    lines = [f'├── file{i}.py' for i in range(20000)]
+    expected = ''.join(line + '\n' for line in lines).encode('utf-8')
+    output_file = tmp_path / 'out.txt.gz'
+    with open(output_file, 'wb') as raw:
+        with io.TextIOWrapper(ParallelGzipWriter(raw, 3, block_size=4096), encoding='utf-8') as f:
+            write_lines(f, lines)
+
+    data = output_file.read_bytes()
+    # One gzip member per block
+    assert data.count(b'\x1f\x8b\x08') > 10
+    assert gzip.decompress(data) == expected
+
+def test_parallel_gzip_empty_report(tmp_path):
+    output_file = tmp_path / 'out.gz'
+    with open_output(str(output_file), compress_threads=2):
+        pass
+    assert gzip.decompress(output_file.read_bytes()) == b''
+
+def test_write_chunks(tmp_path):
+    chunks = [b'\xe2\x94\x94\xe2\x94\x80\xe2\x94\x80 root/\n', memoryview(b'a\nb\nc\n'), b'x' * 70000 + b'\n']
+    expected = b''.join(chunks)
+    for name in ('out.txt', 'out.txt.gz'):
+        with open_output(str(tmp_path / name)) as f:
+            f.write('header\n')
+            assert write_chunks(f, iter(chunks)) == len(expected)
+            f.write('footer\n')
+        data = (tmp_path / name).read_bytes()
+        if name.endswith('.gz'):
+            data = gzip.decompress(data)
+        assert data == b'header\n' + expected + b'footer\n'
+
+def test_write_chunks_partial_writes(tmp_path):
+    writev = os.writev
+
+    def short_writev(fd, buffers):
+        # Write at most 5 bytes per call
+        data = b''.join(bytes(buffer) for buffer in buffers)[:5]
+        return writev(fd, [data])
+
+    chunks = [b'first line\n', b'second line\n', b'3\n']
+    output_file = tmp_path / 'out.txt'
+    with patch('os.writev', side_effect=short_writev):
+        with open_output(str(output_file)) as f:
+            write_chunks(f, chunks)
+    assert output_file.read_bytes() == b''.join(chunks)
+
+def test_write_chunks_to_stdout(capsys):
+    with open_output('-') as f:
+        write_chunks(f, [b'line\n', memoryview(b'more\n')])
+    assert capsys.readouterr().out == 'line\nmore\n'
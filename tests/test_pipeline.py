@@ -0,0 +1,69 @@
+import os
+import time
+import pytest
+from functools import partial
+from dirai.pipeline import ContentPipeline, PendingContent
+from dirai.scanner import DirectoryScanner
+
+
+@pytest.fixture
+def make_config(make_config):
+    return partial(make_config, show_content=True, max_lines=2, redaction_patterns=['password'])
+
+def test_content_processes_match_inline(tmp_path, make_config):
+    for i in range(5):
+        directory = tmp_path / f'dir_{i}'
+        directory.mkdir()
+        for j in range(10):
+            (directory / f'file_{j}.txt').write_text(f'line {i} {j}\npassword = secret\nmore\n')
+    (tmp_path / 'dir_0' / 'data.bin').write_bytes(b'\x00\x01')
+
+    inline = DirectoryScanner(make_config()).generate_structure(tmp_path)
+    pooled = DirectoryScanner(make_config(content_processes=2)).generate_structure(tmp_path)
+
+    assert pooled == inline
+    assert "│   │   │   password = " in inline
+
+def test_resolve_keeps_order(tmp_path, make_config):
+    files = []
+    for i in range(5):
+        path = tmp_path / f'file_{i}.txt'
+        path.write_text(f'{i}\n')
+        files.append(path)
+
+    pipeline = ContentPipeline(make_config(), processes=2, batch_size=2)
+    try:
+        items = []
+        for path in files:
+            items.append(path.name)
+            placeholder = pipeline.submit(path, '', False)
+            assert isinstance(placeholder, PendingContent)
+            items.append(placeholder)
+        lines = list(pipeline.resolve(iter(items)))
+    finally:
+        pipeline.close()
+
+    expected = []
+    for i in range(5):
+        expected += [f'file_{i}.txt', f'│   │   {i}']
+    assert lines == expected
+
+def test_bytes_output_with_warm_cache(tmp_path, make_config):
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'main.py').write_text('print(1)\npassword = "x"\n')
+    (tmp_path / 'README.md').write_text('# Title\n')
+    config = make_config(cache=True, content_processes=2)
+    expected = '\n'.join(DirectoryScanner(make_config()).generate_structure(tmp_path)) + '\n'
+
+    # Entries modified just now are never cached, so backdate them
+    old = time.time() - 60
+    stats = []
+    for _ in range(2):
+        for path in (tmp_path / 'src' / 'main.py', tmp_path / 'README.md', tmp_path / 'src', tmp_path):
+            os.utime(path, (old, old))
+        scanner = DirectoryScanner(config)
+        assert b''.join(scanner.iter_structure_bytes(tmp_path)).decode('utf-8') == expected
+        stats.append(scanner.cache_stats)
+
+    assert stats[0]['content_misses'] == 2
+    assert stats[1]['content_hits'] == 2
@@ -0,0 +1,46 @@
+import pathspec
+from dirai.pruning import PruningPlanner, split_pattern, could_match_below, matches_exactly
+
+
+def make_planner(exclude=(), include=()):
+    return PruningPlanner(
+        pathspec.PathSpec.from_lines('gitwildmatch', exclude),
+        pathspec.PathSpec.from_lines('gitwildmatch', include),
+    )
+
+def test_split_pattern():
+    assert split_pattern('*.py') is None
+    assert split_pattern('build/') is None
+    assert split_pattern('/build') == ['build']
+    assert split_pattern('src/**/*.py') == ['src', '**', '*.py']
+
+def test_could_match_below():
+    segments = ['src', '**', '*.py']
+    assert could_match_below(segments, []) is True
+    assert could_match_below(segments, ['src']) is True
+    assert could_match_below(segments, ['src', 'a', 'b']) is True
+    assert could_match_below(segments, ['docs']) is False
+
+def test_matches_exactly():
+    assert matches_exactly(['**', 'logs'], ['a', 'logs']) is True
+    assert matches_exactly(['logs'], ['a', 'logs']) is False
+
+def test_can_include_below_anchored():
+    planner = make_planner(include=['src/**/*.py', 'docs/*.md'])
+    assert planner.can_include_below('src') is True
+    assert planner.can_include_below('docs') is True
+    assert planner.can_include_below('docs/api') is False
+    assert planner.can_include_below('node_modules') is False
+
+def test_can_include_below_unanchored():
+    planner = make_planner(include=['*.py'])
+    assert planner.can_include_below('anything/at/all') is True
+
+def test_excludes_all_children():
+    planner = make_planner(exclude=['logs/*'])
+    assert planner.excludes_all_children('logs') is True
+    assert planner.excludes_all_children('src') is False
+
+def test_excludes_all_children_with_negation():
+    planner = make_planner(exclude=['logs/*', '!logs/keep.log'])
+    assert planner.excludes_all_children('logs') is False
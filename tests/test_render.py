@@ -0,0 +1,82 @@
+import json
+import os
+import pytest
+from functools import partial
+from dirai.render import get_renderer, output_format, render_json, render_markdown, render_text
+from dirai.scanner import DirectoryScanner
+
+
+@pytest.fixture
+def make_config(make_config):
+    return partial(make_config, exclude=['*.log'], show_content=True)
+
+@pytest.fixture
+def tree_dir(tmp_path):
+    (tmp_path / 'src' / 'pkg').mkdir(parents=True)
+    (tmp_path / 'src' / 'pkg' / 'mod.py').write_text('def f():\n    return "```"\n\n')
+    (tmp_path / 'src' / 'main.py').write_text('print(1)\n')
+    (tmp_path / 'src' / 'zz.log').write_text('excluded, but it decides the connector\n')
+    (tmp_path / 'empty').mkdir()
+    (tmp_path / 'data.bin').write_bytes(b'\x00\x01')
+    (tmp_path / 'README.md').write_text('# Title\n')
+    os.symlink('src/main.py', tmp_path / 'link.py')
+    os.symlink('.', tmp_path / 'src' / 'pkg' / 'loop')
+    return tmp_path
+
+
+@pytest.mark.parametrize('overrides', [
+    {},
+    {'show_content': False},
+    {'prune_empty_dirs': True},
+    {'max_depth': 1},
+    {'follow_symlinks': True},
+    {'follow_symlinks': True, 'repeated_dirs': 'reference'},
+    {'max_lines': 1, 'max_total_content_bytes': 12},
+    {'workers': 3, 'content_processes': 2},
+])
+def test_text_renderer_matches_scanner(tree_dir, overrides, make_config):
+    expected = DirectoryScanner(make_config(**overrides)).generate_structure(tree_dir)
+    tree = DirectoryScanner(make_config(**overrides)).build_tree(tree_dir)
+    assert list(render_text(tree)) == expected
+
+def test_json_renderer(tree_dir, make_config):
+    tree = DirectoryScanner(make_config(prune_empty_dirs=True)).build_tree(tree_dir)
+    document = json.loads('\n'.join(render_json(tree)))
+
+    assert document['name'] == tree_dir.name
+    children = {child['name']: child for child in document['children']}
+    assert sorted(children) == ['README.md', 'data.bin', 'link.py', 'src']
+    assert children['README.md']['content'] == ['# Title']
+    assert children['README.md']['size'] == 8
+    assert children['data.bin']['content'] == ['[Binary content omitted]']
+    assert children['link.py'] == {**children['link.py'], 'type': 'symlink', 'target': 'src/main.py'}
+    pkg = next(child for child in children['src']['children'] if child['name'] == 'pkg')
+    assert [child['name'] for child in pkg['children']] == ['loop', 'mod.py']
+
+def test_json_renderer_empty_directories(tmp_path, make_config):
+    (tmp_path / 'a' / 'b').mkdir(parents=True)
+    tree = DirectoryScanner(make_config()).build_tree(tmp_path)
+    document = json.loads('\n'.join(render_json(tree)))
+    assert document['children'][0]['children'][0]['children'] == []
+
+def test_markdown_renderer(tree_dir, make_config):
+    tree = DirectoryScanner(make_config()).build_tree(tree_dir)
+    lines = list(render_markdown(tree))
+    assert lines[0] == f"# `{tree_dir.name}/`"
+    assert "- **`src/`**" in lines
+    assert "  - **`pkg/`**" in lines
+    assert "- `link.py` → `src/main.py`" in lines
+    # Content containing a fence gets a longer one
+    start = lines.index("      ````python")
+    assert lines[start + 1:start + 4] == ["      def f():", '          return "```"', ""]
+    assert lines[start + 4] == "      ````"
+
+def test_output_format():
+    assert output_format({'output': 'report.MD'}) == 'markdown'
+    assert output_format({'output': 'report.json', 'format': 'auto'}) == 'json'
+    assert output_format({'output': 'report.json', 'format': 'text'}) == 'text'
+    assert output_format({'output': 'structure.txt'}) == 'text'
+    assert output_format({'output': 'report.json.gz'}) == 'json'
+    assert output_format({'output': 'structure.txt.xz'}) == 'text'
+    with pytest.raises(ValueError):
+        get_renderer('yaml')
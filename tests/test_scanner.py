@@ -2,7 +2,9 @@
 import pytest
 from pathlib import Path
 from unittest.mock import patch, mock_open
+from dirai.content import TextContent
 from dirai.scanner import DirectoryScanner
+from dirai.pruning import PruningPlanner
 from dirai.utils import is_binary
 import os
 
@@ -55,10 +57,36 @@ def test_is_excluded_include_spec(scanner_instance, tmp_path):
 def test_process_directory_permission_error(scanner_instance, tmp_path):
     (tmp_path / 'inaccessible_dir').mkdir()
     # Simulate a permission error
-    with patch('os.listdir', side_effect=PermissionError):
+    with patch('os.scandir', side_effect=PermissionError):
         result = scanner_instance._process_directory(tmp_path)
         assert result == ["└── [Permission denied]"]
 
+def test_process_directory_syscall_count(scanner_instance, tmp_path):
+    for d in ('a', 'b', os.path.join('b', 'c')):
+        (tmp_path / d).mkdir()
+        for i in range(5):
+            (tmp_path / d / f'file_{i}.txt').write_text('x\n')
+    scanner_instance.config['show_content'] = True
+    scanner_instance.base_dir = tmp_path
+
+    calls = {'scandir': 0, 'listdir': 0, 'stat': 0, 'lstat': 0}
+
+    def counting(name, func):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    with patch('os.scandir', counting('scandir', os.scandir)), \
+         patch('os.listdir', counting('listdir', os.listdir)), \
+         patch('os.stat', counting('stat', os.stat)), \
+         patch('os.lstat', counting('lstat', os.lstat)):
+        structure = scanner_instance._process_directory(tmp_path)
+
+    assert "    │   └── file_4.txt" in structure
+    # One listing per directory and no per-entry stat calls
+    assert calls == {'scandir': 4, 'listdir': 0, 'stat': 0, 'lstat': 0}
+
 def test_show_file_content_binary(scanner_instance, tmp_path):
     binary_file = tmp_path / 'binary.bin'
     binary_file.write_bytes(b'\x00\x01\x02')  # Write some binary data
@@ -95,4 +123,306 @@ def test_generate_structure_sort_order(scanner_instance, tmp_path):
         "├── bbb_file.txt",
         "└── zzz_file.txt",
     ]
-    assert structure == expected_structure, f"Expected structure:\n{expected_structure}\n\nGot:\n{structure}"
\ No newline at end of file
+    assert structure == expected_structure, f"Expected structure:\n{expected_structure}\n\nGot:\n{structure}"
+
+def test_generate_structure_nested_gitignore(scanner_instance, tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / '.gitignore').write_text('*.txt\n')
+    (tmp_path / 'sub' / 'hidden.txt').touch()
+    (tmp_path / 'sub' / 'shown.py').touch()
+    (tmp_path / 'top.txt').touch()
+    (tmp_path / 'vendor').mkdir()
+    (tmp_path / 'vendor' / '.gitignore').write_text('*\n')
+    scanner_instance.config['use_gitignore'] = True
+    scanner_instance.config['exclude'] = ['vendor/']
+    scanner_instance.exclude_spec = scanner_instance.exclude_spec.from_lines('gitwildmatch', ['vendor/'])
+
+    loaded = []
+    original = scanner_instance._load_directory_gitignore
+
+    def spy(current_dir, rel_dir, entries, parent_spec):
+        loaded.append(rel_dir)
+        return original(current_dir, rel_dir, entries, parent_spec)
+
+    with patch.object(scanner_instance, '_load_directory_gitignore', side_effect=spy):
+        structure = scanner_instance.generate_structure(tmp_path)
+
+    assert structure == [
+        f"└── {tmp_path.name}/",
+        "├── sub/",
+        "│   ├── .gitignore",
+        "│   └── shown.py",
+        "└── top.txt",
+    ]
+    # Excluded directories are never entered, so their .gitignore is never read
+    assert loaded == ['', 'sub']
+
+def test_generate_structure_prune_empty_dirs(scanner_instance, tmp_path):
+    (tmp_path / 'src' / 'pkg').mkdir(parents=True)
+    (tmp_path / 'src' / 'pkg' / 'mod.py').touch()
+    (tmp_path / 'src' / 'empty').mkdir()
+    (tmp_path / 'docs' / 'api').mkdir(parents=True)
+    (tmp_path / 'docs' / 'api' / 'index.md').touch()
+    scanner_instance.config['prune_empty_dirs'] = True
+    scanner_instance.include_spec = scanner_instance.include_spec.from_lines('gitwildmatch', ['src/**/*.py'])
+    scanner_instance.pruning_planner = PruningPlanner(scanner_instance.exclude_spec, scanner_instance.include_spec)
+
+    listed = []
+    original = scanner_instance._scan_entries
+
+    def spy(current_dir, rel_dir=''):
+        listed.append(rel_dir)
+        return original(current_dir, rel_dir)
+
+    with patch.object(scanner_instance, '_scan_entries', side_effect=spy):
+        structure = scanner_instance.generate_structure(tmp_path)
+
+    assert structure == [
+        f"└── {tmp_path.name}/",
+        "└── src/",
+        "    └── pkg/",
+        "        └── mod.py",
+    ]
+    # docs/ can never contain an included file, so it is not even listed
+    assert 'docs' not in listed
+
+def test_iter_structure_is_lazy(scanner_instance, tmp_path):
+    for name in ('a', 'b', 'c'):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / 'file.txt').touch()
+
+    listed = []
+    original = scanner_instance._scan_entries
+
+    def spy(current_dir, rel_dir=''):
+        listed.append(rel_dir)
+        return original(current_dir, rel_dir)
+
+    with patch.object(scanner_instance, '_scan_entries', side_effect=spy):
+        lines = scanner_instance.iter_structure(tmp_path)
+        assert next(lines) == f"└── {tmp_path.name}/"
+        assert next(lines) == "├── a/"
+        assert listed == ['']
+        rest = list(lines)
+
+    assert rest[-1] == "    └── file.txt"
+    assert listed == ['', 'a', 'b', 'c']
+
+def test_generate_structure_parallel_matches_serial(scanner_instance, tmp_path):
+    for i in range(4):
+        for j in range(3):
+            directory = tmp_path / f'dir_{i}' / f'sub_{j}'
+            directory.mkdir(parents=True)
+            for k in range(3):
+                (directory / f'file_{k}.txt').write_text(f'{i}{j}{k}\n')
+    (tmp_path / 'dir_1' / '.gitignore').write_text('sub_1/\n')
+    (tmp_path / 'top.txt').write_text('top\n')
+    scanner_instance.config['use_gitignore'] = True
+    scanner_instance.config['show_content'] = True
+
+    serial = scanner_instance.generate_structure(tmp_path)
+    scanner_instance.config['workers'] = 4
+    parallel = scanner_instance.generate_structure(tmp_path)
+
+    assert parallel == serial
+    assert "│   ├── sub_1/" not in serial[serial.index("├── dir_1/"):serial.index("├── dir_2/")]
+
+def test_show_file_content_decode_errors(scanner_instance, tmp_path):
+    text_file = tmp_path / 'latin.txt'
+    text_file.write_bytes(b'caf\xe9\n')
+    content = scanner_instance._show_file_content(text_file, '', True)
+    assert content[0].startswith("    │   [Error reading file: 'utf-8' codec can't decode")
+
+    scanner_instance.config['decode_errors'] = 'replace'
+    content = scanner_instance._show_file_content(text_file, '', True)
+    assert content == ["    │   caf�"]
+
+def test_show_file_content_byte_budget(scanner_instance, tmp_path):
+    text_file = tmp_path / 'big.txt'
+    text_file.write_text('1234\n' * 10)
+    scanner_instance.config['max_bytes_per_file'] = 12
+    content = scanner_instance._show_file_content(text_file, '', True)
+    assert content == ["    │   1234", "    │   1234", "    │   12", "    │   [... truncated after 12 bytes]"]
+
+def test_show_file_content_byte_budget_long_line(scanner_instance, tmp_path):
+    # Memory-mapped and without a single newline
+    text_file = tmp_path / 'one_line.txt'
+    text_file.write_bytes(b'x' * (8 << 20))
+    scanner_instance.config['max_bytes_per_file'] = 1000
+    with patch('dirai.content.TextContent.iter_blocks', autospec=True,
+               side_effect=TextContent.iter_blocks) as iter_blocks:
+        content = scanner_instance._show_file_content(text_file, '', True)
+    assert content == ["    │   " + 'x' * 1000, "    │   [... truncated after 1000 bytes]"]
+    assert iter_blocks.call_args.args[0].bytes_read == 1001
+
+    scanner_instance.config['show_content'] = True
+    lines = b''.join(scanner_instance.iter_structure_bytes(tmp_path)).decode('utf-8').splitlines()
+    assert lines[2:] == ["    │   " + 'x' * 1000, "    │   [... truncated after 1000 bytes]"]
+
+def test_show_file_content_byte_budget_cuts_whole_characters(scanner_instance, tmp_path):
+    text_file = tmp_path / 'unicode.txt'
+    text_file.write_text('aé€' * 10)
+    scanner_instance.config['max_bytes_per_file'] = 8
+    content = scanner_instance._show_file_content(text_file, '', True)
+    assert content == ["    │   aé€a", "    │   [... truncated after 8 bytes]"]
+
+def test_generate_structure_total_content_budget(scanner_instance, tmp_path):
+    for name in ('a.txt', 'b.txt', 'c.txt'):
+        (tmp_path / name).write_text('1234\n1234\n')
+    scanner_instance.config.update(show_content=True, max_total_content_bytes=15, content_processes=2)
+    structure = scanner_instance.generate_structure(tmp_path)
+    assert structure[1:] == [
+        "├── a.txt",
+        "│   │   1234",
+        "│   │   1234",
+        "├── b.txt",
+        "│   │   1234",
+        "│   │   [... report content budget reached]",
+        "└── c.txt",
+        "    │   [Content omitted: report content budget reached]",
+    ]
+
+def make_link_farm(root, levels):
+    """Every level links twice to the next one: 2**levels paths to the last level"""
+    for level in range(levels + 1):
+        (root / f'level_{level}').mkdir()
+        (root / f'level_{level}' / 'file.txt').touch()
+    for level in range(levels):
+        os.symlink(f'../level_{level + 1}', root / f'level_{level}' / 'left')
+        os.symlink(f'../level_{level + 1}', root / f'level_{level}' / 'right')
+
+def test_generate_structure_symlink_cycles(scanner_instance, tmp_path):
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+    os.symlink('../b', tmp_path / 'a' / 'to_b')
+    os.symlink('../a', tmp_path / 'b' / 'to_a')
+    os.symlink('..', tmp_path / 'a' / 'up')
+    scanner_instance.config['follow_symlinks'] = True
+
+    structure = scanner_instance.generate_structure(tmp_path)
+    assert structure[1:] == [
+        "├── a/",
+        "│   ├── to_b@ -> ../b",
+        "│   │   └── to_a@ -> ../a",
+        "│   │       │   [Recursive symlink skipped]",
+        "│   └── up@ -> ..",
+        "│       │   [Recursive symlink skipped]",
+        "└── b/",
+        "    └── to_a@ -> ../a",
+        "        ├── to_b@ -> ../b",
+        "        │   │   [Recursive symlink skipped]",
+        "        └── up@ -> ..",
+        "            │   [Recursive symlink skipped]",
+    ]
+
+def test_generate_structure_link_farm_walk(scanner_instance, tmp_path):
+    make_link_farm(tmp_path, 4)
+    scanner_instance.config['follow_symlinks'] = True
+    structure = scanner_instance.generate_structure(tmp_path)
+    # Without cycles, every path is walked: level k is reached along 2**(k + 1) - 1 paths
+    assert sum(line.endswith('file.txt') for line in structure) == sum(2 ** (k + 1) - 1 for k in range(5))
+
+def test_generate_structure_link_farm_reference(scanner_instance, tmp_path):
+    make_link_farm(tmp_path, 24)
+    scanner_instance.config.update(follow_symlinks=True, repeated_dirs='reference')
+
+    structure = scanner_instance.generate_structure(tmp_path)
+    # Each level is walked once, through the first link reaching it
+    assert sum(line.endswith('file.txt') for line in structure) == 25
+    assert structure[1:5] == [
+        "├── level_0/",
+        "│   ├── left@ -> ../level_1",
+        "│   │   ├── left@ -> ../level_2",
+        "│   │   │   ├── left@ -> ../level_3",
+    ]
+    assert "│   ├── right@ -> ../level_1" in structure
+    assert f"│   │   │   [same directory as {os.path.join('level_0', 'left')}]" in structure
+    assert structure[-2:] == ["└── level_9/", f"    │   [same directory as {os.path.join('level_0', *['left'] * 9)}]"]
+
+@pytest.mark.parametrize('overrides', [{'max_depth': 2}, {'exclude': ['a/link/sub/']}])
+def test_generate_structure_reference_walks_hidden_copy_again(scanner_instance, tmp_path, overrides):
+    # The first path to big/ leaves f.txt out, so big/ is walked again
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'big' / 'sub').mkdir(parents=True)
+    (tmp_path / 'big' / 'sub' / 'f.txt').touch()
+    os.symlink('../big', tmp_path / 'a' / 'link')
+    scanner_instance.config.update(follow_symlinks=True, repeated_dirs='reference', **overrides)
+    scanner_instance.exclude_spec = scanner_instance.exclude_spec.from_lines('gitwildmatch', overrides.get('exclude', []))
+
+    structure = scanner_instance.generate_structure(tmp_path)
+    assert not any('[same directory as' in line for line in structure)
+    assert structure[-3:] == ["└── big/", "    └── sub/", "        └── f.txt"]
+
+    # A walk that hides entries by name only is referred to
+    (tmp_path / 'big' / 'sub' / '.git').mkdir()
+    (tmp_path / 'c').mkdir()
+    os.symlink('../big', tmp_path / 'c' / 'link')
+    structure = scanner_instance.generate_structure(tmp_path)
+    assert structure[-2:] == ["    └── link@ -> ../big", "        │   [same directory as big]"]
+
+def test_link_farm_multi_profile_matches(tmp_path):
+    from dirai.multi import MultiProfileScanner, ProfileOutput
+    make_link_farm(tmp_path, 5)
+    os.symlink('..', tmp_path / 'level_5' / 'up')
+    (tmp_path / 'level_3' / 'skipped.txt').touch()
+    configs = [
+        {'follow_symlinks': True, 'show_content': False, 'use_gitignore': False},
+        {'follow_symlinks': True, 'show_content': False, 'use_gitignore': False, 'repeated_dirs': 'reference'},
+        {'follow_symlinks': True, 'show_content': False, 'use_gitignore': False, 'repeated_dirs': 'reference',
+         'max_depth': 4},
+        {'follow_symlinks': True, 'show_content': False, 'use_gitignore': False, 'repeated_dirs': 'reference',
+         'exclude': ['level_0/left/right/skipped.txt'], 'prune_empty_dirs': True},
+    ]
+    results = [[] for _ in configs]
+    MultiProfileScanner([ProfileOutput(DirectoryScanner(config), result.append)
+                         for config, result in zip(configs, results)]).scan(tmp_path)
+    for config, result in zip(configs, results):
+        assert result == DirectoryScanner(config).generate_structure(tmp_path)
+
+def make_content_tree(root):
+    (root / 'src').mkdir()
+    (root / 'src' / 'plain.py').write_text('import os\n\ndef main():\n    return os.sep\n')
+    (root / 'src' / 'secret.py').write_text('x = 1\napi_key = "abc123"\nprint(x)\n')
+    (root / 'src' / 'crlf.txt').write_bytes(b'one\r\ntwo\r\n')
+    (root / 'src' / 'trailing.txt').write_bytes(b'spaces   \ntab\t\nsep\x1c\nend')
+    (root / 'src' / 'unicode.txt').write_text('café\n│ box\n')
+    (root / 'src' / 'latin1.txt').write_bytes(b'caf\xe9\nok\n')
+    (root / 'src' / 'empty.txt').write_bytes(b'')
+    (root / 'src' / 'blank.txt').write_bytes(b'\n\n\n')
+    # Memory-mapped, with lines to redact and strip among the plain ones
+    log = [b'line %d of a large log file\n' % i for i in range(80000)]
+    log[5], log[40000], log[79999] = b'token = "t0k3n"\n', b'trailing  \n', b'password: x'
+    (root / 'big.log').write_bytes(b''.join(log))
+    (root / 'data.bin').write_bytes(b'\x00\x01')
+
+@pytest.mark.parametrize('overrides', [
+    {},
+    {'max_lines': 2},
+    {'max_bytes_per_file': 20},
+    {'max_total_content_bytes': 5000},
+    {'decode_errors': 'strict'},
+    {'decode_errors': 'backslashreplace', 'redaction_patterns': []},
+    {'cache': True},
+    {'content_processes': 2},
+    {'dedupe_content': True},
+])
+def test_iter_structure_bytes_matches_lines(scanner_instance, tmp_path, overrides):
+    make_content_tree(tmp_path)
+    scanner_instance.config.update({'show_content': True, 'decode_errors': 'replace', 'cache': False, **overrides})
+
+    expected = ''.join(line + '\n' for line in scanner_instance.generate_structure(tmp_path))
+    for _ in range(2):
+        # Twice: with the cache on, the second scan is served from it
+        chunks = list(scanner_instance.iter_structure_bytes(tmp_path))
+        assert b''.join(chunks).decode('utf-8') == expected
+    assert all(not isinstance(chunk, str) for chunk in chunks)
+
+def test_iter_structure_bytes_renders_blocks(scanner_instance, tmp_path):
+    (tmp_path / 'big.log').write_bytes(b'plain log line\n' * 50000)
+    scanner_instance.config['show_content'] = True
+    with patch('dirai.content.TextContent.__iter__') as per_line:
+        chunks = list(scanner_instance.iter_structure_bytes(tmp_path))
+    # The content was never split into str lines
+    assert per_line.call_count == 0
+    assert len(chunks) < 10
+    assert b''.join(chunks).count(b'\n') == 50002
@@ -0,0 +1,52 @@
+import json
+import pytest
+from functools import partial
+from dirai.scanner import DirectoryScanner
+from dirai.stats import PHASES
+
+
+@pytest.fixture
+def make_config(make_config):
+    return partial(make_config, exclude=['*.log'], use_gitignore=True, show_content=True, redaction_patterns=['password'])
+
+def make_tree(root):
+    (root / 'src').mkdir()
+    (root / 'src' / 'main.py').write_text('print(1)\npassword = "hunter2"\n')
+    (root / 'src' / 'app.log').write_text('log\n')
+    (root / 'README.md').write_text('# Readme\n')
+    (root / '.gitignore').write_text('build/\n')
+
+def test_stats_do_not_change_output(tmp_path, make_config):
+    make_tree(tmp_path)
+    plain = DirectoryScanner(make_config()).generate_structure(tmp_path)
+    scanner = DirectoryScanner(make_config(stats=True))
+    assert scanner.generate_structure(tmp_path) == plain
+
+def test_stats_counts(tmp_path, make_config):
+    make_tree(tmp_path)
+    scanner = DirectoryScanner(make_config(stats=True))
+    scanner.generate_structure(tmp_path)
+    stats = scanner.stats.to_dict()
+
+    assert stats['counts'] == {
+        'directories_listed': 2,
+        'entries_visited': 5,
+        'entries_excluded': 1,
+        'directories_pruned': 0,
+        'files_read': 3,
+        'bytes_read': len('print(1)\npassword = "hunter2"\n') + len('# Readme\n') + len('build/\n'),
+        'lines_redacted': 1,
+    }
+    assert set(stats['phases']) == set(PHASES)
+    assert stats['total_seconds'] >= sum(stats['phases'].values()) * 0.99
+    assert [item['path'] for item in stats['slowest_directories']] in (['.', 'src'], ['src', '.'])
+    assert {item['path'] for item in stats['slowest_files']} == {'src/main.py', 'README.md', '.gitignore'}
+
+    json.dumps(stats)
+    table = scanner.stats.format_table()
+    assert 'redaction' in table and 'Slowest files:' in table
+
+def test_stats_disabled_by_default(tmp_path, make_config):
+    scanner = DirectoryScanner(make_config())
+    assert scanner.stats is None
+    assert '_is_excluded' not in vars(scanner)
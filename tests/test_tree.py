@@ -0,0 +1,48 @@
+import tracemalloc
+from dirai.scanner import DirectoryScanner
+from dirai.tree import DIRECTORY, FILE, TreeModel
+
+
+def test_model_nodes_and_truncate():
+    tree = TreeModel('root')
+    src = tree.add('', 'src', DIRECTORY)
+    tree.enter('src', src)
+    tree.add('src', 'a.py', FILE)
+    tree.contents[2] = ['x = 1']
+    docs = tree.add('', 'docs', DIRECTORY, last=True)
+    tree.enter('docs', docs)
+    tree.add('docs', 'a.py', FILE, last=True)
+    tree.contents[4] = ['y = 2']
+
+    assert len(tree) == 5
+    assert tree.names[2] == tree.names[4]
+    assert list(tree.depths()) == [0, 1, 2, 1, 2]
+    assert tree.path(4) == 'docs/a.py'
+    assert tree.has_children(src) and not tree.has_children(2)
+    assert tree.is_last(docs) and not tree.is_last(src)
+
+    tree.truncate(docs)
+    assert len(tree) == 3
+    assert tree.contents == {2: ['x = 1']}
+
+def test_model_is_smaller_than_lines(tmp_path, make_config):
+    for i in range(40):
+        directory = tmp_path / f'directory_{i:03}'
+        directory.mkdir()
+        for j in range(50):
+            (directory / f'module_{j:03}.py').touch()
+
+    tracemalloc.start()
+    try:
+        lines = DirectoryScanner(make_config()).generate_structure(tmp_path)
+        lines_size = tracemalloc.get_traced_memory()[0]
+        del lines
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tree = DirectoryScanner(make_config()).build_tree(tmp_path)
+        tree_size = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+
+    assert len(tree) == 1 + 40 + 40 * 50
+    assert tree_size < lines_size / 2
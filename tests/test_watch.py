@@ -0,0 +1,118 @@
+import gzip
+import os
+import shutil
+import threading
+import time
+import pytest
+from functools import partial
+from unittest.mock import patch
+from dirai.content import open_text
+from dirai.scanner import DirectoryScanner
+from dirai.watch import InotifyWatcher, ReportWatch, WatchScanner, watch
+
+
+@pytest.fixture
+def make_config(make_config):
+    return partial(make_config, use_gitignore=True, show_content=True)
+
+def make_tree(root):
+    for i in range(4):
+        for j in range(3):
+            path = root / f'dir_{i}' / f'sub_{j}'
+            path.mkdir(parents=True)
+            (path / 'file.txt').write_text(f'{i} {j}\n')
+    (root / '.gitignore').write_text('*.log\n')
+    (root / 'top.txt').write_text('top\n')
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_updates_match_a_fresh_scan(tmp_path, make_config):
+    make_tree(tmp_path)
+    scanner = WatchScanner(make_config())
+    scanner.render(tmp_path)
+
+    def change(path):
+        scanner.changed(str(path))
+        assert scanner.render(tmp_path) == DirectoryScanner(make_config()).generate_structure(tmp_path)
+
+    (tmp_path / 'dir_1' / 'sub_2' / 'file.txt').write_text('changed\n')
+    change(tmp_path / 'dir_1' / 'sub_2' / 'file.txt')
+
+    (tmp_path / 'dir_3' / 'zzz.txt').write_text('new last entry\n')
+    change(tmp_path / 'dir_3' / 'zzz.txt')
+
+    shutil.rmtree(tmp_path / 'dir_2')
+    change(tmp_path / 'dir_2')
+
+    (tmp_path / 'dir_0' / 'sub_0' / 'debug.log').write_text('ignored\n')
+    change(tmp_path / 'dir_0' / 'sub_0' / 'debug.log')
+
+    (tmp_path / '.gitignore').write_text('sub_1/\n')
+    change(tmp_path / '.gitignore')
+
+def test_update_lists_only_changed_directories(tmp_path, make_config):
+    make_tree(tmp_path)
+    scanner = WatchScanner(make_config())
+    scanner.render(tmp_path)
+
+    (tmp_path / 'dir_1' / 'sub_2' / 'new.txt').write_text('new\n')
+    scanner.changed(str(tmp_path / 'dir_1' / 'sub_2' / 'new.txt'))
+    with patch('os.scandir', wraps=os.scandir) as scandir, \
+            patch('dirai.scanner.open_text', wraps=open_text) as reads:
+        lines = scanner.render(tmp_path)
+    assert [call.args[0] for call in scandir.call_args_list] == [str(tmp_path / 'dir_1' / 'sub_2')]
+    assert [os.path.basename(call.args[0]) for call in reads.call_args_list] == ['new.txt']
+    assert "│           │   new" in lines
+
+def test_report_ignores_its_own_output(tmp_path, make_config):
+    make_tree(tmp_path)
+    output = tmp_path / 'structure.txt'
+    report = ReportWatch(make_config(), tmp_path, str(output))
+    assert report.update()
+    assert 'structure.txt' not in output.read_text()
+    report.scanner.changed(str(output))
+    assert not report.update()
+
+def test_report_compressed_output(tmp_path, make_config):
+    make_tree(tmp_path)
+    output = tmp_path / 'structure.txt.gz'
+    report = ReportWatch(make_config(compress_threads=2), tmp_path, str(output))
+    assert report.update()
+    text = gzip.decompress(output.read_bytes()).decode('utf-8')
+    assert text.splitlines() == DirectoryScanner(make_config(exclude=['*.gz'])).generate_structure(tmp_path)
+
+@pytest.mark.parametrize('poll', [False, True])
+def test_watch_rewrites_report(tmp_path, poll, make_config):
+    if not poll and InotifyWatcher.create() is None:
+        pytest.skip("inotify is not available")
+    root = tmp_path / 'tree'
+    root.mkdir()
+    make_tree(root)
+    output = tmp_path / 'structure.txt'
+    reports = [ReportWatch(make_config(), root, str(output))]
+    stop = threading.Event()
+    updates = []
+    thread = threading.Thread(target=watch, args=(reports,),
+                              kwargs={'interval': 0.05, 'poll': poll, 'stop': stop,
+                                      'on_update': lambda report, seconds: updates.append(seconds)})
+    thread.start()
+    try:
+        assert wait_for(output.exists)
+        time.sleep(0.1)
+        (root / 'dir_2' / 'sub_1' / 'file.txt').write_text('edited\n')
+        assert wait_for(lambda: 'edited' in output.read_text())
+        (root / 'dir_0' / 'added').mkdir()
+        (root / 'dir_0' / 'added' / 'deep.txt').write_text('deep\n')
+        assert wait_for(lambda: 'deep' in output.read_text())
+    finally:
+        stop.set()
+        thread.join()
+    assert output.read_text().splitlines() == DirectoryScanner(make_config()).generate_structure(root)
+    assert updates